@@ -0,0 +1,72 @@
+"""
+Measure the two snapshot save changes separately, on the same synthetic tree:
+
+1. Dropping the `get_json_size` pre-pass, which serialized the whole tree to a temp file
+   just to size the progress bar (same schema 1 JSON, with and without the pre-pass).
+2. Dropping derivable record paths (schema 1 -> schema 2, both single pass).
+
+Usage: python benchmarks/bench_save.py [ENTRIES] [FILES_PER_FOLDER]
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from tree_util_spider_thread import iter_snapshot_json, json_iter_encode, open_snapshot_writer
+
+def make_tree(entries, files_per_folder):
+	"""Build a synthetic snapshot structure with `entries` file and folder records."""
+	structure = []
+	now = time.time()
+	made = 0
+	folder_index = 0
+	while made < entries:
+		path = f"/data/folder_{folder_index}"
+		children = []
+		for i in range(min(files_per_folder, entries - made - 1)):
+			children.append({"name": f"file_{i}.txt", "path": f"{path}/file_{i}.txt", "type": "file", "size": 1000 + i, "mime": "text/plain", "mtime": now, "ctime": now, "atime": now, "attributes": []})
+		structure.append({"name": f"folder_{folder_index}", "path": path, "type": "folder", "size": sum(c["size"] for c in children), "files": len(children), "folders": 0, "access_denied": False, "mtime": now, "ctime": now, "atime": now, "children": children})
+		made += len(children) + 1
+		folder_index += 1
+	return {"report_info": {"scanned_files": entries - folder_index, "scanned_folders": folder_index}, "structure": structure}
+
+def save(data, output_file, encode, pre_pass=False, chunk_size=8192):
+	"""Compress `encode(data)` to bz2; with `pre_pass`, first write it to a temp file to size it, as the old save did."""
+	if pre_pass:
+		with tempfile.NamedTemporaryFile(delete=True, mode="w", encoding="utf-8") as temp:
+			for chunk in encode(data, chunk_size):
+				temp.write(chunk)
+			temp.flush()
+	original_size = 0
+	with open_snapshot_writer(output_file, "bz2") as f_out:
+		for chunk in encode(data, chunk_size):
+			encoded = chunk.encode("utf-8")
+			f_out.write(encoded)
+			original_size += len(encoded)
+	return original_size, os.path.getsize(output_file)
+
+def timed(label, func):
+	start = time.perf_counter()
+	original_size, compressed_size = func()
+	elapsed = time.perf_counter() - start
+	print(f"{label:<36} {elapsed:8.2f} s {original_size / 2**20:10.1f} MiB JSON {compressed_size / 2**20:8.1f} MiB bz2")
+	return elapsed
+
+def main():
+	entries = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+	files_per_folder = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+	print(f"Building a {entries:,}-entry tree...")
+	data = make_tree(entries, files_per_folder)
+	with tempfile.TemporaryDirectory() as directory:
+		output_file = os.path.join(directory, "snapshot.json.bz2")
+		pre_pass = timed("schema 1, size pre-pass + compress", lambda: save(data, output_file, json_iter_encode, pre_pass=True))
+		single_pass = timed("schema 1, single pass", lambda: save(data, output_file, json_iter_encode))
+		no_paths = timed("schema 2 (no paths), single pass", lambda: save(data, output_file, iter_snapshot_json))
+	print(f"Dropping the pre-pass: {pre_pass / single_pass:.2f}x")
+	print(f"Dropping the paths:    {single_pass / no_paths:.2f}x")
+	print(f"Both:                  {pre_pass / no_paths:.2f}x")
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,108 @@
+"""
+Compare /search, /regex and /garbage with the previous recursive walkers, which passed the
+raw pattern to `re.search`/`re.match` for every entry, and check that a very deep tree no
+longer hits the recursion limit.
+
+Usage: python benchmarks/bench_search.py [ENTRIES] [FILES_PER_FOLDER] [DEPTH]
+"""
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from tree_util_spider_thread import search_files, find_garbage_files, NameIndex, GARBAGE_PATTERNS, IMPORTANT_PATTERN, GARBAGE_FOLDER_WHITELIST
+
+NAMES = ["report.txt", "setup.log", "~draft.docx", "Thumbs.db", "libfoo.so.1", "module.py", "backup.bak", "driver.sys", "image.png", "notes.tmp"]
+
+def make_tree(entries, files_per_folder):
+	"""Build a synthetic snapshot structure with `entries` records in folders of `files_per_folder` files, nested a few levels."""
+	structure = []
+	made = 0
+	folder_index = 0
+	while made < entries:
+		children = [{"name": f"{i}_{NAMES[i % len(NAMES)]}", "type": "file", "size": i % 7 * 100} for i in range(min(files_per_folder, entries - made - 1))]
+		folder = {"name": f"folder_{folder_index}", "type": "folder", "size": 0, "children": children}
+		if structure and folder_index % 4: # every few folders go one level deeper
+			structure[-1]["children"].append(folder)
+		else:
+			structure.append(folder)
+		made += len(children) + 1
+		folder_index += 1
+	return structure
+
+def make_deep_tree(depth):
+	"""A chain of `depth` nested folders, each holding one file."""
+	structure = []
+	listing = structure
+	for level in range(depth):
+		folder = {"name": f"d{level}", "type": "folder", "size": 0, "children": [{"name": f"f{level}.tmp", "type": "file", "size": 1}]}
+		listing.append(folder)
+		listing = folder["children"]
+	return structure
+
+def old_search_files(node, query, regex=False, results=None):
+	"""The previous recursive search."""
+	if results == None:
+		results = []
+	for item in node:
+		if regex:
+			if re.search(query, item["name"], re.IGNORECASE):
+				results.append(item)
+		else:
+			if query.lower() in item["name"].lower():
+				results.append(item)
+		if item["type"] == "folder":
+			old_search_files(item["children"], query, regex, results)
+	return results
+
+def old_find_garbage_files(node, results=None):
+	"""The previous recursive garbage search."""
+	if results == None:
+		results = []
+	for item in node:
+		if (item["type"] == "file" and re.search(GARBAGE_PATTERNS, item["name"], re.IGNORECASE)) or (item["type"] == "file" and item["size"] == 0):
+			if not re.match(IMPORTANT_PATTERN, item["name"]):
+				results.append(item)
+		if item["type"] == "folder" and item["name"].lower() not in GARBAGE_FOLDER_WHITELIST:
+			old_find_garbage_files(item["children"], results)
+	return results
+
+def timed(label, func):
+	start = time.perf_counter()
+	result = func()
+	elapsed = time.perf_counter() - start
+	print(f"{label:<40} {elapsed:8.3f} s")
+	return elapsed, result
+
+def compare(label, old, new, old_label="recursive", new_label="iterative, compiled"):
+	before, old_results = timed(f"{label} ({old_label})", old)
+	after, new_results = timed(f"{label} ({new_label})", new)
+	assert [id(item) for item in old_results] == [id(item) for item in new_results], f"{label}: results differ"
+	print(f"{'':<40} {before / after:7.2f}x, {len(new_results):,} results")
+
+def main():
+	entries = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+	files_per_folder = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+	depth = int(sys.argv[3]) if len(sys.argv) > 3 else 100_000
+	print(f"Building a {entries:,}-entry tree...")
+	structure = make_tree(entries, files_per_folder)
+	compare("search 'lib'", lambda: old_search_files(structure, "lib"), lambda: search_files(structure, "lib"))
+	compare("regex '^\\d+_lib.*\\.so\\.\\d+$'", lambda: old_search_files(structure, r"^\d+_lib.*\.so\.\d+$", True), lambda: search_files(structure, r"^\d+_lib.*\.so\.\d+$", True))
+	compare("garbage", lambda: old_find_garbage_files(structure), lambda: find_garbage_files(structure))
+	_, index = timed("name index build", lambda: NameIndex.build(structure))
+	compare("regex", lambda: search_files(structure, r"^\d+_lib.*\.so\.\d+$", True), lambda: index.search(structure, r"^\d+_lib.*\.so\.\d+$", True), "walk", "name index")
+
+	print(f"\nBuilding a {depth:,}-level deep tree...")
+	deep = make_deep_tree(depth)
+	try:
+		old_find_garbage_files(deep)
+		print("recursive garbage search: completed")
+	except RecursionError:
+		print("recursive garbage search: RecursionError")
+	timed("iterative garbage search", lambda: find_garbage_files(deep))
+	timed("iterative search", lambda: search_files(deep, "f9"))
+
+if __name__ == "__main__":
+	main()
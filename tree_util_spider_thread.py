@@ -26,8 +26,12 @@ GREY = "\033[90m"
 UNDERLINE = "\033[4m"
 
 program_name = "Tree Spider"
-print(f"\n\n{GREEN}	🌳 {program_name}{RESET} - {ORANGE}Directory Snapshot Tool{RESET}\n\n")
-print("		⏳ Initializing...\n")
+import multiprocessing
+# Worker processes started with spawn (the default on Windows and macOS) import this module again; they stay silent
+MAIN_PROCESS = multiprocessing.current_process().name == "MainProcess" # named before the worker imports the module
+if MAIN_PROCESS:
+	print(f"\n\n{GREEN}	🌳 {program_name}{RESET} - {ORANGE}Directory Snapshot Tool{RESET}\n\n")
+	print("		⏳ Initializing...\n")
 
 import threading
 import itertools
@@ -129,8 +133,8 @@ class Spinner:
 			time.sleep(self.wait)
 
 	def start(self):
-		"""Start the spinner thread."""
-		if not self.running:
+		"""Start the spinner thread (not in --batch mode)."""
+		if not self.running and not headless:
 			global start_spinner
 			start_spinner = time.time()
 			self.running = True
@@ -142,11 +146,12 @@ class Spinner:
 		self.running = False
 		if self.thread:
 			self.thread.join()  # Ensure the thread stops
+		if headless:
+			return
 		sys.stdout.write(f'\r{self.done_message}\n')  # Print completion message
 		sys.stdout.flush()
 
-init_spinner = Spinner()
-init_spinner.start()
+headless = False # --batch: no prompts, spinners or title changes; set from the parsed arguments in main
 
 
 # Colored emojis
@@ -164,11 +169,14 @@ colored_prohibited = "\033[38;5;208m🚫\033[0m"
 error_logs = []
 from inputimeout import inputimeout, TimeoutOccurred
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from collections import defaultdict
+from collections import defaultdict, deque
+from collections.abc import Mapping, Sequence
 from datetime import datetime
 from getpass import getpass
 import concurrent.futures
 from tqdm import tqdm
+from pathlib import Path
+from array import array
 from sys import exit
 import subprocess
 import mimetypes
@@ -178,18 +186,32 @@ import markdown
 import platform
 import humanize
 import logging
+import sqlite3
 import shutil
 import random
+import queue
 import psutil
 import heapq
+import bisect
+import hashlib
 import math
 import json
 import stat
+import struct
+import mmap
+import codecs
+import gzip
+import lzma
 import bz2
 import re
 import io
 import os
 
+try: # regex parser, used to find the literals a /regex query requires (see `regex_literals`)
+	from re import _parser as re_parser, _constants as re_constants # Python 3.11+
+except ImportError:
+	import sre_parse as re_parser, sre_constants as re_constants
+
 logging.basicConfig(format='[%(levelname)s] %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -197,11 +219,24 @@ try:
 	import orjson
 except ImportError:
 	logging.debug("orjson not found, using json instead")
-	print(f"{colored_bulb} You can install orjson to to speed up parsing: `{GREY}pip install orjson{RESET}`")
+	if MAIN_PROCESS:
+		print(f"{colored_bulb} You can install orjson to to speed up parsing: `{GREY}pip install orjson{RESET}`")
+
+try: # ijson, optional incremental parser for low-memory snapshot loading
+	import ijson
+except ImportError:
+	logging.debug("ijson not found, snapshots are parsed in one piece")
+
+try: # Zstandard, optional snapshot codec
+	import zstandard
+except ImportError:
+	logging.debug("zstandard not found, zstd snapshots are unavailable")
 
 if os.name == "nt":  # Windows only, get volume label
 	import ctypes
 	import ctypes.wintypes
+else: # peak RSS for load reports
+	import resource
 def get_volume_label(path: str = "/") -> str:
 	"""Get the Volume Label (name) of a drive in a cross-platform way.
 	
@@ -234,11 +269,11 @@ def get_volume_label(path: str = "/") -> str:
 
 
 		elif system == "Linux":
-			output = subprocess.check_output(f"lsblk -no LABEL {path}", shell=True, text=True)
+			output = subprocess.check_output(f"lsblk -no LABEL {path}", shell=True, text=True, stderr=subprocess.DEVNULL)
 			return output.strip() if output else None
 
 		elif system == "Darwin":  # macOS
-			output = subprocess.check_output(f"diskutil info {path} | grep 'Volume Name'", shell=True, text=True)
+			output = subprocess.check_output(f"diskutil info {path} | grep 'Volume Name'", shell=True, text=True, stderr=subprocess.DEVNULL)
 			match = re.search(r"Volume Name:\s+(.+)", output)
 			return match.group(1).strip() if match else None
 
@@ -267,11 +302,11 @@ def get_volume_serial_number(path: str = "/") -> str:
 			return match.group(1) if match else None
 
 		elif system == "Linux":
-			output = subprocess.check_output(f"lsblk -no UUID {path}", shell=True, text=True)
+			output = subprocess.check_output(f"lsblk -no UUID {path}", shell=True, text=True, stderr=subprocess.DEVNULL)
 			return output.strip() if output else None
 
 		elif system == "Darwin":  # macOS
-			output = subprocess.check_output(f"diskutil info {path} | grep 'Volume UUID'", shell=True, text=True)
+			output = subprocess.check_output(f"diskutil info {path} | grep 'Volume UUID'", shell=True, text=True, stderr=subprocess.DEVNULL)
 			match = re.search(r"Volume UUID:\s+([\w-]+)", output)
 			return match.group(1) if match else None
 
@@ -286,42 +321,79 @@ def get_volume_serial_number(path: str = "/") -> str:
 try:
 	import keyboard
 except ModuleNotFoundError as m: # Keyboard, optional
-	print(f"{colored_warn}{YELLOW}[{type(m).__name__}]{RESET}: {m} - keyboard module (optional) not found.")
-	print(f"{colored_bulb} Install with: `{GREY}pip install keyboard{RESET}`")
+	if MAIN_PROCESS:
+		print(f"{colored_warn}{YELLOW}[{type(m).__name__}]{RESET}: {m} - keyboard module (optional) not found.")
+		print(f"{colored_bulb} Install with: `{GREY}pip install keyboard{RESET}`")
 
 try:
 	import magic
 except ModuleNotFoundError as m:
-	print(f"{colored_warn}{YELLOW}[{type(m).__name__}]{RESET}: {m} - MIME types will be detected using file extensions.")
-	print("But you can install python-magic-bin to speed up the process.")
-	if os.name == "nt":  # Windows
-		print(f"{colored_bulb} Install with: `{GREY}pip install python-magic-bin{RESET}`")
-	else:  # Linux
-		print(f"{colored_bulb} Install with the following command:\n 1. `{GREY}sudo apt install python3-magic{RESET}`\n 2. `{GREY}pip install python-magic{RESET}`")
+	if MAIN_PROCESS:
+		print(f"{colored_warn}{YELLOW}[{type(m).__name__}]{RESET}: {m} - MIME types will be detected using file extensions.")
+		print("But you can install python-magic-bin to speed up the process.")
+		if os.name == "nt":  # Windows
+			print(f"{colored_bulb} Install with: `{GREY}pip install python-magic-bin{RESET}`")
+		else:  # Linux
+			print(f"{colored_bulb} Install with the following command:\n 1. `{GREY}sudo apt install python3-magic{RESET}`\n 2. `{GREY}pip install python-magic{RESET}`")
 
 except Exception as i:
-	print(f"{colored_warn} {YELLOW}[{type(i).__name__}]{RESET}: {i}; Check your Magic installation.\n")
+	if MAIN_PROCESS:
+		print(f"{colored_warn} {YELLOW}[{type(i).__name__}]{RESET}: {i}; Check your Magic installation.\n")
 	error_logs.append({"name": "magic", "type": str(type(i).__name__), "desc": str(i)})
 
 if "magic" in sys.modules:
 	try:# Test if magic is working
 		magic.from_buffer(b"", mime=True)
 	except Exception as m:
-		print(f"{colored_warn} {YELLOW}[{type(m).__name__}]{RESET}: {m}; Magic installed but Magic is not working properly.\n")
+		if MAIN_PROCESS:
+			print(f"{colored_warn} {YELLOW}[{type(m).__name__}]{RESET}: {m}; Magic installed but Magic is not working properly.\n")
 		error_logs.append({"name": "magic", "type": str(type(m).__name__), "desc": str(m)})
 
 
 
 try: # Google Magika, Python 3.12 - 3.8
 	from magika import Magika
-	m = Magika()
 except Exception as m:
 	logging.debug("Magika not found, using mimetypes/magic instead")
 
-if "magika" in sys.modules:
+# Loading the Magika model is expensive, so every thread/process keeps one session for its lifetime.
+_magika_local = threading.local()
+
+def get_magika():
+	"""Return this thread's long-lived Magika session, loading the model on first use."""
+	# A session inherited through fork() is not reused; the model runtime's threads do not survive it.
+	if getattr(_magika_local, "pid", None) != os.getpid():
+		_magika_local.session = Magika()
+		_magika_local.pid = os.getpid()
+	return _magika_local.session
+
+def identify_paths(paths):
+	"""
+	Identify a list of files with one batched call on this worker's Magika session.
+
+	Args:
+		paths (list): File paths to identify.
+
+	Returns:
+		list: One (mime, error_type, error_desc) tuple per path; the error fields are None on success.
+	"""
+	session = get_magika()
+	path_objects = [Path(file_path) for file_path in paths]
+	if hasattr(session, "identify_paths"):
+		results = session.identify_paths(path_objects)
+	else: # older Magika releases only identify one path at a time
+		results = [session.identify_path(file_path) for file_path in path_objects]
+	identified = []
+	for result in results:
+		if getattr(result, "ok", True):
+			identified.append((result.output.mime_type, None, None))
+		else:
+			identified.append(("unknown", "MagikaError", str(result.status)))
+	return identified
+
+if MAIN_PROCESS and "magika" in sys.modules: # workers load the model when they first sniff
 	try: # Test if magika is working
-		magika = Magika()
-		magika.identify_bytes(content="")
+		get_magika().identify_bytes(b"")
 	except Exception as m:
 		print(f"{colored_warn} {YELLOW}[{type(m).__name__}]{RESET}: {m}; Magika installed but Magika is not working properly.\n")
 		error_logs.append({"name": "magika", "type": str(type(m).__name__), "desc": str(m)})
@@ -464,6 +536,8 @@ def clear_screen():
 
 def title_console(title):
 	""" Sets the title of the console window. """
+	if headless:
+		return
 
 	if os.name == 'nt': # Windows command prompt
 		title = re.sub(r'([&<^%>|])', r'^\1', title)
@@ -471,6 +545,59 @@ def title_console(title):
 		title = re.sub(r'($"\'*|&;<>#)', r'\\\1', title)
 	os.system(f'title {title}' if os.name == 'nt' else f'echo "\033]0;{title}\007"')
 
+ANSI_ESCAPE_RE = re.compile(r"\x1b\[[0-9;]*m")
+BATCH_PROGRESS_INTERVAL = 2 # seconds between JSON progress lines in --batch mode
+batch_lock = threading.Lock()
+
+def batch_event(event, **fields):
+	"""Write one JSON line {"event": ..., "time": ..., **fields} to stderr (--batch mode)."""
+	line = json.dumps({"event": event, "time": round(time.time(), 3), **fields}, default=str)
+	with batch_lock:
+		sys.stderr.write(line + "\n")
+		sys.stderr.flush()
+
+class BatchProgress(tqdm):
+	"""
+	Progress bar for --batch mode: every `BATCH_PROGRESS_INTERVAL` seconds, and when closed,
+	writes a "progress" event (see `batch_event`) instead of drawing a bar. Made by
+	`new_progress_bar`, so every progress bar reports the same way.
+	"""
+	null_file = None # tqdm still writes carriage returns and newlines, they go here
+
+	def __init__(self, *args, **kwargs):
+		self.last_event = 0
+		self.finished = False
+		if BatchProgress.null_file is None:
+			BatchProgress.null_file = open(os.devnull, "w")
+		kwargs["mininterval"] = BATCH_PROGRESS_INTERVAL
+		kwargs["file"] = BatchProgress.null_file
+		super().__init__(*args, **kwargs)
+
+	def display(self, msg=None, pos=None, final=False):
+		# set_description() and refresh() redraw on every call, so the interval is enforced here
+		if self.finished or (not final and time.time() - self.last_event < BATCH_PROGRESS_INTERVAL):
+			return True
+		self.last_event = time.time()
+		info = self.format_dict
+		rate = info["rate"] or (info["n"] / info["elapsed"] if info["elapsed"] else None)
+		batch_event("progress", task=ANSI_ESCAPE_RE.sub("", (info["prefix"] or "").rstrip(": ")), n=info["n"], total=info["total"], unit=info["unit"].strip(), elapsed=round(info["elapsed"], 3), rate=round(rate, 3) if rate else None, done=final)
+		return True
+
+	def close(self):
+		if not self.disable and not self.finished:
+			self.display(final=True)
+			self.finished = True
+		super().close()
+
+def new_progress_bar(*args, **kwargs):
+	"""Create a progress bar: a `BatchProgress` in --batch mode, a `tqdm` bar otherwise."""
+	return (BatchProgress if headless else tqdm)(*args, **kwargs)
+
+class BatchLogFormatter(logging.Formatter):
+	"""Formats log records as "log" events (see `batch_event`) for --batch mode."""
+	def format(self, record):
+		return json.dumps({"event": "log", "time": round(record.created, 3), "level": record.levelname.lower(), "message": ANSI_ESCAPE_RE.sub("", record.getMessage()).strip()})
+
 def get_partition_from_path(path):
 	"""Returns the mount point or drive for a given path."""
 	for partition in psutil.disk_partitions():
@@ -1201,7 +1328,80 @@ def get_folder_icon(path):
 	# Default icon
 	return "📁"
 
-def get_mime_type(file_path, max_size=10 * 1024 * 1024, force_magic=False, use_magika=False):
+def guess_mime_type(file_path, file_size, max_size=10 * 1024 * 1024, force_magic=False):
+	"""
+	Cheap first stage of MIME detection: guess by extension and decide whether the file needs content sniffing.
+
+	Args:
+		file_path (str): Path to the file.
+		file_size (int): Size of the file in bytes.
+		max_size (int): File size threshold for deep MIME detection.
+		force_magic (bool): Force deep MIME detection even for large files.
+
+	Returns:
+		tuple: (mime, needs_deep) - `mime` is the best guess without reading the file.
+	"""
+	mime = mimetypes.guess_type(file_path)[0]
+	if mime and not force_magic:
+		return mime, False  # If detected and deep search is not forced, return immediately
+	if file_size > max_size and not force_magic:
+		return mime or "application/octet-stream", False  # Use extension-based guess if too large
+	if "magic" not in sys.modules and "magika" not in sys.modules:
+		return mime or "unknown", False
+	return mime or "unknown", True
+
+# Leading bytes read per file for header sniffing; 0 lets libmagic/Magika read the file themselves.
+DEFAULT_SNIFF_BYTES = 8 * 1024
+# Every thread/process keeps its own header buffer and libmagic cookie.
+_sniff_local = threading.local()
+
+def read_file_header(file_path, header_size=DEFAULT_SNIFF_BYTES):
+	"""
+	Read the first `header_size` bytes of a file with a single read into this thread's reusable buffer.
+
+	The same view can be handed to several consumers (MIME sniffing, partial hashing...) so the
+	file is opened and read only once.
+
+	Returns:
+		memoryview: The header bytes; only valid until this thread's next call.
+	"""
+	buffer = getattr(_sniff_local, "buffer", None)
+	if buffer is None or len(buffer) < header_size:
+		buffer = _sniff_local.buffer = bytearray(header_size)
+	with open(file_path, "rb", buffering=0) as f:
+		length = f.readinto(memoryview(buffer)[:header_size])
+	return memoryview(buffer)[:length]
+
+def get_magic():
+	"""Return this thread's libmagic cookie, so threads do not share the module-level lock."""
+	if getattr(_sniff_local, "magic_pid", None) != os.getpid():
+		_sniff_local.magic = magic.Magic(mime=True)
+		_sniff_local.magic_pid = os.getpid()
+	return _sniff_local.magic
+
+def sniff_mime_buffer(header, use_magika=False):
+	"""Detect a MIME type from bytes already read (see `read_file_header`). Raises on failure."""
+	if (use_magika or "magic" not in sys.modules) and "magika" in sys.modules:
+		return get_magika().identify_bytes(bytes(header)).output.mime_type
+	return get_magic().from_buffer(bytes(header))
+
+def sniff_mime_type(file_path, use_magika=False, header_size=0):
+	"""
+	Detect the MIME type of a file from its content with `magika` or `magic`. Raises on failure.
+
+	With `header_size` > 0 only that many leading bytes are read (see `read_file_header`),
+	otherwise libmagic/Magika open and read the file themselves.
+	"""
+	if header_size > 0:
+		return sniff_mime_buffer(read_file_header(file_path, header_size), use_magika)
+	if (use_magika or "magic" not in sys.modules) and "magika" in sys.modules:
+		mime, error_type, error_desc = identify_paths([file_path])[0]
+		if error_type:
+			raise OSError(error_desc)
+		return mime
+	return magic.from_file(file_path, mime=True)
+
+def get_mime_type(file_path, max_size=10 * 1024 * 1024, force_magic=False, use_magika=False, file_size=None, header_size=0, mime_cache=None, file_stat=None):
 	"""
 	Get MIME type of a file. Uses file extension for large files and `magic` or `magika` for smaller files.
 
@@ -1210,26 +1410,30 @@ def get_mime_type(file_path, max_size=10 * 1024 * 1024, force_magic=False, use_m
 		max_size (int): File size threshold for deep MIME detection (default: 10MB).
 		force_magic (bool): Force deep MIME detection even for large files.
 		use_magika (bool): Use `magika` instead of `magic`.
+		file_size (int, optional): Size already known from the scan's stat; saves an extra `os.path.getsize`.
+		header_size (int, optional): Sniff only this many leading bytes (0 = let magic/magika read the file).
+		mime_cache (FileCache, optional): Cache consulted before deep detection; needs `file_stat`.
+		file_stat (os.stat_result, optional): Stat of the file, used as the cache key.
 
 	Returns:
 		str: MIME type of the file.
 	"""
 	try:
-		# First, try detecting MIME type using file extension
-		mime = mimetypes.guess_type(file_path)[0]
-		if mime and not force_magic:
-			return mime  # If detected and deep search is not forced, return immediately
-
-		file_size = os.path.getsize(file_path)
-		if file_size > max_size and not force_magic:
-			return mime or "application/octet-stream"  # Use extension-based guess if too large
-
+		if file_size is None:
+			file_size = file_stat.st_size if file_stat is not None else os.path.getsize(file_path)
+		mime, needs_deep = guess_mime_type(file_path, file_size, max_size, force_magic)
+		if not needs_deep:
+			return mime
+		cache_entry = FileCache.entry_for(file_path, file_stat) if mime_cache is not None and file_stat is not None else None
+		if cache_entry is not None:
+			cached = mime_cache.get(cache_entry)
+			if cached is not None:
+				return cached
 		# Use deep detection if file is small or forced
-		if use_magika and "magika" in sys.modules:
-			return Magika().identify_path(Path(file_path)).output.mime_type
-
-		if "magic" in sys.modules:
-			return magic.from_file(file_path, mime=True)
+		mime = sniff_mime_type(file_path, use_magika, header_size)
+		if cache_entry is not None:
+			mime_cache.put(cache_entry, mime)
+		return mime
 
 	except Exception as e:
 		sys.stdout.write("\n")
@@ -1237,15 +1441,378 @@ def get_mime_type(file_path, max_size=10 * 1024 * 1024, force_magic=False, use_m
 		error_logs.append({"name": file_path, "type": str(type(e).__name__), "desc": str(e)})
 		return "unknown"
 
-	return mime or "unknown"
+def sniff_mime_batch(paths, use_magika=False, header_size=0):
+	"""
+	Sniff a batch of files inside a `MimeSniffer` worker process.
+
+	In header mode (`header_size` > 0) each file is read once into the worker's buffer.
+	Otherwise Magika gets the whole batch in one `identify_paths` call and libmagic sniffs
+	the files one by one.
+
+	Returns:
+		list: One (mime, error_type, error_desc) tuple per path; the error fields are None on success.
+	"""
+	if header_size <= 0 and (use_magika or "magic" not in sys.modules) and "magika" in sys.modules:
+		try:
+			return identify_paths(paths)
+		except Exception as e: # fall back to one file at a time so one bad file does not fail the batch
+			logger.debug(f"Batched Magika identification failed: {e}")
+	results = []
+	for file_path in paths:
+		try:
+			if header_size > 0:
+				results.append((sniff_mime_buffer(read_file_header(file_path, header_size), use_magika), None, None))
+			else:
+				results.append((sniff_mime_type(file_path, use_magika), None, None))
+		except Exception as e:
+			results.append(("unknown", type(e).__name__, str(e)))
+	return results
+
+PROCESS_START_METHOD = "spawn" # same on every platform, and no fork() of a process whose walker/logging/tqdm threads may hold locks
+
+def process_pool(workers):
+	"""Return a process pool of `workers` processes started with `PROCESS_START_METHOD`. Create it on the main thread."""
+	return concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(PROCESS_START_METHOD))
 
+class MimeSniffer:
+	"""
+	Deep MIME detection stage that runs beside the directory walk.
+
+	The walker stores the extension guess in each file record and hands records that need
+	content sniffing to `submit`. They are grouped into batches of `batch_size` and sniffed
+	by a pool of `workers` processes (created with the sniffer, see `process_pool`) while the
+	walk goes on; `close` waits for the remaining
+	batches and patches the detected `mime` into the records before they are serialized.
 
+	Parameters:
+		workers (int, optional): Number of sniffing processes. Defaults to the CPU count.
+		use_magika (bool, optional): Use Magika instead of libmagic. Defaults to False.
+		batch_size (int, optional): Files per batch sent to a worker. Defaults to 256.
+		error_logs (list, optional): List that detection errors are appended to.
+		header_size (int, optional): Sniff only the first `header_size` bytes of each file. Defaults to 0 (whole file).
+		mime_cache (FileCache, optional): Cache that newly sniffed MIME types are written to.
+	"""
+	def __init__(self, workers=None, use_magika=False, batch_size=256, error_logs=None, header_size=0, mime_cache=None):
+		self.workers = workers or os.cpu_count() or 1
+		self.use_magika = use_magika
+		self.header_size = header_size
+		self.mime_cache = mime_cache
+		self.batch_size = batch_size
+		self.error_logs = error_logs if error_logs is not None else []
+		self.lock = threading.Lock()
+		self.batch = []
+		self.futures = {} # future -> list of (record, cache_entry) in the batch
+		self.executor = process_pool(self.workers) # here on the caller's thread, not in a walker thread
+		self.submitted = 0
+		self.sniffed = 0
+
+	def submit(self, record, cache_entry=None):
+		"""Queue a file record for content sniffing; `cache_entry` (see `FileCache.entry_for`) stores the result. Thread-safe."""
+		with self.lock:
+			self.batch.append((record, cache_entry))
+			self.submitted += 1
+			if len(self.batch) >= self.batch_size:
+				self._flush()
+
+	def _flush(self):
+		"""Send the pending batch to the process pool. Caller holds `self.lock`."""
+		if not self.batch or self.executor is None:
+			return
+		records, self.batch = self.batch, []
+		future = self.executor.submit(sniff_mime_batch, [record["path"] for record, _ in records], self.use_magika, self.header_size)
+		self.futures[future] = records
+
+	def close(self, show_progress=True):
+		"""
+		Wait for every batch and patch the detected MIME types into their records.
 
-def get_file_attributes(file_path):
-	"""Get attributes of a file."""
+		Returns:
+			int: Number of files whose content was sniffed.
+		"""
+		with self.lock:
+			self._flush()
+			futures = dict(self.futures)
+			self.futures.clear()
+		if not futures:
+			return self.sniffed
+		try:
+			with new_progress_bar(total=self.submitted, desc=f"{'🔮 Magika' if self.use_magika else '🪄 Magic'} sniffing", unit=" files", disable=not show_progress) as sniff_bar:
+				for future in as_completed(futures):
+					records = futures[future]
+					try:
+						results = future.result()
+					except Exception as e: # worker crashed, keep the extension guesses
+						self.error_logs.append({"name": "mime_sniffer", "type": str(type(e).__name__), "desc": str(e)})
+						sniff_bar.update(len(records))
+						continue
+					for (record, cache_entry), (mime, error_type, error_desc) in zip(records, results):
+						record["mime"] = mime
+						if error_type:
+							self.error_logs.append({"name": record["path"], "type": error_type, "desc": error_desc})
+						else:
+							self.sniffed += 1
+							if self.mime_cache is not None and cache_entry is not None:
+								self.mime_cache.put(cache_entry, mime)
+					sniff_bar.update(len(records))
+		finally:
+			self.shutdown()
+		return self.sniffed
+
+	def shutdown(self):
+		"""Stop the worker processes, dropping batches that have not started."""
+		with self.lock:
+			for future in self.futures:
+				future.cancel()
+			self.futures.clear()
+		if self.executor is not None:
+			self.executor.shutdown(wait=True)
+			self.executor = None
+
+
+
+class FileCache:
+	"""
+	Persistent cache of values read from file contents (sniffed MIME types, content hashes),
+	stored in SQLite next to the config file.
+
+	Entries are keyed by device and inode (by path where the filesystem reports no inode) and
+	are only valid while size, mtime and the method that produced them are unchanged, so a
+	rescan skips content reads for files that did not change. Each `kind` of value has its own
+	namespace in the table. Lookups refresh a last-used stamp and `close` evicts the least
+	recently used entries of that kind beyond `max_entries`.
+
+	Parameters:
+		cache_file (str): Path of the SQLite database.
+		kind (str): What the values are, e.g. "mime" or "hash".
+		method (str): How they were produced, e.g. "magic:8192"; entries from another method are ignored.
+		max_entries (int, optional): Entries of this kind kept after eviction. Defaults to 1,000,000.
+	"""
+	def __init__(self, cache_file, kind, method, max_entries=1_000_000):
+		self.cache_file = cache_file
+		self.kind = kind
+		self.method = method
+		self.max_entries = max_entries
+		self.lock = threading.Lock()
+		self.hits = 0
+		self.misses = 0
+		self.pending = [] # rows waiting to be written
+		self.touched = [] # keys hit since the last write
+		self.connection = sqlite3.connect(cache_file, check_same_thread=False)
+		self.connection.execute("CREATE TABLE IF NOT EXISTS file_cache (kind TEXT, key TEXT, size INTEGER, mtime_ns INTEGER, method TEXT, value TEXT, last_used REAL, PRIMARY KEY (kind, key))")
+		self.connection.execute("CREATE INDEX IF NOT EXISTS file_cache_last_used ON file_cache (kind, last_used)")
+		self.connection.commit()
+
+	@staticmethod
+	def entry_for(file_path, file_stat):
+		"""Return the (key, size, mtime_ns) tuple identifying a file version."""
+		if file_stat.st_ino:
+			key = f"{file_stat.st_dev}:{file_stat.st_ino}"
+		else: # e.g. DirEntry.stat() on Windows
+			key = "path:" + os.path.abspath(file_path)
+		return key, file_stat.st_size, file_stat.st_mtime_ns
+
+	def get(self, cache_entry):
+		"""Return the cached value for `cache_entry`, or None on a miss."""
+		key, size, mtime_ns = cache_entry
+		with self.lock:
+			row = self.connection.execute("SELECT size, mtime_ns, method, value FROM file_cache WHERE kind = ? AND key = ?", (self.kind, key)).fetchone()
+			if row is not None and row[0] == size and row[1] == mtime_ns and row[2] == self.method:
+				self.hits += 1
+				self.touched.append(key)
+				return row[3]
+			self.misses += 1
+			return None
+
+	def put(self, cache_entry, value):
+		"""Store a value read from the file; rows are written in batches."""
+		key, size, mtime_ns = cache_entry
+		with self.lock:
+			self.pending.append((self.kind, key, size, mtime_ns, self.method, value, time.time()))
+			if len(self.pending) >= 1000:
+				self._write()
+
+	def _write(self):
+		"""Write pending rows and last-used stamps. Caller holds `self.lock`."""
+		now = time.time()
+		self.connection.executemany("INSERT OR REPLACE INTO file_cache VALUES (?, ?, ?, ?, ?, ?, ?)", self.pending)
+		self.connection.executemany("UPDATE file_cache SET last_used = ? WHERE kind = ? AND key = ?", ((now, self.kind, key) for key in self.touched))
+		self.connection.commit()
+		self.pending = []
+		self.touched = []
+
+	def close(self):
+		"""Flush pending rows, evict least recently used entries and close the database."""
+		with self.lock:
+			self._write()
+			count = self.connection.execute("SELECT COUNT(*) FROM file_cache WHERE kind = ?", (self.kind,)).fetchone()[0]
+			if count > self.max_entries:
+				self.connection.execute("DELETE FROM file_cache WHERE kind = ? AND key IN (SELECT key FROM file_cache WHERE kind = ? ORDER BY last_used LIMIT ?)", (self.kind, self.kind, count - self.max_entries))
+				self.connection.commit()
+			self.connection.close()
+
+DEFAULT_HASH_WORKERS = 4
+DEFAULT_HASH_HEAD_BYTES = 64 * 1024 # files above `full_below` are fingerprinted from this many leading bytes
+DEFAULT_HASH_FULL_BELOW = 1024 * 1024
+HASH_READ_SIZE = 1024 * 1024
+
+class ByteRateLimiter:
+	"""
+	Shared read budget for hashing threads: `consume(n)` sleeps just long enough that all
+	reads together stay under `bytes_per_second` (0 = unlimited).
+	"""
+	def __init__(self, bytes_per_second=0):
+		self.bytes_per_second = bytes_per_second
+		self.lock = threading.Lock()
+		self.next_time = time.monotonic()
+		self.consumed = 0
+
+	def consume(self, amount):
+		with self.lock:
+			self.consumed += amount
+			if self.bytes_per_second <= 0:
+				return
+			now = time.monotonic()
+			start = max(now, self.next_time)
+			self.next_time = start + amount / self.bytes_per_second
+		if start > now:
+			time.sleep(start - now)
+
+def content_hash(file_path, size, head_bytes=DEFAULT_HASH_HEAD_BYTES, full_below=DEFAULT_HASH_FULL_BELOW, limiter=None):
+	"""
+	Fingerprint of a file for the snapshot: BLAKE2b-128 (hex) of its size and its whole content,
+	or only its first `head_bytes` when it is larger than `full_below`.
+	"""
+	digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+	remaining = size if size <= full_below else min(size, head_bytes)
+	with open(file_path, "rb") as f:
+		while remaining > 0:
+			amount = min(HASH_READ_SIZE, remaining)
+			if limiter is not None:
+				limiter.consume(amount)
+			chunk = f.read(amount)
+			if not chunk:
+				break
+			digest.update(chunk)
+			remaining -= len(chunk)
+	return digest.hexdigest()
+
+class ContentHasher:
+	"""
+	Content fingerprint stage that runs beside the directory walk, like `MimeSniffer`.
+
+	The walker hands every file record to `submit`; records are fingerprinted (see
+	`content_hash`) in batches by a pool of `workers` threads, whose reads share one
+	`bytes_per_second` budget, and `close` waits for the rest before the records are
+	serialized. The fingerprint is stored under "hash". With `workers` = 0 records are hashed
+	inline, for streamed scans that write each record at once.
+
+	Parameters:
+		workers (int, optional): Hashing threads (0 = inline). Defaults to DEFAULT_HASH_WORKERS.
+		head_bytes (int, optional): Leading bytes hashed for files above `full_below`.
+		full_below (int, optional): Files up to this size are hashed in full.
+		bytes_per_second (int, optional): Read budget across all threads (0 = unlimited).
+		cache (FileCache, optional): Cache keyed by inode, size and mtime (kind "hash",
+			method = `method`), so unchanged files are not read again on the next scan.
+		error_logs (list, optional): List that read errors are appended to.
+		batch_size (int, optional): Files per task. Defaults to 256.
+	"""
+	def __init__(self, workers=DEFAULT_HASH_WORKERS, head_bytes=DEFAULT_HASH_HEAD_BYTES, full_below=DEFAULT_HASH_FULL_BELOW, bytes_per_second=0, cache=None, error_logs=None, batch_size=256):
+		self.workers = max(0, workers)
+		self.head_bytes = head_bytes
+		self.full_below = full_below
+		self.limiter = ByteRateLimiter(bytes_per_second)
+		self.cache = cache
+		self.error_logs = error_logs if error_logs is not None else []
+		self.batch_size = batch_size
+		self.lock = threading.Lock()
+		self.batch = []
+		self.futures = []
+		self.executor = None
+		self.submitted = 0
+		self.hashed = 0
+
+	@property
+	def method(self):
+		"""Settings that produced the fingerprints; stored in the report and used as the cache method."""
+		return f"blake2b-128:{self.head_bytes}:{self.full_below}"
+
+	def settings(self):
+		return {"algorithm": "blake2b-128", "head_bytes": self.head_bytes, "full_below": self.full_below}
+
+	def submit(self, record, file_stat):
+		"""Queue a file record for hashing (`file_stat` is the scan's stat, the cache key). Thread-safe."""
+		cache_entry = FileCache.entry_for(record["path"], file_stat) if self.cache is not None else None
+		if cache_entry is not None:
+			cached = self.cache.get(cache_entry)
+			if cached is not None:
+				record["hash"] = cached
+				return
+		if self.workers == 0:
+			self._hash_batch([(record, cache_entry)])
+			return
+		with self.lock:
+			self.batch.append((record, cache_entry))
+			self.submitted += 1
+			if len(self.batch) >= self.batch_size:
+				self._flush()
+
+	def _flush(self):
+		"""Hand the pending batch to the thread pool. Caller holds `self.lock`."""
+		if not self.batch:
+			return
+		if self.executor is None:
+			self.executor = ThreadPoolExecutor(max_workers=self.workers)
+		records, self.batch = self.batch, []
+		self.futures.append((self.executor.submit(self._hash_batch, records), len(records)))
+
+	def _hash_batch(self, records):
+		for record, cache_entry in records:
+			try:
+				record["hash"] = content_hash(record["path"], record["size"], self.head_bytes, self.full_below, self.limiter)
+			except Exception as e: # vanished or unreadable, the record keeps no hash
+				self.error_logs.append({"name": record["path"], "type": str(type(e).__name__), "desc": str(e)})
+				continue
+			if cache_entry is not None:
+				self.cache.put(cache_entry, record["hash"])
+			with self.lock:
+				self.hashed += 1
+
+	def close(self, show_progress=True):
+		"""
+		Wait until every queued record has its hash.
+
+		Returns:
+			int: Number of files read and hashed (cache hits excluded).
+		"""
+		with self.lock:
+			self._flush()
+			futures, self.futures = self.futures, []
+		try:
+			if futures:
+				with new_progress_bar(total=sum(count for _, count in futures), desc="🧮 Hashing files", unit=" files", disable=not show_progress) as hash_bar:
+					for future, count in futures:
+						future.result()
+						hash_bar.update(count)
+		finally:
+			self.shutdown()
+		return self.hashed
+
+	def shutdown(self):
+		"""Stop the hashing threads, dropping batches that have not started."""
+		with self.lock:
+			for future, _ in self.futures:
+				future.cancel()
+			self.futures = []
+		if self.executor is not None:
+			self.executor.shutdown(wait=True)
+			self.executor = None
+
+def get_file_attributes(file_path, file_stat=None):
+	"""Get attributes of a file. Pass `file_stat` (e.g. from `DirEntry.stat`) to avoid another `os.stat`."""
 	attributes = []
 	try:
-		file_stat = os.stat(file_path)
+		if file_stat is None:
+			file_stat = os.stat(file_path)
 		if file_stat.st_file_attributes & stat.FILE_ATTRIBUTE_ARCHIVE:
 			attributes.append("Archive")
 		if file_stat.st_file_attributes & stat.FILE_ATTRIBUTE_HIDDEN:
@@ -1265,11 +1832,118 @@ def get_file_attributes(file_path):
 		pass
 	return attributes
 
-def update_progress(total_files, use_magika):
+# Metadata syscalls issued by the scanners, reset by `save_json_tree` and stored in the report.
+syscall_count = 0
+entry_count = 0
+# `DirEntry.stat(follow_symlinks=False)` is served from the directory listing on Windows.
+LSTAT_SYSCALLS = 0 if os.name == "nt" else 1
+
+def count_syscalls(entries, syscalls):
+	"""Add scanned entries and metadata syscalls to the global counters."""
+	global syscall_count, entry_count
+	entry_count += entries
+	syscall_count += syscalls
+
+def build_entry_record(entry, no_attributes=False, magic_max_size=1 * 1024 * 1024, force_magic=False, use_magika=False, error_logs=None, mime_sniffer=None, sniff_bytes=0, mime_cache=None, content_hasher=None):
+	"""
+	Build the snapshot record for a `os.DirEntry` from a single `stat(follow_symlinks=False)`.
+
+	The entry type, size, timestamps and (on Windows) `st_file_attributes` all come from the
+	same stat result, which is then handed to `get_file_attributes` and `get_mime_type` so they
+	do not stat the file again.
+
+	Args:
+		entry (os.DirEntry): Entry returned by `os.scandir`.
+		no_attributes (bool): Do not collect file attributes.
+		magic_max_size (int): File size threshold for deep MIME detection.
+		force_magic (bool): Force deep MIME detection.
+		use_magika (bool): Use `magika` instead of `magic`.
+		error_logs (list, optional): List that MIME detection errors are appended to.
+		mime_sniffer (MimeSniffer, optional): Hand files that need content sniffing to this stage
+			instead of sniffing them inline; their record keeps the extension guess until then.
+		sniff_bytes (int, optional): Sniff inline from only this many leading bytes (0 = whole file).
+		mime_cache (FileCache, optional): Cache of earlier deep detections, consulted before sniffing.
+		content_hasher (ContentHasher, optional): Stage that adds a content "hash" to file records.
+
+	Returns:
+		tuple: (record, syscalls) - record is None for entries that are not a file, folder or link.
+	"""
+	entry_stat = entry.stat(follow_symlinks=False)
+	syscalls = LSTAT_SYSCALLS
+	mode = entry_stat.st_mode
+	attributes = get_file_attributes(entry.path, entry_stat) if not no_attributes else None
+
+	if stat.S_ISLNK(mode): # path is a symbolic link
+		syscalls += 1 # readlink
+		return {
+			"name": entry.name, # Symbolic link name
+			"path": entry.path,
+			"type": "symlink",
+			"target": os.readlink(entry.path),
+			"attr": attributes, # symbolic link attributes
+			"size": 0, # symbolic link size in bytes
+			"mtime": entry_stat.st_mtime, # symbolic link modification time
+			"ctime": entry_stat.st_ctime, # symbolic link creation time
+			"atime": entry_stat.st_atime, # symbolic link access time
+		}, syscalls
+	elif stat.S_ISDIR(mode): # path is a directory, size and counts are filled in by the scanner
+		return {
+			"name": entry.name, # Folder name
+			"path": entry.path,
+			"type": "folder", # whether it is 'folder' or 'file'
+			"size": 0, # folder size in bytes
+			"attr": attributes, # folder attributes
+			"mtime": entry_stat.st_mtime, # folder modification time
+			"ctime": entry_stat.st_ctime, # folder creation time
+			"atime": entry_stat.st_atime, # folder access time
+			"files": 0, # number of files
+			"folders": 0, # number of subfolders
+			"access_denied": False, # whether access is denied
+			"ino": entry_stat.st_ino, # inode, lets incremental scans detect replaced folders
+			"children": [], # folder structure
+		}, syscalls
+	elif stat.S_ISREG(mode): # path is a file
+		needs_deep = False
+		cache_entry = None
+		try:
+			if mime_sniffer is not None:
+				mime_type, needs_deep = guess_mime_type(entry.path, entry_stat.st_size, magic_max_size, force_magic)
+				if needs_deep and mime_cache is not None:
+					cache_entry = FileCache.entry_for(entry.path, entry_stat)
+					cached = mime_cache.get(cache_entry)
+					if cached is not None:
+						mime_type, needs_deep = cached, False
+			else:
+				mime_type = get_mime_type(entry.path, magic_max_size, force_magic, use_magika, header_size=sniff_bytes, mime_cache=mime_cache, file_stat=entry_stat)
+		except Exception as e:
+			if error_logs is not None:
+				error_logs.append({"name": entry.path, "type": str(type(e).__name__), "desc": str(e)})
+			logger.warning(f"{colored_x} Error: '{GREY}{entry.path}{RESET}' due to {e}")
+			mime_type = str(type(e).__name__)
+		record = {
+			"name": entry.name, # File name
+			"path": entry.path,
+			"type": "file", # whether it is 'folder' or 'file'
+			"mime": mime_type, # mime type
+			"size": entry_stat.st_size, # file size in bytes
+			"attr": attributes, # file attributes
+			"mtime": entry_stat.st_mtime, # last modified time
+			"ctime": entry_stat.st_ctime, # creation time
+			"atime": entry_stat.st_atime, # last accessed time
+		}
+		if needs_deep:
+			mime_sniffer.submit(record, cache_entry)
+		if content_hasher is not None:
+			content_hasher.submit(record, entry_stat)
+		return record, syscalls
+	return None, syscalls # sockets, FIFOs, devices...
+
+def update_progress(total_files, use_magika, total_size=0):
 	"""Updates the progress bar in a thread-safe way."""
 	global progress, sum_size, magic_scanned
 	with progress_lock:
 		progress += total_files
+		sum_size += total_size
 		progress_bar.update(total_files)
 		try:
 			magic_percent = (magic_scanned/progress*100) if progress > 0 else 0
@@ -1277,337 +1951,860 @@ def update_progress(total_files, use_magika):
 			magic_percent = 0
 		progress_bar.set_description(f"🕷️ | {'🔮 Magika' if use_magika else '🪄 Magic'}: {magic_scanned} [{magic_percent:.1f} %] | 📏 Total: {humanize.naturalsize(sum_size, binary=True)}")
 
+def log_access_error(path, e):
+	"""Print a warning describing why a folder could not be scanned."""
+	sys.stdout.write("\n")
+	if logger.isEnabledFor(logging.DEBUG):
+		traceback.print_exc(file=sys.stdout)
+	logger.debug(e)
+	if "PermissionError" in type(e).__name__:
+		logger.warning(f"{colored_no_entry} Permission denied: '{GREY}{path}{RESET}'")
+	elif "FileNotFoundError" in type(e).__name__:
+		logger.warning(f"❔ File not found: '{GREY}{path}{RESET}'")
+	elif "IsADirectoryError" in type(e).__name__: # Skip junctions
+		logger.warning(f"🛤️ Junction skipped: '{GREY}{path}{RESET}'")
+	elif "NotADirectoryError" in type(e).__name__:
+		logger.warning(f"🚧 Not a directory: '{GREY}{path}{RESET}'")
+	elif "FileExistsError" in type(e).__name__: # Skip symbolic links
+		logger.warning(f"🔗 Symbolic link skipped: '{GREY}{path}{RESET}'")
+	elif "OSError" in type(e).__name__:
+		logger.warning(f"🚫 Access error: '{GREY}{path}{RESET}'")
+	else:
+		logger.warning(f"{colored_x} Error: '{GREY}{path}{RESET}' due to {e}")
 
-def get_folder_structure_threaded(path, progress_bar=None, error_logs=None, no_attributes=False, max_workers=10, magic_max_size=1 * 1024 * 1024, force_magic=False, use_magika=False):
-	"""Scans a directory structure efficiently with threading and shows progress."""
-	global progress, sum_size
-	tree = []
-	total_size = 0
-	scanned_files = 0
-	scanned_folders = 0
-	denied_folders = 0
+WALK_SKIP = "skip" # returned by a `walk_tree` pre callback: do not descend into this item
+WALK_STOP = "stop" # returned by any `walk_tree` callback: end the walk
 
-	try:
-		entries = list(os.scandir(path))
-	except Exception as e:
-		denied_folders += 1
-		if error_logs is not None:
-			error_logs.append({"name": path, "type":str(type(e).__name__), "desc": str(e)})
-			sys.stdout.write("\n")
-			if logger.isEnabledFor(logging.DEBUG):
-				traceback.print_exc(file=sys.stdout)
-			logger.debug(e)
-			if "PermissionError" in type(e).__name__:
-				logger.warning(f"{colored_no_entry} Permission denied: '{GREY}{path}{RESET}'")
-			elif "OSError" in type(e).__name__:
-				logger.warning(f"🚫 Access error: '{GREY}{path}{RESET}'")
-			elif "FileNotFoundError" in type(e).__name__:
-				logger.warning(f"❔ File not found: '{GREY}{path}{RESET}'")
-			elif "IsADirectoryError" in type(e).__name__: # Skip junctions
-					logger.warning(f"🛤️ Junction skipped: '{GREY}{path}{RESET}'")
-			elif "NotADirectoryError" in type(e).__name__:
-				logger.warning(f"🚧 Not a directory: '{GREY}{path}{RESET}'")
-			elif "FileExistsError" in type(e).__name__: # Skip symbolic links
-				logger.warning(f"🔗 Symbolic link skipped: '{GREY}{path}{RESET}'")
-			else:
-				logger.warning(f"{colored_x} Error: '{GREY}{path}{RESET}' due to {e}")
-
-			tree.append({
-				"name": os.path.basename(path), # Folder name
-				"path": path,
-				"type": "folder", # whether it is 'folder' or 'file'
-				"size": 0, # folder size in bytes
-				"attr": get_file_attributes(path) if not no_attributes else None, # folder attributes
-				"mtime": os.path.getmtime(path), # folder modification time
-				"ctime": os.path.getctime(path), # folder creation time
-				"atime": os.path.getatime(path), # folder access time
-				"files": 0, # number of files
-				"folders": 0, # number of subfolders
-				"access_denied": type(e).__name__, # whether access is denied
-				"children": [], # folder structure
-			})
-		return tree, 0, 0, 0, 1
-
-
-	future_results = []
-	with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+def folder_children(item):
+	"""The listing below a record, or None if it is not a folder."""
+	return item["children"] if item["type"] == "folder" else None
+
+def iter_tree(node, descend=None):
+	"""
+	Yield every record of a tree in depth-first pre-order (the order the recursive walkers
+	used), keeping an explicit stack of listing iterators instead of recursing.
+
+	Leaving the loop early ends the walk; only the listings on the current branch are held.
+
+	Args:
+		node: A "children" listing (or any sequence of records).
+		descend (callable, optional): `descend(folder)` returns False to skip a folder's
+			children. Defaults to entering every folder.
+	"""
+	stack = [iter(node)]
+	while stack:
+		for item in stack[-1]:
+			yield item
+			if item["type"] == "folder" and (descend is None or descend(item)):
+				stack.append(iter(item["children"]))
+				break # continue this listing once the folder is done
+		else:
+			stack.pop()
+
+def walk_tree(node, pre=None, post=None, children=folder_children):
+	"""
+	Walk a tree depth-first with an explicit stack, calling back before and after each item's
+	children. Deep trees cannot hit the recursion limit.
+
+	Args:
+		node: The top-level items.
+		pre (callable, optional): `pre(item, depth)`, called before the item's children. Return
+			WALK_SKIP to not descend into it, or WALK_STOP to end the walk.
+		post (callable, optional): `post(item, depth)`, called after the children of every item
+			that was descended into. Return WALK_STOP to end the walk.
+		children (callable, optional): `children(item)` returns the items below `item`, or None
+			for a leaf. Called right after `pre`. Defaults to the "children" of folder records.
+
+	Returns:
+		bool: False if a callback stopped the walk, True otherwise.
+	"""
+	stack = [(None, iter(node))]
+	while stack:
+		depth = len(stack) - 1
+		for item in stack[-1][1]:
+			if pre is not None:
+				action = pre(item, depth)
+				if action == WALK_STOP:
+					return False
+				if action == WALK_SKIP:
+					continue
+			listing = children(item)
+			if listing is not None:
+				stack.append((item, iter(listing)))
+				break
+		else:
+			item = stack.pop()[0]
+			if item is not None and post is not None and post(item, depth - 1) == WALK_STOP:
+				return False
+	return True
+
+class _ScanJob:
+	"""A directory waiting in (or taken from) the scan queue."""
+	__slots__ = ("node", "parent", "pending", "previous")
+
+	def __init__(self, node, parent=None, previous=None):
+		self.node = node # folder record whose "children" list gets filled in
+		self.parent = parent # _ScanJob of the parent folder, None for the root
+		self.pending = 1 # unfinished work: this listing + every queued subfolder
+		self.previous = previous # same folder's record in the previous snapshot, for incremental scans
+
+class TreeScanner:
+	"""
+	Scans a directory tree with a fixed pool of worker threads sharing one job queue.
+
+	Every directory is a job on a single queue. `max_workers` threads pull jobs, list the
+	directory, append file records to the folder node and queue its subfolders. When a
+	folder's last subfolder finishes, its totals are rolled up into the parent, so the tree
+	is assembled as directories complete and the thread count never exceeds `max_workers`,
+	however deep or wide the tree is.
+
+	Parameters:
+		error_logs (list, optional): List that scan errors are appended to.
+		no_attributes (bool, optional): Skip file attribute collection. Defaults to False.
+		max_workers (int, optional): Number of worker threads. Defaults to 10.
+		magic_max_size (int, optional): File size threshold for deep MIME detection. Defaults to 1 MiB.
+		force_magic (bool, optional): Force deep MIME detection. Defaults to False.
+		use_magika (bool, optional): Use Magika instead of libmagic. Defaults to False.
+		progress_bar (tqdm.tqdm, optional): Progress bar updated through `update_progress`.
+		mime_sniffer (MimeSniffer, optional): Stage that sniffs file contents off the walker threads.
+		sniff_bytes (int, optional): Leading bytes read for inline sniffing (0 = whole file).
+		mime_cache (FileCache, optional): Persistent cache consulted before deep MIME detection.
+		content_hasher (ContentHasher, optional): Stage that fingerprints file contents. Grafted
+			files keep the previous snapshot's hash and are only queued if they have none.
+		previous (dict, optional): Root folder of an earlier snapshot of the same path (see
+			`load_previous_snapshot`). Directories whose mtime and inode still match are not listed
+			again; their file records are grafted from the old snapshot.
+	"""
+	def __init__(self, error_logs=None, no_attributes=False, max_workers=10, magic_max_size=1 * 1024 * 1024, force_magic=False, use_magika=False, progress_bar=None, mime_sniffer=None, sniff_bytes=0, mime_cache=None, previous=None, content_hasher=None):
+		self.error_logs = error_logs if error_logs is not None else []
+		self.no_attributes = no_attributes
+		self.max_workers = max(1, int(max_workers or 1))
+		self.magic_max_size = magic_max_size
+		self.force_magic = force_magic
+		self.use_magika = use_magika
+		self.progress_bar = progress_bar
+		self.mime_sniffer = mime_sniffer
+		self.sniff_bytes = sniff_bytes
+		self.mime_cache = mime_cache
+		self.previous = previous
+		self.content_hasher = content_hasher
+
+		self.jobs = queue.Queue()
+		self.lock = threading.Lock() # guards job.pending, folder totals and counters
+		self.done = threading.Event()
+		self.stop_event = threading.Event()
+		self.denied_folders = 0
+		self.reused_folders = 0
+		self.relisted_folders = 0
+
+	def run(self, path):
+		"""
+		Scan `path` and block until every directory below it has been listed.
+
+		Returns:
+			tuple: (tree, total_size, scanned_files, scanned_folders, denied_folders)
+		"""
+		path = os.path.normpath(path) # "dir/" would give the root record an empty name
+		root = {"name": os.path.basename(path), "path": path, "type": "folder", "size": 0, "files": 0, "folders": 0, "access_denied": False, "children": []}
+		self.jobs.put(_ScanJob(root, previous=self.previous))
+		workers = [threading.Thread(target=self._worker, name=f"scan-{i}", daemon=True) for i in range(self.max_workers)]
+		for worker in workers:
+			worker.start()
+		try:
+			while not self.done.wait(0.1): # short waits keep CTRL+C responsive
+				pass
+		finally:
+			self.stop_event.set()
+			for _ in workers:
+				self.jobs.put(None) # wake idle workers so they can exit
+		if root["access_denied"]:
+			return [root], 0, 0, 0, self.denied_folders
+		return root["children"], root["size"], root["files"], root["folders"], self.denied_folders
+
+	def _worker(self):
+		"""Pull directory jobs until the scan is finished or stopped."""
+		while not self.stop_event.is_set():
+			job = self.jobs.get()
+			if job is None:
+				return
+			try:
+				self._scan_directory(job)
+			except Exception as e: # never leave a job unfinished, or run() waits forever
+				self.error_logs.append({"name": job.node["path"], "type": str(type(e).__name__), "desc": str(e)})
+				log_access_error(job.node["path"], e)
+			finally:
+				self._finish(job)
+
+	def _scan_directory(self, job):
+		"""List one directory, record its files and queue its subfolders."""
+		node = job.node
+		path = node["path"]
+		if job.previous is not None and self._graft_unchanged(job):
+			return
+		try:
+			entries = list(os.scandir(path))
+		except Exception as e:
+			with self.lock:
+				self.denied_folders += 1
+			node["access_denied"] = type(e).__name__
+			self.error_logs.append({"name": path, "type": str(type(e).__name__), "desc": str(e)})
+			log_access_error(path, e)
+			return
+
+		subfolders = []
+		files = 0
+		size = 0
+		syscalls = 0
 		for entry in entries:
-			entry_name = entry.name  # Store entry name to prevent race conditions
-			entry_path = entry.path
-			entry_stat = entry.stat(follow_symlinks=False)
-			if entry.is_symlink():
-				tree.append({
-					"name": entry_name,
-					"path": entry_path,
-					"type": "symlink",
-					"target": os.readlink(entry_path),
-					"attr": get_file_attributes(entry.path) if not no_attributes else None,
-					"size": 0,
-					"mtime": entry_stat.st_mtime,
-					"ctime": entry_stat.st_ctime,
-					"atime": entry_stat.st_atime,
-				})
-			elif entry.is_file(follow_symlinks=False):
-				try:
-					mime_type = get_mime_type(entry_path, magic_max_size, force_magic, use_magika)
-				except Exception as e:
-					error_logs.append({"name": path, "type": str(type(e).__name__), "desc": str(e)})
-					if args.verbose:
-						traceback.print_exc(file=sys.stdout)
-					logger.warning(f"{colored_x} Error: '{GREY}{entry_path}{RESET}' due to {e}")
-					mime_type = f"{type(e).__name__}"
-				file_stat = entry.stat()
-				file_size = file_stat.st_size
-				sum_size += file_size
-				tree.append({
-					"name": entry_name,
-					"path": entry_path,
-					"type": "file",
-					"mime": mime_type,
-					"size": file_size,
-					"attr": get_file_attributes(entry.path) if not no_attributes else None,
-					"mtime": file_stat.st_mtime,
-					"ctime": file_stat.st_ctime,
-					"atime": file_stat.st_atime,
-				})
-				scanned_files += 1
-				total_size += file_size
-			elif entry.is_dir(follow_symlinks=False):
-				future = executor.submit(get_folder_structure_threaded, entry_path, progress_bar, error_logs, no_attributes, max_workers, magic_max_size, force_magic, use_magika)
-				future_results.append((future, entry_name, entry_path))  # Store folder name & path safely
-				scanned_folders += 1
-
-		# Update progress
-		update_progress(scanned_files, use_magika)
-
-		for future, folder_name, folder_path in future_results:
+			if self.stop_event.is_set():
+				return
 			try:
-				children, child_size, child_files, child_folders, denied_folders = future.result()
-				total_size += child_size
-				scanned_files += child_files
-				scanned_folders += child_folders
-				entry_stat = entry.stat(follow_symlinks=False)
-				tree.append({
-					"name": folder_name,
-					"path": folder_path,
-					"type": "folder",
-					"size": child_size,
-					"attr": get_file_attributes(folder_path) if not no_attributes else None,
-					"mtime": entry_stat.st_mtime,
-					"ctime": entry_stat.st_ctime,
-					"atime": entry_stat.st_atime,
-					"files": child_files,
-					"folders": child_folders,
-					"access_denied": False,
-					"children": children,
-				})
-			except Exception as e:
-				error_logs.append({"name": path, "type":str(type(e).__name__), "desc": str(e)})
-				sys.stdout.write("\n")
-				if args.verbose:
-					traceback.print_exc(file=sys.stdout)
-				logger.debug(e)
-				if "PermissionError" in type(e).__name__:
-					logger.warning(f"{colored_no_entry} Permission denied: '{GREY}{path}{RESET}'")
-				elif "OSError" in type(e).__name__:
-					logger.warning(f"🚫 Access error: '{GREY}{path}{RESET}'")
-				elif "FileNotFoundError" in type(e).__name__:
-					logger.warning(f"❔ File not found: '{GREY}{path}{RESET}'")
-				elif "IsADirectoryError" in type(e).__name__: # Skip junctions
-					logger.warning(f"🛤️ Junction skipped: '{GREY}{path}{RESET}'")
-				elif "NotADirectoryError" in type(e).__name__:
-					logger.warning(f"🚧 Not a directory: '{GREY}{path}{RESET}'")
-				elif "FileExistsError" in type(e).__name__: # Skip symbolic links
-					logger.warning(f"🔗 Symbolic link skipped: '{GREY}{path}{RESET}'")
-				else:
-					logger.warning(f"{colored_x} Error: '{GREY}{path}{RESET}' due to {e}")
-
-				tree.append({
-					"name": folder_name, # Folder name
-					"path": folder_path,
-					"type": "folder", # whether it is 'folder' or 'file'
-					"size": 0, # folder size in bytes
-					"attr": get_file_attributes(folder_path) if not no_attributes else None, # folder attributes
-					"mtime": entry_stat.st_mtime, # folder modification time
-					"ctime": entry_stat.st_ctime, # folder creation time
-					"atime": entry_stat.st_atime, # folder access time
-					"files": 0, # number of files
-					"folders": 0, # number of subfolders
-					"access_denied": type(e).__name__, # whether access is denied
-					"children": [], # folder structure
-				})
+				record, entry_syscalls = build_entry_record(entry, self.no_attributes, self.magic_max_size, self.force_magic, self.use_magika, self.error_logs, self.mime_sniffer, self.sniff_bytes, self.mime_cache, self.content_hasher)
+				syscalls += entry_syscalls
+			except Exception as e: # entry vanished or cannot be stat'ed
+				self.error_logs.append({"name": entry.path, "type": str(type(e).__name__), "desc": str(e)})
+				log_access_error(entry.path, e)
+				continue
+			if record is None:
+				continue
+			node["children"].append(record)
+			if record["type"] == "folder":
+				subfolders.append(record)
+			elif record["type"] == "file":
+				files += 1
+				size += record["size"]
+
+		previous_folders = {item["name"]: item for item in job.previous["children"] if item["type"] == "folder"} if job.previous is not None else {}
+		with self.lock:
+			node["size"] += size
+			node["files"] += files
+			job.pending += len(subfolders)
+			count_syscalls(len(entries), syscalls)
+			if job.previous is not None:
+				self.relisted_folders += 1
+		for child in subfolders:
+			self.jobs.put(_ScanJob(child, job, previous_folders.get(child["name"])))
+
+		if self.progress_bar is not None:
+			update_progress(files, self.use_magika, size)
+
+	def _graft_unchanged(self, job):
+		"""
+		Reuse the previous snapshot's records for a directory whose entries have not changed.
 
-	return tree, total_size, scanned_files, scanned_folders, denied_folders
+		A directory's mtime changes whenever an entry is added, removed or renamed in it, so if
+		mtime and inode still match, its files are taken from the old snapshot without listing
+		it. Subfolders are still queued, each checked against its own old record. Files rewritten
+		in place do not touch their folder's mtime, so they keep their old size and times.
+
+		Returns:
+			bool: True if the directory was grafted, False if it has to be listed.
+		"""
+		node = job.node
+		previous = job.previous
+		if previous.get("access_denied"):
+			return False
+		try:
+			live_stat = os.stat(node["path"], follow_symlinks=False)
+		except OSError:
+			return False
+		if "mtime" in node: # the record was copied from the old snapshot, refresh it from disk
+			node.update(mtime=live_stat.st_mtime, ctime=live_stat.st_ctime, atime=live_stat.st_atime, ino=live_stat.st_ino)
+		if live_stat.st_mtime != previous.get("mtime") or (previous.get("ino") and live_stat.st_ino != previous.get("ino")):
+			return False
 
-def get_folder_structure(path, progress_bar=None, error_logs=None, no_attributes=False, magic_max_size = 1 * 1024 * 1024, force_magic=False, use_magika=False, scanned_files=None, scanned_folders=None, magic_scanned=None, denied_folders=None):
+		subfolders = []
+		files = 0
+		size = 0
+		for item in previous["children"]:
+			child_path = os.path.join(node["path"], item["name"])
+			if item["type"] == "folder":
+				child = dict(item, path=child_path, size=0, files=0, folders=0, access_denied=False, children=[])
+				node["children"].append(child)
+				subfolders.append((child, item))
+			else:
+				record = item if item["path"] == child_path else dict(item, path=child_path)
+				node["children"].append(record)
+				if item["type"] == "file":
+					files += 1
+					size += item["size"]
+					if self.content_hasher is not None and "hash" not in record: # previous scan had no hashes
+						try:
+							self.content_hasher.submit(record, os.stat(child_path, follow_symlinks=False))
+						except OSError:
+							pass
+
+		with self.lock:
+			node["size"] += size
+			node["files"] += files
+			job.pending += len(subfolders)
+			count_syscalls(1, 1)
+			self.reused_folders += 1
+		for child, item in subfolders:
+			self.jobs.put(_ScanJob(child, job, item))
+
+		if self.progress_bar is not None:
+			update_progress(files, self.use_magika, size)
+		return True
+
+	def _finish(self, job):
+		"""Mark one unit of `job` as done and roll completed folders up into their parents."""
+		with self.lock:
+			job.pending -= 1
+			while job.pending == 0:
+				parent = job.parent
+				if parent is None:
+					self.done.set()
+					return
+				parent.node["size"] += job.node["size"]
+				parent.node["files"] += job.node["files"]
+				parent.node["folders"] += job.node["folders"] + 1
+				parent.pending -= 1
+				job = parent
+
+def get_folder_structure_threaded(path, progress_bar=None, error_logs=None, no_attributes=False, max_workers=10, magic_max_size=1 * 1024 * 1024, force_magic=False, use_magika=False, mime_sniffer=None, sniff_bytes=0, mime_cache=None, previous=None, content_hasher=None):
+	"""Scans a directory structure with a bounded pool of `max_workers` threads (see `TreeScanner`) and shows progress."""
+	scanner = TreeScanner(error_logs=error_logs, no_attributes=no_attributes, max_workers=max_workers, magic_max_size=magic_max_size, force_magic=force_magic, use_magika=use_magika, progress_bar=progress_bar, mime_sniffer=mime_sniffer, sniff_bytes=sniff_bytes, mime_cache=mime_cache, previous=previous, content_hasher=content_hasher)
+	return scanner.run(path)
+
+
+def get_folder_structure(path, progress_bar=None, error_logs=None, no_attributes=False, magic_max_size = 1 * 1024 * 1024, force_magic=False, use_magika=False, mime_sniffer=None, sniff_bytes=0, mime_cache=None, content_hasher=None):
 	"""
 	Get the folder structure of a given path.
 
+	Each entry is described from a single `DirEntry.stat(follow_symlinks=False)` (see `build_entry_record`).
+
 	Args:
 		path (str): The path to get the folder structure of.
 		progress_bar (tqdm.tqdm): The progress bar to update.
 
 	Returns:
-		A tuple containing the folder structure, the total size of the folder, the number of files in the folder, and the number of subfolders in the folder.
+		A tuple containing the folder structure, the total size of the folder, the number of files, the number of subfolders and the number of denied subfolders.
 	"""
 	tree = []
-	total_size = 0
-	global sum_size
-	if scanned_files == None:
-		scanned_files = 0
-	if scanned_folders == None:
-		scanned_folders = 0
-	if magic_scanned == None:
-		magic_scanned = 0
-	if denied_folders == None:
-		denied_folders = 0
+	# each frame: [folder record, its children, size, files, folders, denied] of a folder on the current branch
+	frames = [[None, tree, 0, 0, 0, 0]]
+	scanned_files = 0
+	current = None # record built by `visit` for the entry `descend` is asked about next
 
-	entries = list(os.scandir(path))
-	for entry in entries:
-		progress_bar.update(1)
-		try:
-			magic_percent = magic_scanned/scanned_files*100
-		except ZeroDivisionError:
-			magic_percent = 0
-		dyn_tqdm.set_description(f"🕵️ | {'🔮 Magika' if use_magika else '🪄 Magic'}: {magic_scanned} [{magic_percent:.1f} %] | 📏 Total: {humanize.naturalsize(sum_size, binary=True)} ")
-
-		attributes = get_file_attributes(entry.path) if not no_attributes else None
-		'''if entry.is_junction(): # path is a junction
-			entry_stat = entry.stat(follow_symlinks=False)
-			tree.append({
-				"name": entry.name, # Junction name
-				"path": entry.path,
-				"type": "junction", # whether it is 'folder' or 'file'
-				"attr": get_file_attributes(entry.path), # junction attributes
-				"size": 0, # junction size in bytes
-				"mtime": entry_stat.st_mtime, # junction modification time
-				"ctime": entry_stat.st_ctime, # junction creation time
-				"atime": entry_stat.st_atime, # junction access time
-			})'''
-
-		if entry.is_symlink(): # path is a symbolic link
-			entry_stat = entry.stat(follow_symlinks=False)
-			tree.append({
-				"name": entry.name, # Symbolic link name
-				"path": entry.path,
-				"type": "symlink", # whether it is 'folder' or 'file'
-				"target": os.readlink(entry.path),
-				"attr": attributes, # symbolic link attributes
-				"size": 0, # symbolic link size in bytes
-				"mtime": entry_stat.st_mtime, # symbolic link modification time
-				"ctime": entry_stat.st_ctime, # symbolic link creation time
-				"atime": entry_stat.st_atime, # symbolic link access time
-			})
-		elif entry.is_dir(follow_symlinks=False): # path is a directory
+	def visit(entry, depth):
+		global sum_size
+		nonlocal scanned_files, current
+		if progress_bar is not None:
+			progress_bar.update(1)
 			try:
-				scanned_folders += 1
-				children, child_size, child_files, child_folders, denied_folders = get_folder_structure(entry.path, progress_bar, magic_max_size=magic_max_size, force_magic=force_magic, use_magika=use_magika, scanned_files=scanned_files, scanned_folders=scanned_folders, magic_scanned=magic_scanned, denied_folders=denied_folders)
-				total_size += child_size
-				entry_stat = entry.stat(follow_symlinks=False)
-				tree.append({
-					"name": entry.name, # Folder name
-					"path": entry.path,
-					"type": "folder", # whether it is 'folder' or 'file'
-					"size": child_size, # folder size in bytes
-					"attr": attributes, # folder attributes
-					"mtime": entry_stat.st_mtime, # folder modification time
-					"ctime": entry_stat.st_ctime, # folder creation time
-					"atime": entry_stat.st_atime, # folder access time
-					"files": child_files, # number of files
-					"folders": child_folders, # number of subfolders
-					"access_denied": False, # whether access is denied
-					"children": children, # folder structure
-				})
-			except Exception as e:
-				error_logs.append({"name": path, "type":str(type(e).__name__), "desc": str(e)})
-				sys.stdout.write("\n")
-				if logger.isEnabledFor(logging.DEBUG):
-					traceback.print_exc(file=sys.stdout)
-				logger.debug(e)
-				if "PermissionError" in type(e).__name__:
-					logger.warning(f"{colored_no_entry} Permission denied: '{GREY}{path}{RESET}'")
-				elif "OSError" in type(e).__name__:
-					logger.warning(f"{colored_no_entry} Access error: '{GREY}{path}{RESET}'")
-				elif "FileNotFoundError" in type(e).__name__:
-					logger.warning(f"❔ File not found: '{GREY}{path}{RESET}'")
-				elif "IsADirectoryError" in type(e).__name__: # Skip junctions
-					logger.warning(f"🛤️ Junction skipped: '{GREY}{path}{RESET}'")
-				elif "NotADirectoryError" in type(e).__name__:
-					logger.warning(f"🚧 Not a directory: '{GREY}{path}{RESET}'")
-				elif "FileExistsError" in type(e).__name__: # Skip symbolic links
-					logger.warning(f"🔗 Symbolic link skipped: '{GREY}{path}{RESET}'")
-				else:
-					logger.warning(f"{colored_x} Error: '{GREY}{path}{RESET}' due to {e}")
-				entry_stat = entry.stat(follow_symlinks=False)
-				tree.append({
-					"name": entry.name, # Folder name
-					"path": entry.path,
-					"type": "folder", # whether it is 'folder' or 'file'
-					"size": 0, # folder size in bytes
-					"attr": attributes, # folder attributes
-					"mtime": entry_stat.st_mtime, # folder modification time
-					"ctime": entry_stat.st_ctime, # folder creation time
-					"atime": entry_stat.st_atime, # folder access time
-					"files": 0, # number of files
-					"folders": 0, # number of subfolders
-					"access_denied": type(e).__name__, # whether access is denied
-					"children": [], # folder structure
-				})
-				pass  # Skip folders where permission is denied
-
-
-		elif entry.is_file(follow_symlinks=False): # path is a file
-			try:
-				mime_type = get_mime_type(entry.path, magic_max_size, force_magic, use_magika)
-			except Exception as e:
-				error_logs.append({"name": path, "type": str(type(e).__name__), "desc": str(e)})
-				if args.verbose:
-					traceback.print_exc(file=sys.stdout)
-				logger.warning(f"{colored_x} Error: '{GREY}{path}{RESET}' due to {e}")
-				mime_type = str(type(e).__name__)
+				magic_percent = magic_scanned/scanned_files*100
+			except ZeroDivisionError:
+				magic_percent = 0
+			progress_bar.set_description(f"🕵️ | {'🔮 Magika' if use_magika else '🪄 Magic'}: {magic_scanned} [{magic_percent:.1f} %] | 📏 Total: {humanize.naturalsize(sum_size, binary=True)} ")
+
+		try:
+			record, entry_syscalls = build_entry_record(entry, no_attributes, magic_max_size, force_magic, use_magika, error_logs, mime_sniffer, sniff_bytes, mime_cache, content_hasher)
+			count_syscalls(0, entry_syscalls)
+		except Exception as e: # entry vanished or cannot be stat'ed
+			if error_logs is not None:
+				error_logs.append({"name": entry.path, "type": str(type(e).__name__), "desc": str(e)})
+			log_access_error(entry.path, e)
+			return WALK_SKIP
+		if record is None:
+			return WALK_SKIP
+		frame = frames[-1]
+		frame[1].append(record)
+		if record["type"] == "folder": # path is a directory
+			frame[4] += 1
+		elif record["type"] == "file": # path is a file
+			frame[2] += record["size"]
+			frame[3] += 1
 			scanned_files += 1
-			file_size = entry.stat().st_size
-			total_size += file_size
-			# mime_type, _ = mimetyp	es.guess_type(entry.path)
-			tree.append({
-				"name": entry.name, # File name
-				"path": entry.path,
-				"type": "file", # whether it is 'folder' or 'file'
-				"mime": mime_type, # mime type
-				"size": file_size, # file size in bytes
-				"attr": attributes, # file attributes
-				"mtime": entry.stat().st_mtime, # last modified time
-				"ctime": entry.stat().st_ctime, # creation time
-				"atime": entry.stat().st_atime, # last accessed time
-			})
-			total_size += file_size
-			sum_size += file_size
+			sum_size += record["size"]
+		current = record
+
+	def descend(entry):
+		record = current
+		if record["type"] != "folder":
+			return None
+		try:
+			entries = list(os.scandir(entry.path))
+		except Exception as e: # Skip folders where permission is denied
+			if error_logs is not None:
+				error_logs.append({"name": entry.path, "type":str(type(e).__name__), "desc": str(e)})
+			log_access_error(entry.path, e)
+			record["access_denied"] = type(e).__name__
+			frames[-1][5] += 1
+			return None
+		count_syscalls(len(entries), 0)
+		frames.append([record, [], 0, 0, 0, 0])
+		return entries
+
+	def leave(entry, depth):
+		record, children, size, files, folders, denied = frames.pop()
+		record.update({"size": size, "files": files, "folders": folders, "children": children})
+		parent = frames[-1]
+		parent[2] += size
+		parent[3] += files
+		parent[4] += folders
+		parent[5] += denied
+
+	entries = list(os.scandir(path))
+	count_syscalls(len(entries), 0)
+	walk_tree(entries, visit, leave, descend)
+	_, tree, total_size, scanned_files, scanned_folders, denied_folders = frames[0]
 	return tree, total_size, scanned_files, scanned_folders, denied_folders
 
 
-def get_json_size(data):
-	"""Efficiently calculates JSON size by writing it to a temporary file."""
-	with tempfile.NamedTemporaryFile(delete=True, mode="w", encoding="utf-8") as temp:
-		json.dump(data, temp)  # Stream JSON to file
-		temp.flush()  # Ensure data is written
-		return os.path.getsize(temp.name)  # Get file size
+# Snapshot codecs: name -> (magic bytes, file extension, default level)
+SNAPSHOT_CODECS = {
+	"bz2": (b"BZh", ".bz2", 9),
+	"gzip": (b"\x1f\x8b", ".gz", 6),
+	"lzma": (b"\xfd7zXZ\x00", ".xz", 6),
+	"zstd": (b"\x28\xb5\x2f\xfd", ".zst", 3),
+}
+SNAPSHOT_EXTENSIONS = tuple(".json" + extension for _, extension, _ in SNAPSHOT_CODECS.values())
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+
+def check_codec(codec):
+	"""Raise if `codec` is unknown or its module is not installed. None means uncompressed JSON."""
+	if codec is not None and codec not in SNAPSHOT_CODECS:
+		raise ValueError(f"Unknown codec: {codec} (choose from {', '.join(SNAPSHOT_CODECS)})")
+	if codec == "zstd" and "zstandard" not in sys.modules:
+		raise ModuleNotFoundError("zstd snapshots need the zstandard module: `pip install zstandard`")
+
+def detect_codec(file_path):
+	"""
+	Detect a snapshot's codec from its first bytes, whatever its file extension.
+
+	Returns:
+		str: Codec name from `SNAPSHOT_CODECS`, or None for uncompressed JSON.
+	"""
+	with open(file_path, 'rb') as f:
+		return codec_from_magic(f.read(6))
+
+def codec_from_magic(data):
+	"""Codec name whose magic bytes `data` starts with, or None."""
+	for codec, (magic_bytes, _, _) in SNAPSHOT_CODECS.items():
+		if data.startswith(magic_bytes):
+			return codec
+	return None
+
+def compress_block(codec, level, data):
+	"""Compress `data` into one complete stream; concatenated streams decompress as one."""
+	if codec == "bz2":
+		return bz2.compress(data, level)
+	elif codec == "gzip":
+		return gzip.compress(data, compresslevel=level)
+	elif codec == "lzma":
+		return lzma.compress(data, preset=level)
+	elif codec == "zstd":
+		return zstandard.ZstdCompressor(level=level).compress(data)
+	return data
+
+def decompress_block(data):
+	"""Decompress one stream written by `compress_block`, detecting its codec from the magic bytes."""
+	codec = codec_from_magic(data)
+	check_codec(codec)
+	if codec == "bz2":
+		return bz2.decompress(data)
+	elif codec == "gzip":
+		return gzip.decompress(data)
+	elif codec == "lzma":
+		return lzma.decompress(data)
+	elif codec == "zstd":
+		return zstandard.ZstdDecompressor().decompress(data)
+	return data
+
+class ParallelBlockWriter:
+	"""
+	Binary writer that compresses fixed-size blocks on a process pool (see `process_pool`).
+
+	Each block becomes an independent stream and the streams are written in order, which
+	bz2, gzip, xz and zstd readers all accept as one multi-stream file. At most two blocks per
+	worker are in flight, so memory stays bounded while the pool is busy.
 
-# Version 3
-def compress_json_stream(data, output_file, chunk_size=8192, message="🗜️ Compressing JSON..."):
-	"""Compress JSON data efficiently using streaming (avoiding memory overhead)."""
+	Args:
+		file_path (str): Output file.
+		codec (str): Codec name from `SNAPSHOT_CODECS`.
+		level (int): Compression level.
+		workers (int): Number of compressing processes.
+		block_size (int, optional): Uncompressed bytes per block.
+	"""
+	def __init__(self, file_path, codec, level, workers, block_size=DEFAULT_BLOCK_SIZE):
+		self.codec = codec
+		self.level = level
+		self.block_size = block_size
+		self.max_pending = max(1, workers) * 2
+		self.f_out = open(file_path, 'wb')
+		self.executor = process_pool(workers)
+		self.pending = deque()
+		self.buffer = bytearray()
+
+	def write(self, data):
+		self.buffer += data
+		while len(self.buffer) >= self.block_size:
+			self._submit(bytes(self.buffer[:self.block_size]))
+			del self.buffer[:self.block_size]
+		return len(data)
+
+	def _submit(self, block):
+		self.pending.append(self.executor.submit(compress_block, self.codec, self.level, block))
+		while len(self.pending) > self.max_pending:
+			self.f_out.write(self.pending.popleft().result())
+
+	def close(self):
+		"""Compress what is left, write every block in order and stop the pool."""
+		try:
+			if self.buffer:
+				self._submit(bytes(self.buffer))
+				self.buffer = bytearray()
+			while self.pending:
+				self.f_out.write(self.pending.popleft().result())
+		finally:
+			for future in self.pending:
+				future.cancel()
+			self.executor.shutdown(wait=True)
+			self.f_out.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc, tb):
+		if exc_type is not None: # drop unfinished blocks, the file is discarded anyway
+			self.pending.clear()
+			self.buffer = bytearray()
+		self.close()
+
+def open_snapshot_writer(file_path, codec="bz2", level=None, workers=0):
+	"""
+	Open a binary writer that compresses into `file_path`.
+
+	Args:
+		file_path (str): Output file.
+		codec (str, optional): Codec name from `SNAPSHOT_CODECS`, None writes plain JSON.
+		level (int, optional): Compression level, defaults to the codec's default.
+		workers (int, optional): More than 1 compresses independent blocks on that many
+			processes (see `ParallelBlockWriter`). Defaults to 0 (one stream).
+	"""
+	check_codec(codec)
+	if codec is None:
+		return open(file_path, 'wb')
+	if level is None:
+		level = SNAPSHOT_CODECS[codec][2]
+	if workers and workers > 1:
+		return ParallelBlockWriter(file_path, codec, level, workers)
+	if codec == "bz2":
+		return bz2.BZ2File(file_path, 'wb', compresslevel=level)
+	elif codec == "gzip":
+		return gzip.GzipFile(file_path, 'wb', compresslevel=level)
+	elif codec == "lzma":
+		return lzma.LZMAFile(file_path, 'wb', preset=level)
+	return zstandard.ZstdCompressor(level=level).stream_writer(open(file_path, 'wb'))
+
+def open_snapshot_reader(file_path):
+	"""Open a snapshot for binary reading, detecting its codec from the magic bytes."""
+	codec = detect_codec(file_path)
+	check_codec(codec)
+	if codec == "bz2":
+		return bz2.open(file_path, 'rb')
+	elif codec == "gzip":
+		return gzip.open(file_path, 'rb')
+	elif codec == "lzma":
+		return lzma.open(file_path, 'rb')
+	elif codec == "zstd":
+		return zstandard.ZstdDecompressor().stream_reader(open(file_path, 'rb'), read_across_frames=True, closefd=True)
+	return open(file_path, 'rb')
+
+# Schema 2 drops each record's "path": it is the parent's path + separator + name, with
+# report_info["path_prefix"] in front of top-level names. Records whose path does not
+# follow that rule keep it. Schema 1 snapshots store every path.
+SNAPSHOT_SCHEMA_VERSION = 2
+
+def detect_path_prefix(structure):
+	"""
+	Work out the prefix and separator that turn top-level names back into their paths.
+
+	Returns:
+		tuple: (prefix, sep), prefix ends with the separator; ("", os.sep) if no record tells.
+	"""
+	for record in structure:
+		name, path = record.get("name"), record.get("path")
+		if isinstance(name, str) and name and isinstance(path, str) and path.endswith(name) and len(path) > len(name):
+			prefix = path[:-len(name)]
+			return prefix, prefix[-1] if prefix[-1] in "/\\" else os.sep
+	return "", os.sep
+
+def record_to_json(record, parent_path, prefix, sep, skip=("children",)):
+	"""Dump a record without the `skip` keys, and without "path" when a reader can derive it."""
+	fields = {key: value for key, value in record.items() if key not in skip}
+	if "path" in fields:
+		name = fields.get("name", "")
+		if fields["path"] == (prefix + name if parent_path is None else f"{parent_path}{sep}{name}"):
+			del fields["path"]
+	return json.dumps(fields, separators=(',', ':'))
+
+def schema_report_info(report_info, prefix, sep):
+	"""Copy of `report_info` stamped with the schema version and path prefix the records need."""
+	return dict(report_info, schema_version=SNAPSHOT_SCHEMA_VERSION, path_prefix=prefix, path_separator=sep)
+
+def restore_paths(data):
+	"""Give every record of a schema 2 snapshot its "path" back, in place. Older snapshots are left alone."""
+	report_info = data.get("report_info") or {}
+	if report_info.get("schema_version", 1) < 2:
+		return data
+	prefix = report_info.get("path_prefix", "")
+	sep = report_info.get("path_separator", os.sep)
+	stack = [(data["structure"], None)]
+	while stack:
+		records, parent_path = stack.pop()
+		for record in records:
+			if "path" not in record:
+				name = record.get("name", "")
+				record["path"] = prefix + name if parent_path is None else f"{parent_path}{sep}{name}"
+			if isinstance(record.get("children"), list):
+				stack.append((record["children"], record["path"]))
+	return data
+
+def iter_snapshot_json(data, chunk_size=8192):
+	"""
+	Yield a snapshot as compact JSON text in chunks of about `chunk_size` characters.
+
+	Records are dumped one at a time in schema 2 (see `SNAPSHOT_SCHEMA_VERSION`), a folder's
+	"children" last. Anything that is not a snapshot goes through `json_iter_encode`.
+	"""
+	if not isinstance(data, dict) or "structure" not in data or "report_info" not in data:
+		yield from json_iter_encode(data, chunk_size)
+		return
+	prefix, sep = detect_path_prefix(data["structure"])
+	buffer = ["{"]
+	buffered = 1
+	for position, (key, value) in enumerate(data.items()):
+		buffer.append(("," if position else "") + json.dumps(key) + ":")
+		if key == "report_info":
+			buffer.append(json.dumps(schema_report_info(value, prefix, sep), separators=(',', ':')))
+			continue
+		elif key != "structure":
+			buffer.append(json.dumps(value, separators=(',', ':'), default=columnar_to_json))
+			continue
+		buffer.append("[")
+		stack = [(iter(value), None, True)] # (records left, folder path, first item still to come)
+		while stack:
+			records, parent_path, first = stack[-1]
+			record = next(records, None)
+			if record is None:
+				stack.pop()
+				buffer.append("]}" if stack else "]")
+				continue
+			if not first:
+				buffer.append(",")
+			else:
+				stack[-1] = (records, parent_path, False)
+			if record.get("type") == "folder" and "children" in record:
+				head = record_to_json(record, parent_path, prefix, sep)
+				buffer.append(head[:-1] + (',"children":[' if head != "{}" else '"children":['))
+				stack.append((iter(record["children"]), record.get("path"), True))
+			else:
+				buffer.append(record_to_json(record, parent_path, prefix, sep))
+			buffered += len(buffer[-1])
+			if buffered >= chunk_size:
+				yield "".join(buffer)
+				buffer = []
+				buffered = 0
+	buffer.append("}")
+	yield "".join(buffer)
+
+class StreamingJsonWriter:
+	"""
+	Writes a snapshot record by record, so the tree is never held in memory.
+
+	The file is the same `{"structure": [...], "report_info": {...}}` document that
+	`compress_json_stream` writes, except that a folder's totals (size, files, folders,
+	access_denied) follow its "children" list, because they are only known once the folder
+	has been walked. JSON readers do not care about key order.
+
+	Args:
+		output_file (str): Final snapshot path, or None to only count the bytes (simulate).
+		chunk_size (int, optional): Encoded text is buffered up to this size before compressing.
+		codec, level, workers: Passed to `open_snapshot_writer`.
+		root_path (str, optional): Folder being scanned, lets records leave out their "path"
+			(schema 2, see `SNAPSHOT_SCHEMA_VERSION`).
+	"""
+	def __init__(self, output_file, chunk_size=64 * 1024, codec="bz2", level=None, workers=0, root_path=None):
+		self.output_file = output_file
+		self.chunk_size = chunk_size
+		self.temp_file = os.path.join(tempfile.gettempdir(), os.path.basename(output_file) + ".tmp") if output_file else None
+		self.f_out = open_snapshot_writer(self.temp_file, codec, level, workers) if self.temp_file else None
+		self.buffer = []
+		self.buffered = 0
+		self.original_size = 0
+		self.first = [True] # one flag per open list: no comma before its first item
+		self.prefix = os.path.join(root_path, "") if root_path else ""
+		self.sep = os.sep
+		self.folder_paths = [None] # path of each open folder, None for the top level
+		self._write('{"structure":[')
+
+	def _write(self, text):
+		self.buffer.append(text)
+		self.buffered += len(text)
+		if self.buffered >= self.chunk_size:
+			self.flush()
+
+	def flush(self):
+		"""Compress everything buffered so far."""
+		data = "".join(self.buffer).encode('utf-8')
+		self.buffer = []
+		self.buffered = 0
+		self.original_size += len(data)
+		if self.f_out is not None:
+			self.f_out.write(data)
+
+	def _separator(self):
+		if self.first[-1]:
+			self.first[-1] = False
+			return ""
+		return ","
+
+	def write_record(self, record):
+		"""Write a complete file, symlink or folder record into the current list."""
+		self._write(self._separator() + record_to_json(record, self.folder_paths[-1], self.prefix, self.sep, skip=()))
+
+	def open_folder(self, record):
+		"""Start a folder record; its children follow until `close_folder`."""
+		head = record_to_json(record, self.folder_paths[-1], self.prefix, self.sep, skip=("size", "files", "folders", "access_denied", "children"))
+		self._write(self._separator() + head[:-1] + (',"children":[' if head != "{}" else '"children":['))
+		self.first.append(True)
+		self.folder_paths.append(record["path"])
+
+	def close_folder(self, size, files, folders, access_denied=False):
+		"""End the folder opened last, writing its totals after the children."""
+		self.first.pop()
+		self.folder_paths.pop()
+		self._write("]," + json.dumps({"size": size, "files": files, "folders": folders, "access_denied": access_denied}, separators=(',', ':'))[1:])
+
+	def finish(self, report_info):
+		"""
+		Write the report and move the snapshot into place.
+
+		Returns:
+			tuple: (original_size, compressed_size) in bytes, compressed_size is 0 when simulating.
+		"""
+		self._write('],"report_info":' + json.dumps(schema_report_info(report_info, self.prefix, self.sep), separators=(',', ':')) + '}')
+		self.flush()
+		if self.f_out is None:
+			return self.original_size, 0
+		self.f_out.close()
+		compressed_size = os.path.getsize(self.temp_file)
+		shutil.move(self.temp_file, self.output_file)
+		return self.original_size, compressed_size
+
+	def abort(self):
+		"""Drop the partly written snapshot."""
+		if self.f_out is not None:
+			self.f_out.close()
+			if os.path.exists(self.temp_file):
+				os.remove(self.temp_file)
+
+def stream_folder_structure(path, writer, progress_bar=None, error_logs=None, no_attributes=False, magic_max_size=1 * 1024 * 1024, force_magic=False, use_magika=False, sniff_bytes=0, mime_cache=None, content_hasher=None):
+	"""
+	Walk `path` depth-first and hand every record to a `StreamingJsonWriter` as it is built.
+
+	Only the listings of the folders on the current branch are kept in memory. MIME types
+	are detected inline (through `mime_cache`), since a record cannot be patched once written;
+	for the same reason `content_hasher` must hash inline (0 workers).
+
+	Returns:
+		tuple: (total_size, scanned_files, scanned_folders, denied_folders)
+	"""
+	global sum_size
+	denied_folders = 0
+	try:
+		entries = list(os.scandir(path))
+	except Exception as e:
+		if error_logs is not None:
+			error_logs.append({"name": path, "type": str(type(e).__name__), "desc": str(e)})
+		log_access_error(path, e)
+		path = os.path.normpath(path)
+		writer.write_record({"name": os.path.basename(path), "path": path, "type": "folder", "size": 0, "files": 0, "folders": 0, "access_denied": type(e).__name__, "children": []})
+		return 0, 0, 0, 1
+	# each frame: [size, files, folders] of a folder still being written
+	frames = [[0, 0, 0]]
+	current = None # record built by `visit` for the entry `descend` is asked about next
+
+	def visit(entry, depth):
+		global sum_size
+		nonlocal current
+		try:
+			record, syscalls = build_entry_record(entry, no_attributes, magic_max_size, force_magic, use_magika, error_logs, None, sniff_bytes, mime_cache, content_hasher)
+		except Exception as e: # entry vanished or cannot be stat'ed
+			if error_logs is not None:
+				error_logs.append({"name": entry.path, "type": str(type(e).__name__), "desc": str(e)})
+			log_access_error(entry.path, e)
+			return WALK_SKIP
+		count_syscalls(1, syscalls)
+		if record is None:
+			return WALK_SKIP
+		if progress_bar is not None:
+			progress_bar.update(1)
+		if record["type"] != "folder":
+			writer.write_record(record)
+			if record["type"] == "file":
+				frames[-1][0] += record["size"]
+				frames[-1][1] += 1
+				sum_size += record["size"]
+		current = record
+
+	def descend(entry):
+		nonlocal denied_folders
+		record = current
+		if record["type"] != "folder":
+			return None
+		try:
+			entries = list(os.scandir(entry.path))
+		except Exception as e: # Skip folders where permission is denied
+			if error_logs is not None:
+				error_logs.append({"name": entry.path, "type": str(type(e).__name__), "desc": str(e)})
+			log_access_error(entry.path, e)
+			record["access_denied"] = type(e).__name__
+			denied_folders += 1
+			writer.write_record(record)
+			frames[-1][2] += 1
+			return None
+		writer.open_folder(record)
+		frames.append([0, 0, 0])
+		return entries
+
+	def leave(entry, depth):
+		size, files, folders = frames.pop()
+		writer.close_folder(size, files, folders)
+		parent = frames[-1]
+		parent[0] += size
+		parent[1] += files
+		parent[2] += folders + 1
+
+	walk_tree(entries, visit, leave, descend)
+	return frames[0][0], frames[0][1], frames[0][2], denied_folders
+
+
+# Version 4
+def compress_json_stream(data, output_file, chunk_size=8192, message="🗜️ Compressing JSON...", codec="bz2", level=None, workers=0):
+	"""
+	Compress JSON data efficiently using streaming (avoiding memory overhead).
+
+	The data is serialized once; progress shows the JSON bytes written so far, and the
+	original size is counted on the way instead of serializing everything beforehand.
+	`codec`, `level` and `workers` are passed to `open_snapshot_writer`.
+	"""
 	if not isinstance(chunk_size, int):
 		raise TypeError(f"Expected 'chunk_size' to be an integer, but got {type(chunk_size).__name__}")
 	
 	temp_dir = tempfile.gettempdir()  # Use temp directory
-	temp_file = os.path.join(temp_dir, os.path.basename(output_file) + ".tmp.bz2")  # Temporary file path
-	print("🧮 Calculating original size...")
-	original_size = get_json_size(data)  # Get original size in bytes
+	temp_file = os.path.join(temp_dir, os.path.basename(output_file) + ".tmp")  # Temporary file path
+	original_size = 0
 	try:
-		with bz2.BZ2File(temp_file, 'wb', compresslevel=9) as f_out:
-			with tqdm(desc=message, total=original_size, unit="B", unit_scale=True) as dyn_tqdm:
-				for chunk in json_iter_encode(data, chunk_size):
-					f_out.write(chunk.encode('utf-8'))  # Write chunk
-					dyn_tqdm.update(len(chunk))  # Update progress
+		with open_snapshot_writer(temp_file, codec, level, workers) as f_out:
+			with new_progress_bar(desc=message, unit="B", unit_scale=True) as dyn_tqdm:
+				for chunk in iter_snapshot_json(data, chunk_size):
+					encoded = chunk.encode('utf-8')
+					f_out.write(encoded)  # Write chunk
+					original_size += len(encoded)
+					dyn_tqdm.update(len(encoded))  # Update progress
 		compressed_size = os.path.getsize(temp_file)  # Get compressed size in bytes
 		shutil.move(temp_file, output_file)  # Move to final location if successful
 		print(f"✅ Compression successful! File saved at: {output_file}")
@@ -1623,17 +2820,337 @@ def compress_json_stream(data, output_file, chunk_size=8192, message="🗜️ Co
 
 def json_iter_encode(data, chunk_size=8192):
 	"""Yield JSON data in small chunks instead of loading the full JSON into memory."""
-	encoder = json.JSONEncoder(separators=(',', ':'))  # Compact JSON formatting
-	buffer = ""
+	encoder = json.JSONEncoder(separators=(',', ':'), default=columnar_to_json)  # Compact JSON formatting, columnar trees too
+	buffer = []
+	buffered = 0
 
 	for chunk in encoder.iterencode(data):
-		buffer += str(chunk)  # Ensure `chunk` is always a string
-		while len(buffer) >= chunk_size:
-			yield buffer[:chunk_size]  # Yield fixed-size chunks
-			buffer = buffer[chunk_size:]  # Keep the remaining part
+		buffer.append(chunk)
+		buffered += len(chunk)
+		if buffered >= chunk_size: # join once per chunk instead of re-slicing a growing string
+			yield "".join(buffer)
+			buffer = []
+			buffered = 0
 
 	if buffer:  # Yield any remaining data
-		yield buffer
+		yield "".join(buffer)
+
+# Indexed snapshots: a binary container whose folder listings can be decoded one at a time.
+#
+#   magic | block | block | ... | index | index offset (u64 LE) | magic
+#
+# Blocks and the index are each a u32 LE length followed by one stream from `compress_block`,
+# so their codec is told by the stream's own magic bytes. A block is a JSON list of folder
+# listings, a listing a list of schema 2 records (see `SNAPSHOT_SCHEMA_VERSION`) in which a
+# folder's "children" is the number of its own listing. The index is a JSON object with
+# report_info and one [folder path, block offset, slot in block, entries] row per listing.
+INDEXED_SNAPSHOT_MAGIC = b"TSPIDX01"
+INDEXED_SNAPSHOT_EXTENSION = ".tsnap"
+INDEXED_BLOCK_SIZE = 256 * 1024 # uncompressed, small enough to decode on every `cd`
+
+def is_indexed_snapshot(file_path):
+	"""Return True if `file_path` starts like an indexed snapshot (see `INDEXED_SNAPSHOT_MAGIC`)."""
+	with open(file_path, 'rb') as f:
+		return f.read(len(INDEXED_SNAPSHOT_MAGIC)) == INDEXED_SNAPSHOT_MAGIC
+
+class IndexedSnapshotWriter:
+	"""
+	Writes an indexed snapshot (see `INDEXED_SNAPSHOT_MAGIC`) through the same calls as
+	`StreamingJsonWriter`, so a streamed scan can write one too.
+
+	A folder's listing is complete once the folder is closed, so listings are written deepest
+	first and only the listings of the folders on the current branch are held in memory.
+
+	Args:
+		output_file (str): Final snapshot path, or None to only count the bytes (simulate).
+		codec (str, optional): Codec from `SNAPSHOT_CODECS` for the blocks and the index.
+		level (int, optional): Compression level, None uses the codec's default.
+		root_path (str, optional): Folder being scanned, lets records leave out their "path".
+		block_size (int, optional): Uncompressed bytes of listings per block.
+	"""
+	def __init__(self, output_file, codec="bz2", level=None, root_path=None, block_size=INDEXED_BLOCK_SIZE):
+		check_codec(codec)
+		self.output_file = output_file
+		self.codec = codec
+		self.level = SNAPSHOT_CODECS[codec][2] if level is None and codec is not None else level
+		self.block_size = block_size
+		self.temp_file = os.path.join(tempfile.gettempdir(), os.path.basename(output_file) + ".tmp") if output_file else None
+		self.f_out = open(self.temp_file, 'wb') if self.temp_file else None
+		self.offset = 0
+		self.original_size = 0
+		self.block = [] # encoded listings of the block being filled
+		self.block_rows = [] # their index rows, which get the block's offset when it is written
+		self.buffered = 0
+		self.rows = [] # [folder path, block offset, slot, entries] per listing
+		self.prefix = os.path.join(root_path, "") if root_path else ""
+		self.sep = os.sep
+		self.folders = [[None, None, []]] # [record, path, encoded children] per open folder, the top level first
+		self._write_bytes(INDEXED_SNAPSHOT_MAGIC)
+
+	def _write_bytes(self, data):
+		if self.f_out is not None:
+			self.f_out.write(data)
+		self.offset += len(data)
+
+	def _write_stream(self, data):
+		"""Compress `data` into one length-prefixed stream."""
+		self.original_size += len(data)
+		if self.f_out is not None:
+			data = compress_block(self.codec, self.level, data)
+		self._write_bytes(struct.pack("<I", len(data)) + data)
+
+	def _add_listing(self, path, encoded):
+		"""Queue a folder's encoded children for the current block and return the listing number."""
+		listing = "[" + ",".join(encoded) + "]"
+		self.rows.append([path, None, len(self.block), len(encoded)])
+		self.block_rows.append(self.rows[-1])
+		self.block.append(listing)
+		self.buffered += len(listing)
+		if self.buffered >= self.block_size:
+			self.flush()
+		return len(self.rows) - 1
+
+	def flush(self):
+		"""Compress the listings queued so far into a block."""
+		if not self.block:
+			return
+		for row in self.block_rows:
+			row[1] = self.offset
+		self._write_stream(("[" + ",".join(self.block) + "]").encode('utf-8'))
+		self.block = []
+		self.block_rows = []
+		self.buffered = 0
+
+	def write_record(self, record):
+		"""Add a complete file, symlink or folder record to the current listing."""
+		folder = self.folders[-1]
+		folder[2].append(record_to_json(record, folder[1], self.prefix, self.sep, skip=()))
+
+	def open_folder(self, record):
+		"""Start a folder record; its children follow until `close_folder`."""
+		self.folders.append([{key: value for key, value in record.items() if key != "children"}, record["path"], []])
+
+	def close_folder(self, size, files, folders, access_denied=False):
+		"""End the folder opened last, writing its listing and giving it its totals."""
+		record, path, encoded = self.folders.pop()
+		record.update(size=size, files=files, folders=folders, access_denied=access_denied)
+		record["children"] = self._add_listing(path, encoded)
+		self.write_record(record)
+
+	def finish(self, report_info):
+		"""
+		Write the top-level listing, the index and the footer, and move the snapshot into place.
+
+		Returns:
+			tuple: (original_size, compressed_size) in bytes, compressed_size is 0 when simulating.
+		"""
+		root = self._add_listing(None, self.folders.pop()[2])
+		self.flush()
+		index_offset = self.offset
+		index = {"report_info": schema_report_info(report_info, self.prefix, self.sep), "root": root, "listings": self.rows}
+		self._write_stream(json.dumps(index, separators=(',', ':')).encode('utf-8'))
+		self._write_bytes(struct.pack("<Q", index_offset) + INDEXED_SNAPSHOT_MAGIC)
+		if self.f_out is None:
+			return self.original_size, 0
+		self.f_out.close()
+		compressed_size = os.path.getsize(self.temp_file)
+		shutil.move(self.temp_file, self.output_file)
+		return self.original_size, compressed_size
+
+	def abort(self):
+		"""Drop the partly written snapshot."""
+		if self.f_out is not None:
+			self.f_out.close()
+			if os.path.exists(self.temp_file):
+				os.remove(self.temp_file)
+
+def write_indexed_snapshot(data, output_file, codec="bz2", level=None, message="🗂️ Writing indexed snapshot..."):
+	"""
+	Write an in-memory snapshot as an indexed snapshot (see `IndexedSnapshotWriter`).
+
+	Returns:
+		tuple: (original_size, compressed_size) in bytes, compressed_size is 0 if writing failed.
+	"""
+	writer = IndexedSnapshotWriter(output_file, codec, level)
+	writer.prefix, writer.sep = detect_path_prefix(data["structure"])
+	stack = [(iter(data["structure"]), None)] # (records left, folder they belong to)
+	try:
+		with new_progress_bar(desc=message, unit=" entries") as dyn_tqdm:
+			while stack:
+				records, folder = stack[-1]
+				record = next(records, None)
+				if record is None:
+					stack.pop()
+					if folder is not None:
+						writer.close_folder(folder.get("size", 0), folder.get("files", 0), folder.get("folders", 0), folder.get("access_denied", False))
+					continue
+				dyn_tqdm.update(1)
+				children = record.get("children")
+				if record.get("type") == "folder" and children:
+					writer.open_folder(record)
+					stack.append((iter(children), record))
+				else:
+					writer.write_record(record)
+		original_size, compressed_size = writer.finish(data["report_info"])
+		print(f"✅ Compression successful! File saved at: {output_file}")
+	except Exception as e:
+		if logger.isEnabledFor(logging.DEBUG):
+			traceback.print_exc(file=sys.stdout)
+		print(f"❌ Compression failed: {e}")
+		writer.abort()
+		return writer.original_size, 0
+	return original_size, compressed_size
+
+class IndexedSnapshot:
+	"""
+	Opens an indexed snapshot by reading only its index; a folder's listing is decompressed
+	the first time its "children" are used.
+
+	`data` has the shape of a loaded snapshot, `{"report_info": ..., "structure": [...]}`,
+	with `IndexedChildren` views in place of the "children" lists.
+
+	Args:
+		file_path (str): Path to the indexed snapshot.
+		cached_blocks (int, optional): Decoded blocks kept for neighbouring listings.
+	"""
+	def __init__(self, file_path, cached_blocks=8):
+		self.file_path = file_path
+		self.compressed_size = os.path.getsize(file_path)
+		footer_size = 8 + len(INDEXED_SNAPSHOT_MAGIC)
+		with open(file_path, 'rb') as f:
+			magic_bytes = f.read(len(INDEXED_SNAPSHOT_MAGIC))
+			f.seek(max(0, self.compressed_size - footer_size))
+			footer = f.read(footer_size)
+		if magic_bytes != INDEXED_SNAPSHOT_MAGIC or footer[8:] != INDEXED_SNAPSHOT_MAGIC:
+			raise ValueError(f"Not an indexed snapshot, or it is truncated: {file_path}")
+		self.index_offset = struct.unpack("<Q", footer[:8])[0]
+		index_stream = self._read_stream(self.index_offset, raw=True)
+		self.index_codec = codec_from_magic(index_stream)
+		index_bytes = decompress_block(index_stream)
+		index = json.loads(index_bytes)
+		self.rows = index["listings"]
+		self.root = index["root"]
+		report_info = index["report_info"]
+		self.prefix = report_info.get("path_prefix", "")
+		self.sep = report_info.get("path_separator", os.sep)
+		self.original_size = len(index_bytes) # grows as listings are decoded
+		self.blocks = {} # block offset -> decoded listings, least recently used first
+		self.cached_blocks = cached_blocks
+		self.decoded_listings = 0
+		self.data = {"report_info": report_info, "structure": IndexedChildren(self, self.root)}
+
+	def _read_stream(self, offset, raw=False):
+		with open(self.file_path, 'rb') as f:
+			f.seek(offset)
+			length = struct.unpack("<I", f.read(4))[0]
+			data = f.read(length)
+		return data if raw else decompress_block(data)
+
+	def _block(self, offset):
+		"""Decoded listings of the block at `offset`, through a small LRU cache."""
+		listings = self.blocks.pop(offset, None)
+		if listings is None:
+			data = self._read_stream(offset)
+			self.original_size += len(data)
+			listings = json.loads(data)
+			if len(self.blocks) >= self.cached_blocks:
+				del self.blocks[next(iter(self.blocks))]
+		self.blocks[offset] = listings
+		return listings
+
+	def _resolve(self, records, parent_path, children_of):
+		"""Give `records` their derived paths and turn listing numbers into children."""
+		prefix, sep = self.prefix, self.sep
+		for record in records:
+			if "path" not in record:
+				name = record.get("name", "")
+				record["path"] = prefix + name if parent_path is None else f"{parent_path}{sep}{name}"
+			children = record.get("children")
+			if isinstance(children, int) and not isinstance(children, bool):
+				record["children"] = children_of(children)
+		return records
+
+	def listing(self, number):
+		"""Decode one folder listing; nested folders get `IndexedChildren` views."""
+		path, offset, slot, _ = self.rows[number]
+		self.decoded_listings += 1
+		return self._resolve(self._block(offset)[slot], path, lambda child: IndexedChildren(self, child))
+
+	def load(self, derive_paths=True):
+		"""
+		Decode every block once, in file order, and return the whole snapshot as plain dicts
+		and lists, like `decompress_bz2_to_json` does for JSON snapshots.
+		"""
+		listings = []
+		offset = None
+		for _, row_offset, _, _ in self.rows:
+			if row_offset != offset:
+				offset = row_offset
+				data = self._read_stream(offset)
+				self.original_size += len(data)
+				listings.extend(json.loads(data))
+		for number, records in enumerate(listings):
+			if derive_paths:
+				self._resolve(records, self.rows[number][0], listings.__getitem__)
+			else:
+				for record in records:
+					children = record.get("children")
+					if isinstance(children, int) and not isinstance(children, bool):
+						record["children"] = listings[children]
+		return {"report_info": self.data["report_info"], "structure": listings[self.root]}
+
+	def update_report_info(self, report_info):
+		"""
+		Store a new report_info (e.g. an edited note). The blocks are copied with a new index
+		into a temporary file next to the snapshot, which then replaces it, so an interrupted
+		update leaves the old snapshot as it was.
+		"""
+		index = {"report_info": report_info, "root": self.root, "listings": self.rows}
+		data = compress_block(self.index_codec, SNAPSHOT_CODECS[self.index_codec][2] if self.index_codec else None, json.dumps(index, separators=(',', ':')).encode('utf-8'))
+		temp_file = self.file_path + ".tmp"
+		try:
+			with open(self.file_path, 'rb') as f_in, open(temp_file, 'wb') as f_out:
+				remaining = self.index_offset # magic and blocks, everything before the index
+				while remaining > 0:
+					chunk = f_in.read(min(1024 * 1024, remaining))
+					if not chunk:
+						raise ValueError(f"Indexed snapshot is truncated: {self.file_path}")
+					f_out.write(chunk)
+					remaining -= len(chunk)
+				f_out.write(struct.pack("<I", len(data)) + data + struct.pack("<Q", self.index_offset) + INDEXED_SNAPSHOT_MAGIC)
+			os.replace(temp_file, self.file_path)
+		except BaseException:
+			if os.path.exists(temp_file):
+				os.remove(temp_file)
+			raise
+		self.compressed_size = os.path.getsize(self.file_path)
+		self.data["report_info"] = report_info
+
+class IndexedChildren(Sequence):
+	"""List view of one `IndexedSnapshot` listing, decoded the first time an entry is read."""
+	__slots__ = ("snapshot", "number", "records")
+
+	def __init__(self, snapshot, number):
+		self.snapshot = snapshot
+		self.number = number
+		self.records = None
+
+	def _records(self):
+		if self.records is None:
+			self.records = self.snapshot.listing(self.number)
+		return self.records
+
+	def __len__(self): # known from the index, no decoding
+		return self.snapshot.rows[self.number][3]
+
+	def __getitem__(self, index):
+		return self._records()[index]
+
+	def __iter__(self):
+		return iter(self._records())
+
+	def __repr__(self):
+		return f"IndexedChildren({self.snapshot.rows[self.number][0]!r}, {len(self)} entries)"
 
 def edit_get_config(config_file, key, value=None, mode="edit"):
 	""" Edit or get a value from the config file. """
@@ -1676,7 +3193,42 @@ def speed_tier_emoji(speed):
 		return '⛄'
 	else:
 		return '😴'
-def save_json_tree(path_to_scan, output_file="folder_structure.json.bz2", simulate=False, no_attributes=False, magic_max_size=1 * 1024 * 1024, use_threads=False, force_magic=False, no_estimates=False, use_magika=False, max_threads=4):
+def load_previous_snapshot(snapshot_file, absolute_path):
+	"""
+	Load an earlier snapshot to base an incremental rescan on.
+
+	Args:
+		snapshot_file (str): Path to a snapshot written by `save_json_tree`.
+		absolute_path (str): Absolute path that is about to be scanned.
+
+	Returns:
+		dict: Root folder record for `TreeScanner(previous=...)`, or None if the snapshot
+			cannot be used (missing, unreadable or taken of another directory).
+	"""
+	if not snapshot_file or not os.path.isfile(snapshot_file):
+		logger.warning(f"{colored_warn} Previous snapshot not found: {snapshot_file}, doing a full scan.")
+		return None
+	try:
+		data, _, _ = decompress_bz2_to_json(snapshot_file)
+		report_info = data["report_info"]
+		structure = data["structure"]
+	except Exception as e:
+		logger.warning(f"{colored_warn} Could not read previous snapshot {snapshot_file}: {e}, doing a full scan.")
+		return None
+	if report_info.get("original_path") != absolute_path:
+		logger.warning(f"{colored_warn} Previous snapshot is of {report_info.get('original_path')}, not {absolute_path}, doing a full scan.")
+		return None
+	if len(structure) == 1 and structure[0].get("access_denied") and structure[0].get("path") == absolute_path:
+		return None # the root itself could not be listed last time
+	return {
+		"mtime": report_info.get("root_mtime"),
+		"ino": report_info.get("root_ino"),
+		"scanned_files": report_info.get("scanned_files", 0),
+		"scanned_folders": report_info.get("scanned_folders", 0),
+		"children": structure,
+	}
+
+def save_json_tree(path_to_scan, output_file="folder_structure.json.bz2", simulate=False, no_attributes=False, magic_max_size=1 * 1024 * 1024, use_threads=False, force_magic=False, no_estimates=False, use_magika=False, max_threads=4, mime_workers=0, sniff_bytes=DEFAULT_SNIFF_BYTES, use_mime_cache=True, previous_snapshot=None, stream=False, codec="bz2", compress_level=None, compress_workers=0, indexed=False, hash_files=False, hash_workers=DEFAULT_HASH_WORKERS, hash_head_bytes=DEFAULT_HASH_HEAD_BYTES, hash_full_below=DEFAULT_HASH_FULL_BELOW, hash_rate=0, use_hash_cache=True, summary=None):
 
 	"""
 	Save the folder structure of a given path as a compressed JSON file.
@@ -1692,6 +3244,34 @@ def save_json_tree(path_to_scan, output_file="folder_structure.json.bz2", simula
 			Defaults to "folder_structure.json.bz2".
 		simulate (bool, optional): If True, simulates the save operation without
 			writing the file. Defaults to False.
+		mime_workers (int, optional): Number of processes that sniff file contents
+			beside the walk (see `MimeSniffer`). 0 sniffs inline. Defaults to 0.
+		sniff_bytes (int, optional): Leading bytes read per file for deep MIME detection,
+			0 lets magic/magika read the whole file. Defaults to 8 KiB.
+		use_mime_cache (bool, optional): Reuse MIME types sniffed by earlier scans (see `FileCache`).
+			Defaults to True.
+		previous_snapshot (str, optional): Earlier snapshot of the same directory. Folders whose
+			mtime has not changed since are taken from it instead of being listed again.
+			Defaults to None (full scan).
+		stream (bool, optional): Write records to the snapshot while walking (see
+			`StreamingJsonWriter`) instead of building the tree in memory first. Walks on one
+			thread and sniffs MIME types inline. Defaults to False.
+		codec (str, optional): Snapshot codec from `SNAPSHOT_CODECS`. Defaults to "bz2".
+		compress_level (int, optional): Compression level, None uses the codec's default.
+		compress_workers (int, optional): Processes compressing independent blocks in
+			parallel (see `ParallelBlockWriter`), 0 writes a single stream. Defaults to 0.
+		indexed (bool, optional): Write an indexed snapshot (see `IndexedSnapshotWriter`) that
+			browse mode opens without decoding every folder. Blocks are compressed on this
+			process, `compress_workers` is not used. Defaults to False.
+		hash_files (bool, optional): Store a content fingerprint under "hash" in every file record
+			(see `ContentHasher`), cached by inode, size and mtime across scans. Defaults to False.
+		hash_workers (int, optional): Threads hashing beside the walk; streamed scans hash inline.
+		hash_head_bytes (int, optional): Leading bytes hashed for files above `hash_full_below`.
+		hash_full_below (int, optional): Files up to this size are hashed in full.
+		hash_rate (int, optional): Bytes per second the hashing may read (0 = unlimited).
+		use_hash_cache (bool, optional): Reuse fingerprints of unchanged files from earlier scans.
+		summary (dict, optional): Filled with the scan totals, the number of errors and, once
+			the snapshot is written, "written", "original_size" and "compressed_size".
 
 	Raises:
 		KeyboardInterrupt: If the operation is interrupted by the user.
@@ -1699,7 +3279,17 @@ def save_json_tree(path_to_scan, output_file="folder_structure.json.bz2", simula
 	global last_opened_json, config_file
 	start_time = time.time()
 	absolute_path = os.path.abspath(path_to_scan)
+	check_codec(codec)
 	edit_get_config(config_file, key="last_scan_dir", value=absolute_path, mode="edit")
+	previous = None
+	if previous_snapshot:
+		print(f"♻️ Loading previous snapshot {previous_snapshot}...")
+		previous = load_previous_snapshot(previous_snapshot, absolute_path)
+	if stream and previous is not None:
+		logger.warning(f"{colored_warn} Incremental rescans graft from the snapshot in memory, not streaming.")
+		stream = False
+	if stream:
+		mime_workers = 0 # records are written as soon as they are built, nothing left to patch
 	# total_items = sum([len(files) + len(dirs) for _, dirs, files in tqdm(os.walk(path_to_scan), desc="🥷 Scanning Directories", unit=" dir", smoothing=1.0)])
 	# Calculate total items
 
@@ -1722,7 +3312,7 @@ def save_json_tree(path_to_scan, output_file="folder_structure.json.bz2", simula
 		search_rate = 0
 		avg_dir = 0
 		dirs_count = 0
-		dyn_tqdm_walk = tqdm(os.walk(base_directory),desc="🐍 Calculate total items...", unit=" dirs", smoothing=1.0)
+		dyn_tqdm_walk = new_progress_bar(os.walk(base_directory),desc="🐍 Calculate total items...", unit=" dirs", smoothing=1.0)
 		with ThreadPoolExecutor() as executor:
 			# Get a list of subdirectories and files
 			timeStart_walk = time.time()
@@ -1740,13 +3330,15 @@ def save_json_tree(path_to_scan, output_file="folder_structure.json.bz2", simula
 
 		return total_items
 
-	if not no_estimates:
+	if previous is not None:
+		total_items = previous["scanned_files"] + previous["scanned_folders"] # last scan is a good estimate, no need to walk
+	elif not no_estimates:
 		if use_threads:
 			print("🐍 Calculate total items...")
 			total_items = count_items_concurrently(path_to_scan)
 		else:
 			print("🥷 Calculating total items...")
-			dyn_tqdm_walk = tqdm(os.walk(path_to_scan),desc="🥷 Calculate total items...", unit=" dirs", smoothing=1.0)
+			dyn_tqdm_walk = new_progress_bar(os.walk(path_to_scan),desc="🥷 Calculate total items...", unit=" dirs", smoothing=1.0)
 			total_items = []
 			dirs_count = 0
 			files_count = 0
@@ -1769,30 +3361,87 @@ def save_json_tree(path_to_scan, output_file="folder_structure.json.bz2", simula
 	else:
 		total_items = 0
 
-	global dyn_tqdm, scanned_files, scanned_folders, sum_size, denied_folders
+	global dyn_tqdm, scanned_files, scanned_folders, sum_size, denied_folders, syscall_count, entry_count, magic_scanned, progress, progress_lock, progress_bar
 	scanned_files = 0
 	scanned_folders = 0
 	denied_folders = 0
 	sum_size = 0
+	syscall_count = 0
+	entry_count = 0
+	mime_cache = None
+	if use_mime_cache:
+		try:
+			mime_cache = FileCache(os.path.join(os.path.dirname(config_file), "tree_util_mime_cache.sqlite"), "mime", f"{'magika' if use_magika else 'magic'}:{sniff_bytes}")
+		except Exception as e:
+			logger.warning(f"{colored_warn} MIME cache unavailable: {e}")
+			error_logs.append({"name": "mime_cache", "type": str(type(e).__name__), "desc": str(e)})
+	mime_sniffer = MimeSniffer(mime_workers, use_magika, error_logs=error_logs, header_size=sniff_bytes, mime_cache=mime_cache) if mime_workers else None
+	content_hasher = None
+	hash_cache = None
+	hashed_files = 0
+	if hash_files:
+		content_hasher = ContentHasher(0 if stream else hash_workers, hash_head_bytes, hash_full_below, hash_rate, error_logs=error_logs) # streamed records cannot be patched later
+		if use_hash_cache:
+			try:
+				hash_cache = content_hasher.cache = FileCache(os.path.join(os.path.dirname(config_file), "tree_util_hash_cache.sqlite"), "hash", content_hasher.method)
+			except Exception as e:
+				logger.warning(f"{colored_warn} Hash cache unavailable: {e}")
+				error_logs.append({"name": "hash_cache", "type": str(type(e).__name__), "desc": str(e)})
+	reused_folders = relisted_folders = None
+	writer = None
 	try:
-		if use_threads:
+		if stream:
+			title_console(f"🌊 Scanning... - {program_name}")
+			print("🌊 Streaming records to the snapshot...")
+			if indexed:
+				writer = IndexedSnapshotWriter(None if simulate else output_file, codec=codec, level=compress_level, root_path=path_to_scan)
+			else:
+				writer = StreamingJsonWriter(None if simulate else output_file, codec=codec, level=compress_level, workers=compress_workers, root_path=path_to_scan)
+			structure = None
+			with new_progress_bar(total=total_items, desc="🌊 Scanning files...", unit=" files", smoothing=1.0) as progress_bar:
+				total_size, scanned_files, scanned_folders, denied_folders = stream_folder_structure(path_to_scan, writer, progress_bar=progress_bar, error_logs=error_logs, no_attributes=no_attributes, magic_max_size=magic_max_size, force_magic=force_magic, use_magika=use_magika, sniff_bytes=sniff_bytes, mime_cache=mime_cache, content_hasher=content_hasher)
+		elif previous is not None:
+			title_console(f"♻️ Rescanning... - {program_name}")
+			print("♻️ Rescanning changed folders...")
+			progress_lock = threading.Lock()
+			progress = 0
+			with new_progress_bar(total=total_items, desc="♻️ Rescanning...", unit=" files") as progress_bar:
+				scanner = TreeScanner(error_logs=error_logs, no_attributes=no_attributes, max_workers=max_threads if use_threads else 1, magic_max_size=magic_max_size, force_magic=force_magic, use_magika=use_magika, progress_bar=progress_bar, mime_sniffer=mime_sniffer, sniff_bytes=sniff_bytes, mime_cache=mime_cache, previous=previous, content_hasher=content_hasher)
+				structure, total_size, scanned_files, scanned_folders, denied_folders = scanner.run(path_to_scan)
+			reused_folders, relisted_folders = scanner.reused_folders, scanner.relisted_folders
+			print(f"♻️ {humanize.intcomma(reused_folders)} unchanged folder{plural(reused_folders)} reused, {humanize.intcomma(relisted_folders)} relisted")
+		elif use_threads:
 			title_console(f"🕸️ Scanning... - {program_name}")
 			print("🕷️ Scanning files...")
 			print(f"🧵 Using {max_threads if max_threads > 1 else 'a' if max_threads > 0 else 'no' if max_threads > -1 else max_threads} thread{plural(max_threads)}... (Progress bar may not work properly)")
-			global progress, progress_lock, progress_bar
 			progress_lock = threading.Lock()
 			progress = 0
-			with tqdm(total=total_items, desc="🕷️ Scanning files...", unit=" files") as progress_bar:
-				structure, total_size, scanned_files, scanned_folders, denied_folders = get_folder_structure_threaded(path_to_scan, progress_bar=progress_bar, error_logs=error_logs, no_attributes=no_attributes, magic_max_size=magic_max_size, force_magic=force_magic, use_magika=use_magika, max_workers=max_threads)
+			with new_progress_bar(total=total_items, desc="🕷️ Scanning files...", unit=" files") as progress_bar:
+				structure, total_size, scanned_files, scanned_folders, denied_folders = get_folder_structure_threaded(path_to_scan, progress_bar=progress_bar, error_logs=error_logs, no_attributes=no_attributes, magic_max_size=magic_max_size, force_magic=force_magic, use_magika=use_magika, max_workers=max_threads, mime_sniffer=mime_sniffer, sniff_bytes=sniff_bytes, mime_cache=mime_cache, content_hasher=content_hasher)
 		else:
 			title_console(f"📈 Scanning... - {program_name}")
 			print("🕵️ Scanning files...")
-			dyn_tqdm = tqdm(total=total_items,  unit=" files", smoothing=1.0)
+			dyn_tqdm = new_progress_bar(total=total_items,  unit=" files", smoothing=1.0)
 			with dyn_tqdm as progress_bar:
-				structure, total_size, scanned_files, scanned_folders, denied_folders = get_folder_structure(path_to_scan, progress_bar=progress_bar, error_logs=error_logs, no_attributes=no_attributes, magic_max_size=magic_max_size, force_magic=force_magic, use_magika=use_magika)
+				structure, total_size, scanned_files, scanned_folders, denied_folders = get_folder_structure(path_to_scan, progress_bar=progress_bar, error_logs=error_logs, no_attributes=no_attributes, magic_max_size=magic_max_size, force_magic=force_magic, use_magika=use_magika, mime_sniffer=mime_sniffer, sniff_bytes=sniff_bytes, mime_cache=mime_cache, content_hasher=content_hasher)
+		if mime_sniffer is not None:
+			magic_scanned = mime_sniffer.close()
+		if content_hasher is not None:
+			hashed_files = content_hasher.close()
 	except KeyboardInterrupt:
+		if mime_sniffer is not None:
+			mime_sniffer.shutdown()
+		if content_hasher is not None:
+			content_hasher.shutdown()
+		if writer is not None:
+			writer.abort()
 		print(f"{colored_stop} Aborted.")
 		exit(0)
+	finally:
+		if mime_cache is not None:
+			mime_cache.close()
+		if hash_cache is not None:
+			hash_cache.close()
 	end_time = time.time()
 	elapsed_seconds = end_time - start_time
 	search_rate = f"{(scanned_files / elapsed_seconds):.2f}"
@@ -1801,7 +3450,7 @@ def save_json_tree(path_to_scan, output_file="folder_structure.json.bz2", simula
 	print(f" ⏱️ Time Taken: {format_duration(elapsed_seconds)} | {speed_tier_emoji(search_rate)} Search Rate:  {search_rate} files/s\n")
 
 	title_console(f"📝 Enter a note - {program_name}")
-	if not args.simulate and timed_choice("📝 Enter a note for the report? ", 10, False, "⏭️ Skipped. You can edit the note later."):
+	if not args.simulate and not args.skip_note and timed_choice("📝 Enter a note for the report? ", 10, False, "⏭️ Skipped. You can edit the note later."):
 			# not a command, so input prompts is pilcrow
 			try:
 				user_note = input("¶ ").strip()
@@ -1834,6 +3483,20 @@ def save_json_tree(path_to_scan, output_file="folder_structure.json.bz2", simula
 			"use_magika": use_magika,
 			"force_magic": force_magic,
 			"magic_scanned": magic_scanned,
+			"mime_workers": mime_workers,
+			"sniff_bytes": sniff_bytes,
+			"mime_cache_hits": mime_cache.hits if mime_cache is not None else None,
+			"mime_cache_misses": mime_cache.misses if mime_cache is not None else None,
+			"content_hash": content_hasher.settings() if content_hasher is not None else None,
+			"hashed_files": hashed_files,
+			"hash_cache_hits": hash_cache.hits if hash_cache is not None else None,
+			"hash_cache_misses": hash_cache.misses if hash_cache is not None else None,
+			"scanned_entries": entry_count,
+			"metadata_syscalls": syscall_count,
+			"syscalls_per_entry": round(syscall_count / entry_count, 3) if entry_count else 0,
+			"incremental_base": os.path.abspath(previous_snapshot) if previous is not None else None,
+			"reused_folders": reused_folders,
+			"relisted_folders": relisted_folders,
 			"computer_name": platform.node(),
 			"system_name": platform.system(),
 			"system_ver": platform.version(),
@@ -1844,8 +3507,14 @@ def save_json_tree(path_to_scan, output_file="folder_structure.json.bz2", simula
 			"root_mtime": os.path.getmtime(path_to_scan),
 			"root_ctime": os.path.getctime(path_to_scan),
 			"root_atime": os.path.getatime(path_to_scan),
+			"root_ino": os.stat(path_to_scan).st_ino,
 			"root_attr": get_file_attributes(path_to_scan),
 			"threaded": use_threads,
+			"streamed": stream,
+			"codec": codec,
+			"compress_level": compress_level if compress_level is not None else SNAPSHOT_CODECS[codec][2],
+			"compress_workers": 0 if indexed else compress_workers,
+			"indexed": indexed,
 			"max_threads": max_threads,
 			"python_version": platform.python_version(),
 			"python_implementation": platform.python_implementation(),
@@ -1855,6 +3524,8 @@ def save_json_tree(path_to_scan, output_file="folder_structure.json.bz2", simula
 		},
 		"structure": structure,
 	}
+	if summary is not None:
+		summary.update({"total_size": total_size, "scanned_files": scanned_files, "scanned_folders": scanned_folders, "denied_folders": denied_folders, "errors": len(error_logs), "elapsed": round(elapsed_seconds, 3), "written": False})
 
 	'''def compress_large_json(data, output_file):
 		size_total = 0
@@ -1868,99 +3539,136 @@ def save_json_tree(path_to_scan, output_file="folder_structure.json.bz2", simula
 
 	if simulate:
 		print(f"⏭️ Skipping writing file...")
+		if writer is not None:
+			writer.finish(data["report_info"])
+	elif writer is not None:
+		print("\n🌊 Finishing snapshot...")
+		try:
+			original_size, compressed_size = writer.finish(data["report_info"])
+			edit_get_config(config_file, key="last_snapshot", value=os.path.abspath(output_file), mode="edit")
+			if summary is not None:
+				summary.update({"written": True, "original_size": original_size, "compressed_size": compressed_size})
+			print(f"✅ Compression successful! File saved at: {output_file}")
+			print(f"📦 JSON has compressed by {round(compressed_size / original_size * 100, 2)} % | {humanize.naturalsize(original_size, binary=True)} ({humanize.intcomma(original_size)} bytes) -> {humanize.naturalsize(compressed_size, binary=True)} ({humanize.intcomma(compressed_size)} bytes) ")
+		except KeyboardInterrupt:
+			writer.abort()
+			print(f"{colored_stop} Interrupted by user.")
+		except Exception as e:
+			writer.abort()
+			print(f"❌ Compression failed: {e}")
 	else:
 		print("\n🗜️ Compressing JSON...")
 		title_console(f"🗜️ Compressing JSON... - {program_name}")
 		# spinner = Spinner()
 		# spinner.start() # small spinner animation, but works well
+		original_size = compressed_size = 0
 		try:
-			original_size, compressed_size = compress_json_stream(data, output_file)
+			if indexed:
+				original_size, compressed_size = write_indexed_snapshot(data, output_file, codec=codec, level=compress_level)
+			else:
+				original_size, compressed_size = compress_json_stream(data, output_file, codec=codec, level=compress_level, workers=compress_workers)
+			if compressed_size:
+				edit_get_config(config_file, key="last_snapshot", value=os.path.abspath(output_file), mode="edit")
+				if summary is not None:
+					summary.update({"written": True, "original_size": original_size, "compressed_size": compressed_size})
 		except KeyboardInterrupt:
 			print(f"{colored_stop} Interrupted by user.")
 		finally:
 			# spinner.stop()
-			print(f"📦 JSON has compressed by {round(compressed_size / original_size * 100, 2)} % | {humanize.naturalsize(original_size, binary=True)} ({humanize.intcomma(original_size)} bytes) -> {humanize.naturalsize(compressed_size, binary=True)} ({humanize.intcomma(compressed_size)} bytes) ")
+			if original_size and compressed_size: # nothing was written if compressing failed
+				print(f"📦 JSON has compressed by {round(compressed_size / original_size * 100, 2)} % | {humanize.naturalsize(original_size, binary=True)} ({humanize.intcomma(original_size)} bytes) -> {humanize.naturalsize(compressed_size, binary=True)} ({humanize.intcomma(compressed_size)} bytes) ")
 		
 	return elapsed_seconds # return time taken
 
 _counter = itertools.count()
+aggregate_index = None # AggregateIndex of the snapshot being browsed, see `browse_json_tree`
+name_index = None # NameIndex of the snapshot being browsed, if built
 
 def get_top_n_largest(node, n, heap=None, mode="files"):
 	"""Get the top n largest files or folders in a directory tree efficiently using a heap."""
 	if mode not in {"files", "folders"}:
 		raise ValueError(f"Invalid mode: {mode}")
+	if heap is None and isinstance(node, SqliteChildren): # indexed query instead of a walk
+		return node.database.top_largest(node, n, mode)
+	if heap is None and aggregate_index is not None and n <= aggregate_index.top_k:
+		cached = aggregate_index.lookup(node)
+		if cached is not None:
+			return (cached.largest_files if mode == "files" else cached.largest_folders)[:n]
 
 	if heap is None:
 		heap = []
 
-	for item in node:
-		if mode == "files" and item["type"] != "folder":
+	folders = mode == "folders"
+	for item in iter_tree(node):
+		if (item["type"] == "folder") == folders:
 			# Use next(_counter) as a tie-breaker
 			heapq.heappush(heap, (item["size"], item["path"], next(_counter), item))
-		elif mode == "folders" and item["type"] == "folder":
-			heapq.heappush(heap, (item["size"], item["path"], next(_counter), item))
-
-		# Keep the heap limited to `n` largest elements.
-		if len(heap) > n:
-			heapq.heappop(heap)
 
-		# Recursively process children if it's a folder.
-		if item["type"] == "folder":
-			get_top_n_largest(item["children"], n, heap, mode)
+			# Keep the heap limited to `n` largest elements.
+			if len(heap) > n:
+				heapq.heappop(heap)
 
 	# Return the n largest items by slicing out the original item stored in index 3.
 	return [x[3] for x in heapq.nlargest(n, heap, key=lambda x: (x[0], x[1]))]
 	
 def get_top_n_recent_files(node, n, heap=None, files=None, mode="new", key="mtime"):
 	"""Get the top n largest files in a directory tree efficiently."""
+	if heap is None and isinstance(node, SqliteChildren):
+		return node.database.top_recent(node, n)
+	if heap is None and aggregate_index is not None and n <= aggregate_index.top_k:
+		cached = aggregate_index.lookup(node)
+		if cached is not None:
+			return cached.recent[:n]
 	if heap is None:
 		heap = []
 
-	for item in node:
+	for item in iter_tree(node):
 		if item["type"] in {"file", "symlink", "junction"}:
 			# Use (size, path, item) to ensure uniqueness and avoid comparison issues
 			heapq.heappush(heap, (item["mtime"], item["path"], item))
 			if len(heap) > n:
 				heapq.heappop(heap)  # Remove the smallest file to keep only top `n`
-		elif item["type"] == "folder":
-			get_top_n_recent_files(item["children"], n, heap)
 
 	return [x[2] for x in sorted(heap, key=lambda x: x[0], reverse=True)]
 
 def search_empty_folders(node, results=None):
 	""" Search for empty folders in a directory tree."""
+	if results is None and isinstance(node, SqliteChildren):
+		return node.database.empty_folders(node)
 	if results == None:
 		results = []
-	for item in node:
+	for item in iter_tree(node):
 		if item["type"] == "folder" and len(item["children"]) == 0:
 			results.append(item)
-		if item["type"] == "folder": # recursive
-			search_empty_folders(item["children"], results)
 	return results
 
 def search_files(node, query, regex=False, results=None):
 	""" Search for files in a directory tree."""
+	if results is None and isinstance(node, SqliteChildren):
+		return node.database.search(node, query, regex)
+	if results is None and name_index is not None:
+		indexed = name_index.search(node, query, regex)
+		if indexed is not None:
+			return indexed
 	if results == None:
 		results = []
-	for item in node:
-		if regex: # case-insensitive
-			if re.search(query, item["name"], re.IGNORECASE):
-				results.append(item)
-		else: # case-sensitive
-			if query.lower() in item["name"].lower():
-				results.append(item)
-		if item["type"] == "folder": # recursive
-			search_files(item["children"], query, regex, results)
+	search = re.compile(query, re.IGNORECASE).search if regex else None # compiled once for the whole walk
+	query = query.lower() # both are case-insensitive
+	for item in iter_tree(node):
+		if (query in item["name"].lower()) if search is None else search(item["name"]):
+			results.append(item)
 	return results
 
 def search_duplicates(node, seen_files=None, duplicates=None):
 	"""Efficiently search for duplicate files by name and size."""
+	if seen_files is None and isinstance(node, SqliteChildren):
+		return node.database.duplicates(node)
 	if seen_files is None:
 		seen_files = defaultdict(list)  # Simplifies duplicate tracking
 	if duplicates is None:
 		duplicates = []
 
-	for item in node:
+	for item in iter_tree(node):
 		if item["type"] == "file":
 			key = (item["name"], item["size"])  # Consider both name and size
 
@@ -1971,12 +3679,177 @@ def search_duplicates(node, seen_files=None, duplicates=None):
 			
 			seen_files[key].append(item)  # Store the file reference
 
-		elif item["type"] == "folder":
-			search_duplicates(item["children"], seen_files, duplicates)
-
 	return duplicates  # Avoid sorting unless necessary
+
+DUPLICATE_PARTIAL_BYTES = 64 * 1024 # read from both ends of a file in the partial pass
+
+def hash_file_content(path, size, limiter, partial_bytes=0, cancelled=None):
+	"""
+	BLAKE2b digest of a file as listed in a snapshot.
+
+	Args:
+		path (str): File to read.
+		size (int): Size recorded in the snapshot; a file that changed size since raises ValueError.
+		limiter (ByteRateLimiter): Read budget.
+		partial_bytes (int, optional): Hash only the first and last `partial_bytes` (the whole
+			file if it is not larger than both). 0 hashes everything.
+		cancelled (threading.Event, optional): Once set, a full read stops with InterruptedError.
+
+	Returns:
+		tuple: (digest, (st_dev, st_ino)) - the identity lets hard links be told apart from copies.
+	"""
+	digest = hashlib.blake2b(digest_size=20)
+	with open(path, "rb") as f:
+		file_stat = os.fstat(f.fileno())
+		if file_stat.st_size != size:
+			raise ValueError(f"size changed since the snapshot ({size} -> {file_stat.st_size} bytes)")
+		if partial_bytes and size > 2 * partial_bytes:
+			limiter.consume(2 * partial_bytes)
+			digest.update(f.read(partial_bytes))
+			f.seek(size - partial_bytes)
+			digest.update(f.read(partial_bytes))
+		else:
+			remaining = size
+			while remaining > 0:
+				if cancelled is not None and cancelled.is_set():
+					raise InterruptedError("hashing cancelled")
+				amount = min(HASH_READ_SIZE, remaining)
+				limiter.consume(amount)
+				chunk = f.read(amount)
+				if not chunk:
+					break
+				digest.update(chunk)
+				remaining -= len(chunk)
+	return digest.digest(), (file_stat.st_dev, file_stat.st_ino)
+
+def find_content_duplicates(node, workers=DEFAULT_HASH_WORKERS, bytes_per_second=0, partial_bytes=DUPLICATE_PARTIAL_BYTES, min_size=1, progress_bar=None, error_logs=None, recorded=None, offline=False):
+	"""
+	Find files with identical content below `node`, reading as little as possible.
+
+	Files are first grouped by the size recorded in the snapshot, so unique sizes are never
+	opened. Files in a size group are then hashed on their first and last `partial_bytes`, and
+	only those still sharing a partial hash are hashed in full. Hashing runs on a thread pool
+	whose reads share one `bytes_per_second` budget. Hard links to an already listed file are
+	dropped, since removing them frees nothing.
+
+	Snapshots scanned with `--content-hash` already hold a fingerprint per file. Size groups whose
+	files all have one are split by it without reading: files up to `full_below` are final, larger
+	ones (fingerprinted from their first bytes only) still get the full pass unless `offline`.
+	Members of such groups are still stat()ed to drop hard links, unless `offline`.
+
+	Args:
+		node: A "children" listing of the loaded snapshot.
+		workers (int, optional): Hashing threads.
+		bytes_per_second (int, optional): Read budget across all threads (0 = unlimited).
+		partial_bytes (int, optional): Bytes read from each end in the partial pass.
+		min_size (int, optional): Ignore smaller files (empty files are all equal).
+		progress_bar (tqdm.tqdm, optional): Reset and advanced (in bytes) for each hash pass.
+		error_logs (list, optional): Files that could not be read are appended here and skipped.
+		recorded (dict, optional): The snapshot's "content_hash" settings, to use its fingerprints.
+		offline (bool, optional): Never read files: trust recorded fingerprints (hard links and
+			files that only share their first bytes are then reported too) and skip files without one.
+
+	Returns:
+		tuple: (groups, stats) - groups of duplicate records, most reclaimable space first, and
+			a dict with "candidates", "bytes_read" and "reclaimable".
+	"""
+	by_size = defaultdict(list)
+	for item in iter_tree(node):
+		if item["type"] == "file" and item["size"] >= min_size:
+			by_size[item["size"]].append(item)
+	groups = [group for group in by_size.values() if len(group) > 1]
+	stats = {"candidates": sum(len(group) for group in groups), "bytes_read": 0, "reclaimable": 0}
+	limiter = ByteRateLimiter(bytes_per_second)
+	cancelled = threading.Event()
+
+	def hash_pass(groups, partial, description):
+		"""Split every group by digest, keeping the groups of two or more."""
+		if progress_bar is not None:
+			progress_bar.reset(total=sum(min(item["size"], 2 * partial) if partial else item["size"] for group in groups for item in group))
+			progress_bar.set_description(description)
+		digests = {}
+		executor = ThreadPoolExecutor(max_workers=max(1, workers))
+		try:
+			futures = {executor.submit(hash_file_content, item["path"], item["size"], limiter, partial, cancelled): item for group in groups for item in group}
+			for future in as_completed(futures):
+				item = futures[future]
+				try:
+					digests[id(item)] = future.result()
+				except Exception as e: # vanished, unreadable or changed since the snapshot
+					if error_logs is not None:
+						error_logs.append({"name": item["path"], "type": str(type(e).__name__), "desc": str(e)})
+					logger.debug(f"{colored_warn} Cannot hash '{item['path']}': {e}")
+				if progress_bar is not None:
+					progress_bar.update(min(item["size"], 2 * partial) if partial else item["size"])
+		except KeyboardInterrupt: # drop the queued files and stop the running reads, without waiting for them
+			cancelled.set()
+			executor.shutdown(wait=False, cancel_futures=True)
+			raise
+		executor.shutdown()
+		split_groups = []
+		for group in groups:
+			by_digest = defaultdict(list)
+			identities = set()
+			for item in group:
+				result = digests.get(id(item))
+				if result is None or result[1] in identities: # unreadable, or a hard link
+					continue
+				identities.add(result[1])
+				by_digest[result[0]].append(item)
+			split_groups.extend(same for same in by_digest.values() if len(same) > 1)
+		return split_groups
+
+	def drop_hard_links(group):
+		"""Keep one record per file (device, inode), as `hash_pass` does, without reading the files."""
+		identities = set()
+		kept = []
+		for item in group:
+			try:
+				file_stat = os.stat(item["path"])
+			except OSError as e: # vanished since the snapshot
+				if error_logs is not None:
+					error_logs.append({"name": item["path"], "type": str(type(e).__name__), "desc": str(e)})
+				continue
+			identity = (file_stat.st_dev, file_stat.st_ino)
+			if identity not in identities:
+				identities.add(identity)
+				kept.append(item)
+		return kept
+
+	complete = []
+	remaining = []
+	if recorded is not None or offline:
+		full_below = recorded.get("full_below", 0) if recorded is not None else 0
+		unresolved = []
+		for group in groups:
+			if not all(item.get("hash") for item in group):
+				unresolved.append(group)
+				continue
+			by_hash = defaultdict(list)
+			for item in group:
+				by_hash[item["hash"]].append(item)
+			for same in by_hash.values():
+				if len(same) > 1 and not offline:
+					same = drop_hard_links(same)
+				if len(same) > 1:
+					(complete if same[0]["size"] <= full_below or offline else remaining).append(same)
+		groups = [] if offline else unresolved
+	if groups:
+		groups = hash_pass(groups, partial_bytes, "🧮 Hashing file ends")
+		complete += [group for group in groups if group[0]["size"] <= 2 * partial_bytes] # the partial pass read them whole
+		remaining += [group for group in groups if group[0]["size"] > 2 * partial_bytes]
+	if remaining:
+		complete += hash_pass(remaining, 0, "🧮 Hashing candidates")
+	stats["bytes_read"] = limiter.consumed
+	complete.sort(key=lambda group: group[0]["size"] * (len(group) - 1), reverse=True)
+	stats["reclaimable"] = sum(group[0]["size"] * (len(group) - 1) for group in complete)
+	return complete, stats
+
 def get_most_common_types(node, mode="freq", searchfor="ext", results=None, total_size=None, total_files=None):
 	""" Get the top frequent extensions or mime types and sizes in a directory tree."""
+	if results is None and isinstance(node, SqliteChildren):
+		return node.database.common_types(node, mode, searchfor, total_size, total_files)
+	cached = aggregate_index.lookup(node) if results is None and aggregate_index is not None else None
 	if results is None:
 		results = defaultdict(lambda: [0, 0])  # [frequency, size]
 	if total_size is None:
@@ -1984,18 +3857,19 @@ def get_most_common_types(node, mode="freq", searchfor="ext", results=None, tota
 	if total_files is None:
 		total_files = sum(1 for item in node if item["type"] == "file")
 
-	for item in node:
-		if item["type"] == "file":
-			if searchfor == "ext":
-				types = os.path.splitext(item["name"])[1].lower()
-			elif searchfor == "mime":
-				types = item["mime"]
-			size = item["size"]
-			results[types][0] += 1  # increment frequency
-			results[types][1] += size  # add size
-		elif item["type"] == "folder":
-			get_most_common_types(item["children"], mode, searchfor, results, total_size, total_files)
-
+	if cached is not None: # histogram kept by the aggregate index, no walk
+		results = cached.mime if searchfor == "mime" else cached.ext
+	else:
+		for item in iter_tree(node):
+			if item["type"] == "file":
+				if searchfor == "ext":
+					types = os.path.splitext(item["name"])[1].lower()
+				elif searchfor == "mime":
+					types = item["mime"]
+				size = item["size"]
+				results[types][0] += 1  # increment frequency
+				results[types][1] += size  # add size
+
 	# Convert mime types to a dictionary of tuples and add percentage info
 	results = {types: (freq, size, size / total_size, freq / total_files) for types, (freq, size) in results.items()}
 
@@ -2040,26 +3914,319 @@ def find_garbage_files(node, results=None):
 	[{'name': '.DS_Store', 'type': 'file', 'size': 0}, {'name': 'foo.bak', 'type': 'file', 'size': 0}]
 	"""
 
-	# Blacklist
-	garbage_patterns = r'.*\.(te?mp|log|bak|old|chk|dmp)$|^~.*|Thumbs.db|^\.DS_Store$'
-
-	# Whitelist
-	important_pattern = r'.*\.(sys|dll|ini|dat|cfg|lnk|ocx|drv)$'
-	folder_whitelist = ['$recycle.bin']#, 'system volume information', 'programdata', 'program files', 'program files (x86)', 'windows', 'system32', 'syswow64', 'winsxs']
+	if results is None and aggregate_index is not None:
+		cached = aggregate_index.lookup(node)
+		if cached is not None:
+			garbage, start, end = cached.garbage
+			return garbage[start:end]
 
 	if results == None:
 		results = []
-	for item in node:
-		# If matches blacklist (case-insensitive), or filesize = 0
-		if (item["type"] == "file" and re.search(garbage_patterns, item["name"], re.IGNORECASE)) or (item["type"] == "file" and item["size"] == 0):
-			# If matches whitelist, do not add to results
-			if re.match(important_pattern, item["name"]):
-				pass
+	for item in iter_tree(node, descend=lambda folder: folder["name"].lower() not in GARBAGE_FOLDER_WHITELIST):
+		if is_garbage_file(item):
+			results.append(item)
+	return results
+
+# Blacklist
+GARBAGE_PATTERNS = r'.*\.(te?mp|log|bak|old|chk|dmp)$|^~.*|Thumbs.db|^\.DS_Store$'
+
+# Whitelist
+IMPORTANT_PATTERN = r'.*\.(sys|dll|ini|dat|cfg|lnk|ocx|drv)$'
+GARBAGE_RE = re.compile(GARBAGE_PATTERNS, re.IGNORECASE)
+IMPORTANT_RE = re.compile(IMPORTANT_PATTERN)
+GARBAGE_FOLDER_WHITELIST = ['$recycle.bin']#, 'system volume information', 'programdata', 'program files', 'program files (x86)', 'windows', 'system32', 'syswow64', 'winsxs']
+
+def is_garbage_file(item):
+	"""True for a file record that `find_garbage_files` reports."""
+	# If matches blacklist (case-insensitive), or filesize = 0
+	if item["type"] == "file" and (item["size"] == 0 or GARBAGE_RE.search(item["name"])):
+		# If matches whitelist, do not add to results
+		return not IMPORTANT_RE.match(item["name"])
+	return False
+
+DEFAULT_AGGREGATE_TOP_K = 50
+
+class _FolderAggregates:
+	"""Aggregates of everything below one folder listing (see `AggregateIndex`)."""
+	__slots__ = ("ext", "mime", "largest_files", "largest_folders", "recent", "garbage")
+
+	def __init__(self):
+		self.ext = {} # extension -> [files, bytes]
+		self.mime = {} # MIME type -> [files, bytes]
+		self.largest_files = [] # candidates while building, then the top K by (size, path)
+		self.largest_folders = []
+		self.recent = [] # top K by (mtime, path)
+		self.garbage = None # (list, start, end): the listing's garbage files are list[start:end]
+
+def _merge_histogram(target, source):
+	for key, (count, size) in source.items():
+		entry = target.get(key)
+		if entry is None:
+			target[key] = [count, size]
+		else:
+			entry[0] += count
+			entry[1] += size
+
+class AggregateIndex:
+	"""
+	Per-folder aggregates built in one bottom-up pass once a snapshot is loaded.
+
+	For every folder listing (and the top level) it keeps the extension and MIME histograms
+	of the files below it, its `top_k` largest files and folders, its `top_k` newest files and
+	the slice of a shared list holding its garbage files in walk order. `get_most_common_types`,
+	`get_top_n_largest`, `get_top_n_recent_files` and `find_garbage_files` read these instead of
+	walking the subtree again. Listings are matched by identity (`lookup`), so search results
+	and sorted copies, as well as counts above `top_k`, still take the walk.
+
+	Args:
+		top_k (int, optional): Largest and newest entries kept per folder.
+	"""
+	def __init__(self, top_k=DEFAULT_AGGREGATE_TOP_K):
+		self.top_k = top_k
+		self.listings = {} # key -> (list or columnar tree, _FolderAggregates)
+
+	@staticmethod
+	def _key(node):
+		if isinstance(node, ColumnarChildren): # views are created per access, match the range instead
+			return ("columnar", id(node.tree), node.start, node.count), node.tree
+		if isinstance(node, list):
+			return id(node), node
+		return None, None
+
+	def lookup(self, node):
+		"""Aggregates of a "children" listing, or None if it was not indexed."""
+		key, owner = self._key(node)
+		entry = self.listings.get(key) if key is not None else None
+		if entry is not None and entry[0] is owner:
+			return entry[1]
+		return None
+
+	@classmethod
+	def build(cls, structure, top_k=DEFAULT_AGGREGATE_TOP_K):
+		"""
+		Index every listing of a loaded tree (plain lists or a `ColumnarTree`).
+
+		Returns:
+			AggregateIndex: The index; lazily decoded trees are not indexed.
+		"""
+		index = cls(top_k)
+		if cls._key(structure)[0] is None:
+			return index
+		by_size = lambda item: (item["size"], item["path"])
+		by_mtime = lambda item: (item["mtime"], item["path"])
+		# Columnar trees keep column indices instead of one ColumnarNode per kept entry
+		tree = structure.tree if isinstance(structure, ColumnarChildren) else None
+		new_garbage = (lambda: ColumnarRecords(tree)) if tree is not None else list
+		# each frame: (listing, its items left, its aggregates, garbage list, garbage start)
+		stack = [(structure, iter(structure), _FolderAggregates(), new_garbage(), 0)]
+		while stack:
+			listing, items, aggregates, garbage, start = stack[-1]
+			item = next(items, None)
+			if item is None: # listing done: keep its top K and hand the totals to its parent
+				stack.pop()
+				aggregates.largest_files = heapq.nlargest(top_k, aggregates.largest_files, key=by_size)
+				aggregates.largest_folders = heapq.nlargest(top_k, aggregates.largest_folders, key=by_size)
+				aggregates.recent = heapq.nlargest(top_k, aggregates.recent, key=by_mtime)
+				aggregates.garbage = (garbage, start, len(garbage))
+				key, owner = cls._key(listing)
+				index.listings[key] = (owner, aggregates)
+				if stack:
+					parent = stack[-1][2]
+					_merge_histogram(parent.ext, aggregates.ext)
+					_merge_histogram(parent.mime, aggregates.mime)
+					parent.largest_files += aggregates.largest_files
+					parent.largest_folders += aggregates.largest_folders
+					parent.recent += aggregates.recent
+				if tree is not None:
+					aggregates.largest_files = ColumnarRecords(tree, aggregates.largest_files)
+					aggregates.largest_folders = ColumnarRecords(tree, aggregates.largest_folders)
+					aggregates.recent = ColumnarRecords(tree, aggregates.recent)
+				continue
+
+			item_type = item["type"]
+			if is_garbage_file(item):
+				garbage.append(item)
+			if item_type == "folder":
+				aggregates.largest_folders.append(item)
+				children = item["children"]
+				child_garbage = new_garbage() if item["name"].lower() in GARBAGE_FOLDER_WHITELIST else garbage # the walk skips these from above
+				stack.append((children, iter(children), _FolderAggregates(), child_garbage, len(child_garbage)))
+				continue
+			aggregates.largest_files.append(item)
+			if item_type in ("file", "symlink", "junction"):
+				aggregates.recent.append(item)
+			if item_type == "file":
+				size = item["size"]
+				for histogram, key in ((aggregates.ext, os.path.splitext(item["name"])[1].lower()), (aggregates.mime, item.get("mime"))):
+					entry = histogram.get(key)
+					if entry is None:
+						histogram[key] = [1, size]
+					else:
+						entry[0] += 1
+						entry[1] += size
+		return index
+
+def fold_name(text):
+	"""
+	Case-fold a name or query for `NameIndex`, so that everything `str.lower` or a
+	case-insensitive regex treats as equal folds to the same text.
+	"""
+	return text.casefold().replace("i̇", "i").replace("ı", "i")
+
+def regex_literals(pattern):
+	"""
+	Runs of literal characters every match of `pattern` must contain, e.g. ["lib", ".so."]
+	for r"^lib.*\\.so\\.[0-9]+$". Alternations and repeats end a run, so [] means no literal
+	is required (or the pattern could not be parsed).
+	"""
+	try:
+		parsed = re_parser.parse(pattern, re.IGNORECASE)
+	except Exception:
+		return []
+	runs = []
+	def collect(items, run):
+		for op, value in items:
+			if op == re_constants.LITERAL:
+				run.append(chr(value))
+			elif op == re_constants.SUBPATTERN: # a group's contents are part of the sequence
+				run = collect(value[-1], run)
 			else:
+				if run:
+					runs.append("".join(run))
+				run = []
+		return run
+	last = collect(parsed, [])
+	if last:
+		runs.append("".join(last))
+	return runs
+
+class NameIndex:
+	"""
+	Trigram index over the names of a loaded tree, for `search_files` (/search and /regex).
+
+	Entries are numbered in the order `search_files` walks them, so every folder listing
+	covers one contiguous range of numbers. Each trigram of the case-folded names maps to
+	the sorted numbers of the names that contain it. A substring query intersects the
+	postings of its trigrams within the listing's range and only checks those names; a
+	regex is narrowed the same way by the literal runs it requires. Queries shorter than
+	three characters, and regexes without such literals, check every name in the range.
+
+	Args:
+		structure: The tree's top level (plain lists or a `ColumnarTree` root).
+	"""
+	def __init__(self):
+		self.records = [] # entry number -> record, or ...
+		self.columnar_tree = None # ... for columnar trees, entry number -> column index
+		self.postings = {} # trigram -> array('i') of entry numbers
+		self.listings = {} # listing key (see `AggregateIndex._key`) -> (owner, first, end)
+
+	def __len__(self):
+		return len(self.records)
+
+	def record(self, number):
+		if self.columnar_tree is not None:
+			return ColumnarNode(self.columnar_tree, self.records[number])
+		return self.records[number]
+
+	def memory_size(self):
+		"""Approximate bytes held by the postings and lookup tables."""
+		size = sys.getsizeof(self.postings) + sys.getsizeof(self.listings) + sys.getsizeof(self.records)
+		for trigram, numbers in self.postings.items():
+			size += sys.getsizeof(trigram) + sys.getsizeof(numbers)
+		return size + len(self.listings) * 100 # key tuples and range tuples, roughly
+
+	@classmethod
+	def build(cls, structure):
+		"""
+		Number and index every name of a loaded tree.
+
+		Returns:
+			NameIndex: The index; lazily decoded trees are not indexed (empty index).
+		"""
+		index = cls()
+		if AggregateIndex._key(structure)[0] is None:
+			return index
+		if isinstance(structure, ColumnarChildren):
+			index.columnar_tree = structure.tree
+			index.records = array('l')
+		records = index.records
+		postings = {}
+		number = 0
+		stack = [(structure, iter(structure), 0)] # (listing, its items left, first entry number)
+		while stack:
+			listing, items, first = stack[-1]
+			item = next(items, None)
+			if item is None:
+				stack.pop()
+				key, owner = AggregateIndex._key(listing)
+				index.listings[key] = (owner, first, number)
+				continue
+			records.append(item.index if index.columnar_tree is not None else item)
+			name = fold_name(item["name"])
+			for trigram in {name[i:i + 3] for i in range(len(name) - 2)}:
+				numbers = postings.get(trigram)
+				if numbers is None:
+					postings[trigram] = [number]
+				else:
+					numbers.append(number)
+			number += 1
+			if item["type"] == "folder":
+				children = item["children"]
+				stack.append((children, iter(children), number))
+		index.postings = {trigram: array('i', numbers) for trigram, numbers in postings.items()}
+		return index
+
+	def candidates(self, literals, first, end):
+		"""Sorted entry numbers in [first, end) whose names contain every trigram of `literals`, or None for "all"."""
+		trigrams = {literal[i:i + 3] for literal in map(fold_name, literals) for i in range(len(literal) - 2)}
+		if not trigrams:
+			return None
+		ranges = []
+		for trigram in trigrams:
+			numbers = self.postings.get(trigram)
+			if numbers is None:
+				return []
+			low, high = bisect.bisect_left(numbers, first), bisect.bisect_left(numbers, end)
+			if low == high:
+				return []
+			ranges.append((high - low, numbers, low, high))
+		ranges.sort(key=lambda entry: entry[0]) # intersect starting from the rarest trigram
+		_, numbers, low, high = ranges[0]
+		matches = set(numbers[low:high])
+		for _, numbers, low, high in ranges[1:]:
+			matches.intersection_update(numbers[low:high])
+			if not matches:
+				return []
+		return sorted(matches)
+
+	def search(self, node, query, regex=False):
+		"""
+		Same results as `search_files(node, query, regex)`, in the same order.
+
+		Returns:
+			list or None: The matching records, or None if `node` is not an indexed listing.
+		"""
+		key, owner = AggregateIndex._key(node)
+		entry = self.listings.get(key) if key is not None else None
+		if entry is None or entry[0] is not owner:
+			return None
+		first, end = entry[1], entry[2]
+		if regex:
+			pattern = re.compile(query, re.IGNORECASE)
+			numbers = self.candidates(regex_literals(query), first, end)
+			matches = lambda name: pattern.search(name) is not None
+		else:
+			query = query.lower()
+			numbers = self.candidates([query], first, end)
+			matches = lambda name: query in name.lower()
+		if numbers is None:
+			numbers = range(first, end)
+		results = []
+		for number in numbers:
+			item = self.record(number)
+			if matches(item["name"]):
 				results.append(item)
-		if item["type"] == "folder" and item["name"].lower() not in folder_whitelist: # recursive
-			find_garbage_files(item["children"], results)
-	return results
+		return results
 
 
 def set_nth_list(lst, index, value):
@@ -2118,24 +4285,37 @@ def generate_tree(node, draw_type="ascii", prefix='', title='', lines=None, show
 	style = valid_styles[draw_type]
 
 	# **NEW FIX**: Filter out files if `show_files=False`
-	filtered_node = [item for item in node if item["type"] == "folder" or show_files]
-	total_entries = len(filtered_node)
+	def shown(listing):
+		return [item for item in listing if item["type"] == "folder" or show_files]
+
+	# each frame: [prefix, entries left] of a listing being drawn
+	frames = []
 
-	for index, item in enumerate(filtered_node):
-		is_last = index == total_entries - 1
+	def draw(item, depth):
+		frame = frames[depth]
+		frame[1] -= 1
+		is_last = frame[1] == 0
 		connector = style["lastline"] if is_last else style["line"]
 		if show_emojis:
 			if item["type"] == "folder":
 				connector = f"{connector}{get_folder_icon(item['name'])}"
 			elif item["type"] == "file":
 				connector = f"{connector}{get_file_icon(item['name'], item['mime'])}"
+		if item["type"] == "folder" or (item["type"] == "file" and show_files):
+			lines.append(frame[0] + connector + item["name"])
 		if item["type"] == "folder":
-			lines.append(prefix + connector + item["name"])
-			new_prefix = prefix + (blank if is_last else f"{style['vertical']}")
-			generate_tree(item['children'], draw_type=draw_type, prefix=new_prefix, lines=lines, show_files=show_files, show_emojis=show_emojis)
-		elif item["type"] == "file" and show_files:
-			lines.append(prefix + connector + item["name"])
-
+			frames.append([frame[0] + (blank if is_last else f"{style['vertical']}"), 0])
+
+	def children(item):
+		if item["type"] != "folder":
+			return None
+		listing = shown(item["children"])
+		frames[-1][1] = len(listing)
+		return listing
+
+	top = shown(node)
+	frames.append([prefix, len(top)])
+	walk_tree(top, draw, lambda item, depth: frames.pop(), children)
 	return lines
 
 
@@ -2166,35 +4346,1340 @@ def save_result_as_markdown(result, output_file="result.md", query=""):
 	with open(output_file, "w") as f:
 		f.writelines("\n".join(write_lines))
 
-def decompress_bz2_to_json(file_path, chunk_size=1024 * 1024):
-	"""Decompresses a .bz2 file containing JSON data and returns JSON data,
+SNAPSHOT_LOADERS = ("auto", "ijson", "orjson", "json")
+
+class _CountingReader:
+	"""Binary reader wrapper that counts the decompressed bytes read through it."""
+	def __init__(self, f):
+		self.f = f
+		self.count = 0
+
+	def read(self, size=-1):
+		chunk = self.f.read(size)
+		self.count += len(chunk)
+		return chunk
+
+class _InternedKeysDict(dict):
+	"""
+	dict that interns its keys as ijson builds it.
+
+	The standard parsers share one key string between all records, ijson creates a new one
+	per record, which for a snapshot costs more memory than the JSON text itself.
+	"""
+	__slots__ = ()
+
+	def __setitem__(self, key, value, _intern=sys.intern, _setitem=dict.__setitem__):
+		_setitem(self, _intern(key), value)
+
+def _read_json_value(events, event, value):
+	"""Finish the JSON value that starts with (event, value) in an ijson `basic_parse` stream."""
+	if event not in ("start_map", "start_array"):
+		return value
+	builder = ijson.ObjectBuilder()
+	builder.event(event, value)
+	depth = 1
+	for event, value in events:
+		builder.event(event, value)
+		if event in ("start_map", "start_array"):
+			depth += 1
+		elif event in ("end_map", "end_array"):
+			depth -= 1
+			if not depth:
+				break
+	return builder.value
+
+def get_peak_rss():
+	"""Return this process's peak resident set size in bytes, or None if it is not reported."""
+	if os.name == "nt":
+		return getattr(psutil.Process().memory_info(), "peak_wset", None)
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	return peak if sys.platform == "darwin" else peak * 1024 # Linux reports KiB
+
+def decompress_bz2_to_json(file_path, chunk_size=1024 * 1024, loader="auto", derive_paths=True):
+	"""Decompresses a snapshot containing JSON data and returns JSON data,
 	original JSON size, and compressed JSON size, using minimal memory.
+
+	The codec (bz2, gzip, lzma, zstd or plain JSON) is detected from the file's magic
+	bytes, and multi-stream files written by `ParallelBlockWriter` are read to the end.
+	Indexed snapshots (see `IndexedSnapshot`) are decoded in full.
+
+	Loaders:
+		ijson: decompressed chunks go straight into an incremental parser that builds the
+			tree, the JSON text is never held in memory (lowest peak, slowest).
+		orjson: the decompressed bytes are parsed in one fast call.
+		json: the decompressed text is parsed by the standard library.
+		auto: the first of these that is installed.
 	
 	Args:
-		file_path (str): Path to the .bz2 compressed file.
+		file_path (str): Path to the compressed snapshot.
 		chunk_size (int, optional): Size of chunks to read. Default is 1MB.
+		loader (str, optional): One of `SNAPSHOT_LOADERS`. Default is "auto".
+		derive_paths (bool, optional): Rebuild the "path" of every record of a schema 2
+			snapshot (see `restore_paths`). Default is True.
 	
 	Returns:
 		tuple: (json_data, original_size, compressed_size)
 	"""
+	if loader == "auto":
+		loader = "ijson" if "ijson" in sys.modules else "orjson" if "orjson" in sys.modules else "json"
+	if loader not in SNAPSHOT_LOADERS:
+		raise ValueError(f"Unknown loader: {loader} (choose from {', '.join(SNAPSHOT_LOADERS)})")
+	if loader != "json" and loader not in sys.modules:
+		raise ModuleNotFoundError(f"The {loader} loader needs the {loader} module: `pip install {loader}`")
+	if is_indexed_snapshot(file_path): # decodes every listing, `IndexedSnapshot` alone reads them lazily
+		snapshot = IndexedSnapshot(file_path)
+		json_data = snapshot.load(derive_paths)
+		return json_data, snapshot.original_size, snapshot.compressed_size
 	compressed_size = os.path.getsize(file_path)
-	decompressor = bz2.BZ2Decompressor()
-	
-	json_buffer = io.StringIO()  # Efficient memory usage
-	original_size = 0
 
-	with open(file_path, 'rb') as f:
+	with open_snapshot_reader(file_path) as f:
+		if loader == "ijson":
+			reader = _CountingReader(f)
+			json_data = dict(ijson.kvitems(reader, "", use_float=True, map_type=_InternedKeysDict, buf_size=chunk_size))
+			return restore_paths(json_data) if derive_paths else json_data, reader.count, compressed_size
+		if loader == "orjson":
+			json_buffer = bytearray() # orjson parses the bytes as they are, no decoded copy
+			for chunk in iter(lambda: f.read(chunk_size), b''):
+				json_buffer += chunk
+			json_data = orjson.loads(json_buffer)
+			return restore_paths(json_data) if derive_paths else json_data, len(json_buffer), compressed_size
+
+		decoder = codecs.getincrementaldecoder('utf-8')() # a chunk may end inside a multi-byte character
+		json_buffer = io.StringIO()  # Efficient memory usage
+		original_size = 0
 		for chunk in iter(lambda: f.read(chunk_size), b''):
-			decompressed_chunk = decompressor.decompress(chunk)
-			original_size += len(decompressed_chunk)
-			json_buffer.write(decompressed_chunk.decode('utf-8'))
+			original_size += len(chunk)
+			json_buffer.write(decoder.decode(chunk))
+		json_buffer.write(decoder.decode(b'', final=True))
 
 	json_buffer.seek(0)  # Reset pointer before loading JSON
 	json_data = json.load(json_buffer)  # Stream directly to JSON
+	if derive_paths:
+		restore_paths(json_data)
 
 	return json_data, original_size, compressed_size
 
-def browse_json_tree(json_file):
+SIDECAR_MAGIC = b"TSPCOL01"
+SIDECAR_EXTENSION = ".cols"
+
+class ColumnarTree:
+	"""
+	A loaded snapshot kept as parallel typed arrays instead of one dict per entry.
+
+	The children of a folder are one contiguous range of indices (`first_child`,
+	`child_count`): entries are numbered breadth-first by `from_records`, and a listing
+	at a time, deepest first, by `from_json_stream`, whose top-level list comes last
+	(`root_start`). Numbers and timestamps live in
+	`array` columns, names in one UTF-8 blob indexed by an interned name table, and
+	repeated values (type, MIME, attributes, ...) in a shared value table. Paths are not
+	stored; they are rebuilt from the parent chain on demand.
+
+	`ColumnarNode` and `ColumnarChildren` expose the arrays as read-only dicts and lists,
+	so `navigate`, `get_top_n_largest`, `search_files` and friends work unchanged.
+
+	The columns can be cached in an uncompressed sidecar file (`save_sidecar`) and mapped
+	back in (`open_sidecar`), in which case they are memoryviews instead of arrays.
+	"""
+	NUMBER_COLUMNS = {"size": "q", "files": "q", "folders": "q", "ino": "q", "mtime": "d", "ctime": "d", "atime": "d"}
+	VALUE_COLUMNS = ("type", "mime", "attr", "target", "access_denied") # few distinct values each, other keys are added as they appear
+
+	def __init__(self):
+		self.numbers = {key: array(code) for key, code in self.NUMBER_COLUMNS.items()}
+		self.value_ids = {key: array('l') for key in self.VALUE_COLUMNS}
+		self.values = [] # shared value table, lists are kept once and copied on read
+		self.name_ids = array('l')
+		self.name_offsets = array('q', [0])
+		self.name_blob = bytearray()
+		self.parents = array('l')
+		self.first_child = array('l')
+		self.child_count = array('l')
+		self.layout_ids = array('l')
+		self.layouts = [] # (keys in record order, same keys as a set)
+		self.extras = {} # index -> {key: value} for values that fit no column
+		self.root_start = 0
+		self.root_count = 0
+		self.prefix = "" # path of the scanned folder, with a trailing separator
+		self.sep = os.sep
+
+	@classmethod
+	def from_records(cls, structure, consume=False, prefix=None, sep=None):
+		"""
+		Build the columns from a snapshot's "structure" list.
+
+		Args:
+			structure (list): Top-level records, as loaded from the snapshot.
+			consume (bool, optional): Empty the source records as they are copied, so their
+				memory is released during the build instead of after it.
+			prefix, sep (str, optional): Path prefix and separator of a schema 2 snapshot
+				whose records have no "path" (see `restore_paths`); detected when omitted.
+
+		Returns:
+			ColumnarTree: The tree; `tree.root` is the top-level list.
+		"""
+		tree = cls()
+		if prefix is None:
+			tree.prefix, tree.sep = detect_path_prefix(structure)
+		else:
+			tree.prefix, tree.sep = prefix, sep or os.sep
+		tree.root_count = len(structure)
+		name_index = {}
+		value_index = {}
+		layout_index = {}
+		pending = deque([(structure, -1, None)])
+		while pending:
+			records, parent, parent_path = pending.popleft()
+			if parent >= 0:
+				tree.first_child[parent] = len(tree.parents)
+				tree.child_count[parent] = len(records)
+			for record in records:
+				index = tree._append(record, parent, parent_path, name_index, value_index, layout_index)
+				children = record.get("children")
+				if isinstance(children, list):
+					pending.append((children, index, record["path"] if "path" in record else tree.path(index)))
+				if consume:
+					record.clear()
+			if consume:
+				records.clear()
+		return tree
+
+	@classmethod
+	def from_json_stream(cls, f, chunk_size=1024 * 1024):
+		"""
+		Build the columns straight from a snapshot's JSON text with ijson, never loading it whole.
+
+		A listing is packed when its closing bracket is read, so only the records of the
+		listings on the current branch are held as dicts, and those without their children.
+
+		Args:
+			f: Binary file object with the decompressed JSON (see `open_snapshot_reader`).
+			chunk_size (int, optional): Bytes handed to the parser at a time.
+
+		Returns:
+			tuple: (tree, data) where data is the snapshot without its "structure".
+		"""
+		tree = cls()
+		data = {}
+		events = iter(ijson.basic_parse(f, use_float=True, buf_size=chunk_size))
+		if next(events, (None, None))[0] != "start_map":
+			raise ValueError("Not a snapshot: the JSON is not an object")
+		for event, key in events:
+			if event == "end_map":
+				break
+			event, value = next(events)
+			if key == "structure" and event == "start_array":
+				tree._pack_listings(events)
+			else:
+				data[key] = _read_json_value(events, event, value)
+		report_info = data.get("report_info") or {}
+		if report_info.get("schema_version", 1) >= 2:
+			tree.prefix, tree.sep = report_info.get("path_prefix", ""), report_info.get("path_separator") or os.sep
+		return tree, data
+
+	def _pack_listings(self, events):
+		"""Append the records of the "structure" array that `events` is inside of, see `from_json_stream`."""
+		name_index = {}
+		value_index = {}
+		layout_index = {}
+		listings = [[]] # records read in each open listing, as [record, first_child, child_count]
+		records = [] # records being read, the innermost one belongs to listings[-1]
+		for event, value in events:
+			if len(records) < len(listings): # between two records of the innermost listing
+				if event == "start_map":
+					records.append([{}, 0, 0])
+					continue
+				listing = listings.pop() # end_array
+				first = len(self.parents)
+				if records:
+					# A parent without a "path" (schema 2) gives one no child path can match
+					parent_path = records[-1][0].get("path", "\0")
+					records[-1][1:] = first, len(listing)
+				else:
+					parent_path = None
+					self.root_start, self.root_count = first, len(listing)
+					self.prefix, self.sep = detect_path_prefix([record for record, _, _ in listing])
+				for record, first_child, child_count in listing:
+					index = self._append(record, -1, parent_path, name_index, value_index, layout_index)
+					self.first_child[index] = first_child
+					self.child_count[index] = child_count
+					for child in range(first_child, first_child + child_count):
+						self.parents[child] = index
+				if not records:
+					return
+			elif event == "map_key":
+				event, item = next(events)
+				if value == "children" and event == "start_array":
+					records[-1][0]["children"] = None # keeps its place among the keys
+					listings.append([])
+				else:
+					records[-1][0][value] = _read_json_value(events, event, item)
+			else: # end_map
+				listings[-1].append(records.pop())
+
+	def _intern(self, value, value_index):
+		"""Return the value table id of `value`, or None if it cannot be shared."""
+		try:
+			key = (type(value).__name__, tuple(value) if isinstance(value, list) else value)
+			value_id = value_index.get(key)
+		except TypeError: # unhashable, e.g. a nested dict
+			return None
+		if value_id is None:
+			value_id = value_index[key] = len(self.values)
+			self.values.append(value)
+		return value_id
+
+	def _append(self, record, parent, parent_path, name_index, value_index, layout_index):
+		index = len(self.parents)
+		extras = {}
+		self.parents.append(parent)
+		self.first_child.append(0)
+		self.child_count.append(0)
+
+		keys = tuple(record)
+		if "path" not in record: # schema 2, the view still offers a derived path
+			keys = keys[:1] + ("path",) + keys[1:]
+		layout_id = layout_index.get(keys)
+		if layout_id is None:
+			layout_id = layout_index[keys] = len(self.layouts)
+			self.layouts.append((keys, frozenset(keys)))
+		self.layout_ids.append(layout_id)
+
+		name = record.get("name", "")
+		name_id = name_index.get(name) if isinstance(name, str) else None
+		if name_id is None:
+			if isinstance(name, str):
+				name_id = name_index[name] = len(self.name_offsets) - 1
+				self.name_blob += name.encode('utf-8', 'surrogatepass')
+				self.name_offsets.append(len(self.name_blob))
+			else:
+				name_id = 0
+				extras["name"] = name
+		self.name_ids.append(name_id)
+
+		for key, column in self.numbers.items():
+			value = record.get(key, 0)
+			try:
+				column.append(value)
+			except (TypeError, OverflowError):
+				column.append(0)
+				extras[key] = value
+		for key in keys: # any other key gets a value column of its own, padded for earlier entries
+			if key not in self.numbers and key not in self.value_ids and key not in ("name", "path", "children"):
+				self.value_ids[key] = array('l', [-1]) * index
+		for key, column in self.value_ids.items():
+			value_id = -1
+			if key in record:
+				value_id = self._intern(record[key], value_index)
+				if value_id is None:
+					value_id = -1
+					extras[key] = record[key]
+			column.append(value_id)
+
+		if "path" in record: # keep paths that do not follow from the parent's
+			expected = self.prefix + name if parent_path is None else f"{parent_path}{self.sep}{name}"
+			if record["path"] != expected:
+				extras["path"] = record["path"]
+		if extras:
+			self.extras[index] = extras
+		return index
+
+	@property
+	def root(self):
+		"""Top-level entries, like the snapshot's "structure" list."""
+		return ColumnarChildren(self, self.root_start, self.root_count)
+
+	def name(self, index):
+		name_id = self.name_ids[index]
+		return str(self.name_blob[self.name_offsets[name_id]:self.name_offsets[name_id + 1]], 'utf-8', 'surrogatepass')
+
+	def path(self, index):
+		"""Rebuild an entry's path from its ancestors' names."""
+		names = []
+		while index >= 0:
+			extras = self.extras.get(index)
+			if extras is not None and "path" in extras:
+				names.append(extras["path"])
+				return self.sep.join(reversed(names))
+			names.append(self.name(index))
+			index = self.parents[index]
+		return self.prefix + self.sep.join(reversed(names))
+
+	def get(self, index, key):
+		"""Value of `key` for one entry, KeyError if that entry's record had no such key."""
+		if key not in self.layouts[self.layout_ids[index]][1]:
+			raise KeyError(key)
+		extras = self.extras.get(index)
+		if extras is not None and key in extras:
+			return extras[key]
+		if key == "name":
+			return self.name(index)
+		if key == "path":
+			return self.path(index)
+		if key == "children":
+			return ColumnarChildren(self, self.first_child[index], self.child_count[index])
+		column = self.numbers.get(key)
+		if column is not None:
+			return column[index]
+		value = self.values[self.value_ids[key][index]]
+		return list(value) if isinstance(value, list) else value
+
+	def memory_size(self):
+		"""Approximate bytes held by the columns and tables (not counting shared values)."""
+		arrays = [self.name_ids, self.name_offsets, self.parents, self.first_child, self.child_count, self.layout_ids]
+		arrays += list(self.numbers.values()) + list(self.value_ids.values())
+		return sum(column.itemsize * len(column) for column in arrays) + len(self.name_blob)
+
+	def _fixed_columns(self):
+		"""Every fixed-width column by name, as a sidecar stores them."""
+		columns = {"name_ids": self.name_ids, "name_offsets": self.name_offsets, "name_blob": self.name_blob, "parents": self.parents, "first_child": self.first_child, "child_count": self.child_count, "layout_ids": self.layout_ids}
+		columns.update(("number:" + key, column) for key, column in self.numbers.items())
+		columns.update(("value:" + key, column) for key, column in self.value_ids.items())
+		return columns
+
+	def save_sidecar(self, file_path, source_file, data, original_size):
+		"""
+		Write the columns uncompressed to `file_path`, a cache of `source_file` that
+		`open_sidecar` maps back in without parsing anything.
+
+		Layout: magic, u64 LE header length, JSON header (column offsets, value and layout
+		tables, extras, the snapshot's other keys and the source's size, mtime and inode),
+		then each column's raw native bytes, 8-byte aligned.
+
+		Args:
+			file_path (str): Sidecar path, replaced atomically.
+			source_file (str): Snapshot the columns were loaded from.
+			data (dict): The loaded snapshot; everything but "structure" is kept in the header.
+			original_size (int): Uncompressed size of the snapshot, for the report.
+		"""
+		source = os.stat(source_file)
+		columns = []
+		offset = 0
+		for name, column in self._fixed_columns().items():
+			fmt = column.typecode if isinstance(column, array) else "B"
+			columns.append([name, fmt, offset, len(column)])
+			offset += -(-len(column) * memoryview(column).itemsize // 8) * 8
+		header = json.dumps({
+			"version": 1,
+			"native": [sys.byteorder] + [array(code).itemsize for code in "qdl"],
+			"source": [source.st_size, source.st_mtime_ns, source.st_ino],
+			"original_size": original_size,
+			"columns": columns,
+			"values": self.values,
+			"layouts": [list(keys) for keys, _ in self.layouts],
+			"extras": {str(index): extras for index, extras in self.extras.items()},
+			"root_start": self.root_start,
+			"root_count": self.root_count,
+			"prefix": self.prefix,
+			"sep": self.sep,
+			"data": {key: value for key, value in data.items() if key != "structure"},
+		}, separators=(',', ':')).encode('utf-8')
+		temp_file = file_path + ".tmp"
+		try:
+			with open(temp_file, 'wb') as f:
+				f.write(SIDECAR_MAGIC + struct.pack("<Q", len(header)) + header)
+				f.write(b"\0" * (-f.tell() % 8))
+				for name, column in self._fixed_columns().items():
+					f.write(memoryview(column))
+					f.write(b"\0" * (-f.tell() % 8))
+			os.replace(temp_file, file_path)
+		except BaseException:
+			if os.path.exists(temp_file):
+				os.remove(temp_file)
+			raise
+
+	@classmethod
+	def open_sidecar(cls, file_path, source_file):
+		"""
+		Map a sidecar written by `save_sidecar`. The columns become read-only memoryviews over
+		the mapping, so nothing is read until it is used, and sessions share the page cache.
+
+		Returns:
+			tuple: (tree, data, original_size) with data["structure"] set to `tree.root`, or None
+			if the sidecar is missing, damaged, from another platform or older than `source_file`.
+		"""
+		try:
+			source = os.stat(source_file)
+			with open(file_path, 'rb') as f:
+				mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		except (OSError, ValueError): # missing or empty
+			return None
+		try:
+			if mapped[:len(SIDECAR_MAGIC)] != SIDECAR_MAGIC:
+				raise ValueError("bad magic")
+			header_size = struct.unpack_from("<Q", mapped, len(SIDECAR_MAGIC))[0]
+			start = len(SIDECAR_MAGIC) + 8
+			header = json.loads(mapped[start:start + header_size])
+			if header["version"] != 1 or header["native"] != [sys.byteorder] + [array(code).itemsize for code in "qdl"]:
+				raise ValueError("written by another version or platform")
+			if header["source"] != [source.st_size, source.st_mtime_ns, source.st_ino]:
+				raise ValueError("the snapshot has changed")
+			base = start + header_size
+			base += -base % 8
+			view = memoryview(mapped)
+			tree = cls()
+			tree.numbers = {}
+			tree.value_ids = {}
+			for name, fmt, offset, length in header["columns"]:
+				size = length * array(fmt).itemsize
+				if base + offset + size > len(mapped):
+					raise ValueError("truncated")
+				column = view[base + offset:base + offset + size].cast(fmt)
+				if name.startswith("number:"):
+					tree.numbers[name[len("number:"):]] = column
+				elif name.startswith("value:"):
+					tree.value_ids[name[len("value:"):]] = column
+				else:
+					setattr(tree, name, column)
+		except (ValueError, KeyError, TypeError, struct.error) as e:
+			logger.debug(f"Sidecar {file_path} not used: {e}")
+			tree = view = column = None
+			try:
+				mapped.close()
+			except BufferError: # a view is still referenced, the mapping closes with it
+				pass
+			return None
+		tree.values = header["values"]
+		tree.layouts = [(tuple(keys), frozenset(keys)) for keys in header["layouts"]]
+		tree.extras = {int(index): extras for index, extras in header["extras"].items()}
+		tree.root_start = header.get("root_start", 0)
+		tree.root_count = header["root_count"]
+		tree.prefix = header["prefix"]
+		tree.sep = header["sep"]
+		tree.mapped = mapped # the views need the mapping open
+		data = header["data"]
+		data["structure"] = tree.root
+		return tree, data, header["original_size"]
+
+class ColumnarNode(Mapping):
+	"""Read-only dict view of one `ColumnarTree` entry."""
+	__slots__ = ("tree", "index")
+
+	def __init__(self, tree, index):
+		self.tree = tree
+		self.index = index
+
+	def __getitem__(self, key):
+		return self.tree.get(self.index, key)
+
+	def __contains__(self, key):
+		return key in self.tree.layouts[self.tree.layout_ids[self.index]][1]
+
+	def __iter__(self):
+		return iter(self.tree.layouts[self.tree.layout_ids[self.index]][0])
+
+	def __len__(self):
+		return len(self.tree.layouts[self.tree.layout_ids[self.index]][0])
+
+	def __eq__(self, other):
+		if isinstance(other, ColumnarNode):
+			return self.tree is other.tree and self.index == other.index
+		return Mapping.__eq__(self, other)
+
+	def __hash__(self):
+		return hash((id(self.tree), self.index))
+
+	def __repr__(self):
+		return f"ColumnarNode({self.tree.path(self.index)!r})"
+
+class ColumnarChildren(Sequence):
+	"""Read-only list view of a contiguous range of `ColumnarTree` entries."""
+	__slots__ = ("tree", "start", "count")
+
+	def __init__(self, tree, start, count):
+		self.tree = tree
+		self.start = start
+		self.count = count
+
+	def __len__(self):
+		return self.count
+
+	def __getitem__(self, index):
+		if isinstance(index, slice):
+			return [ColumnarNode(self.tree, self.start + i) for i in range(*index.indices(self.count))]
+		if index < 0:
+			index += self.count
+		if not 0 <= index < self.count:
+			raise IndexError("child index out of range")
+		return ColumnarNode(self.tree, self.start + index)
+
+	def __iter__(self):
+		tree = self.tree
+		return (ColumnarNode(tree, i) for i in range(self.start, self.start + self.count))
+
+class ColumnarRecords(Sequence):
+	"""List of chosen `ColumnarTree` entries kept as column indices, e.g. a folder's top K in `AggregateIndex`."""
+	__slots__ = ("tree", "indices")
+
+	def __init__(self, tree, records=()):
+		self.tree = tree
+		self.indices = array('l', (record.index for record in records))
+
+	def append(self, record):
+		self.indices.append(record.index)
+
+	def __len__(self):
+		return len(self.indices)
+
+	def __getitem__(self, index):
+		if isinstance(index, slice):
+			return [ColumnarNode(self.tree, i) for i in self.indices[index]]
+		return ColumnarNode(self.tree, self.indices[index])
+
+	def __iter__(self):
+		tree = self.tree
+		return (ColumnarNode(tree, i) for i in self.indices)
+
+def columnar_to_json(obj):
+	"""`json.JSONEncoder.default` hook that writes columnar, indexed and SQLite views as the dicts and lists they stand for."""
+	if isinstance(obj, ColumnarNode):
+		return dict(obj)
+	if isinstance(obj, (ColumnarChildren, ColumnarRecords, IndexedChildren, SqliteChildren)):
+		return list(obj)
+	raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+# Snapshot databases: snapshots exported to SQLite, one row per entry, several snapshots per file.
+# Entries are numbered depth-first (preorder) across the whole database, so a folder's subtree
+# is the id range (id, last_id] and a listing in id order keeps the snapshot's order.
+SNAPSHOT_DB_MAGIC = b"SQLite format 3\x00"
+SNAPSHOT_DB_EXTENSION = ".sqlite"
+SNAPSHOT_DB_COLUMNS = ("type", "mime", "size", "files", "folders", "mtime", "ctime", "atime")
+
+def is_snapshot_database(file_path):
+	"""Return True if `file_path` is a SQLite database (see `export_snapshot_sqlite`)."""
+	with open(file_path, 'rb') as f:
+		return f.read(len(SNAPSHOT_DB_MAGIC)) == SNAPSHOT_DB_MAGIC
+
+def create_snapshot_tables(connection):
+	"""Create the snapshot database tables and indexes if they are missing."""
+	connection.execute("CREATE TABLE IF NOT EXISTS snapshots (id INTEGER PRIMARY KEY, source TEXT, original_path TEXT, end_time REAL, original_size INTEGER, compressed_size INTEGER, report_info TEXT)")
+	connection.execute("CREATE TABLE IF NOT EXISTS entries (id INTEGER PRIMARY KEY, snapshot_id INTEGER, parent_id INTEGER, last_id INTEGER, name TEXT, name_lower TEXT, ext TEXT, path TEXT, type TEXT, mime TEXT, size INTEGER, files INTEGER, folders INTEGER, mtime REAL, ctime REAL, atime REAL, extra TEXT)")
+	for column in ("parent_id", "size", "mtime", "ext", "name", "path"):
+		connection.execute(f"CREATE INDEX IF NOT EXISTS entries_{column} ON entries (snapshot_id, {column})")
+
+def export_snapshot_sqlite(snapshot_file, db_file, batch_size=10000):
+	"""
+	Export a snapshot into a SQLite database, beside any snapshots exported there before.
+
+	`entries` keeps the searchable fields in columns (`SNAPSHOT_DB_COLUMNS`, plus the name,
+	its lowercase form, its extension and the path) and every other key of a record as JSON
+	in `extra`. Snapshots in one database can be joined on `path`, e.g.
+	`SELECT ... FROM entries a JOIN entries b ON a.path = b.path WHERE a.snapshot_id = 1 AND b.snapshot_id = 2`.
+
+	Args:
+		snapshot_file (str): Snapshot to export, any format `decompress_bz2_to_json` reads.
+		db_file (str): Database to create or add to.
+		batch_size (int, optional): Rows inserted per statement batch.
+
+	Returns:
+		int: Id of the exported snapshot in the `snapshots` table.
+	"""
+	data, original_size, compressed_size = decompress_bz2_to_json(snapshot_file)
+	report_info = data.get("report_info") or {}
+	connection = sqlite3.connect(db_file)
+	try:
+		create_snapshot_tables(connection)
+		snapshot_id = connection.execute("INSERT INTO snapshots (source, original_path, end_time, original_size, compressed_size, report_info) VALUES (?, ?, ?, ?, ?, ?)",
+			(os.path.abspath(snapshot_file), report_info.get("original_path"), report_info.get("end_time"), original_size, compressed_size, json.dumps(report_info))).lastrowid
+		next_id = (connection.execute("SELECT MAX(id) FROM entries").fetchone()[0] or 0) + 1
+		rows = []
+		last_ids = [] # (last descendant id, folder id), known once a folder is left
+		stack = [(iter(data["structure"]), None)]
+		with new_progress_bar(desc="🗄️ Exporting to SQLite...", unit=" entries") as dyn_tqdm:
+			while stack:
+				records, parent_id = stack[-1]
+				record = next(records, None)
+				if record is None:
+					stack.pop()
+					if parent_id is not None:
+						last_ids.append((next_id - 1, parent_id))
+					continue
+				entry_id = next_id
+				next_id += 1
+				name = record.get("name")
+				columns = []
+				extra = {}
+				for key in SNAPSHOT_DB_COLUMNS:
+					value = record.get(key)
+					if value is not None and not isinstance(value, (int, float, str)):
+						extra[key] = value
+						value = None
+					elif value is None and key in record: # keep an explicit null apart from a missing key
+						extra[key] = None
+					columns.append(value)
+				extra.update((key, value) for key, value in record.items() if key not in SNAPSHOT_DB_COLUMNS and key not in ("name", "path", "children"))
+				rows.append((entry_id, snapshot_id, parent_id, entry_id, name, name.lower() if isinstance(name, str) else None, os.path.splitext(name)[1].lower() if isinstance(name, str) else None, record.get("path"), *columns, json.dumps(extra) if extra else None))
+				children = record.get("children")
+				if record.get("type") == "folder" and children:
+					stack.append((iter(children), entry_id))
+				if len(rows) >= batch_size:
+					connection.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+					dyn_tqdm.update(len(rows))
+					rows = []
+			connection.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+			dyn_tqdm.update(len(rows))
+		connection.executemany("UPDATE entries SET last_id = ? WHERE id = ?", last_ids)
+		connection.commit()
+	except BaseException:
+		connection.rollback()
+		raise
+	finally:
+		connection.close()
+	return snapshot_id
+
+class SnapshotDatabase:
+	"""
+	Browse one snapshot of a database written by `export_snapshot_sqlite`.
+
+	`data` has the shape of a loaded snapshot with `SqliteChildren` views as "children", so
+	folders are read when they are opened, and `get_top_n_largest`, `search_files` and the
+	other tree helpers answer those views with indexed SQL instead of walking the tree.
+
+	Args:
+		db_file (str): Database path.
+		snapshot_id (int, optional): Snapshot to open, defaults to the latest export.
+	"""
+	RECORD_COLUMNS = "id, last_id, name, path, " + ", ".join(SNAPSHOT_DB_COLUMNS) + ", extra"
+
+	def __init__(self, db_file, snapshot_id=None):
+		self.db_file = db_file
+		self.connection = sqlite3.connect(db_file)
+		self.connection.create_function("regexp", 2, lambda pattern, value: value is not None and re.search(pattern, value, re.IGNORECASE) is not None, deterministic=True)
+		self.snapshot_count = self.connection.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0]
+		if snapshot_id is None:
+			row = self.connection.execute("SELECT id, original_size, compressed_size, report_info FROM snapshots ORDER BY id DESC LIMIT 1").fetchone()
+		else:
+			row = self.connection.execute("SELECT id, original_size, compressed_size, report_info FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+		if row is None:
+			self.connection.close()
+			raise ValueError(f"No snapshot {snapshot_id if snapshot_id is not None else ''} in {db_file}")
+		self.snapshot_id, self.original_size, self.compressed_size, report_info = row
+		first_id, last_id = self.connection.execute("SELECT MIN(id), MAX(id) FROM entries WHERE snapshot_id = ?", (self.snapshot_id,)).fetchone()
+		self.data = {"report_info": json.loads(report_info), "structure": SqliteChildren(self, None, last_id or 0)}
+		self.first_id = first_id or 1
+
+	def _record(self, row):
+		entry_id, last_id, name, path, *values, extra = row
+		record = {"name": name, "path": path}
+		for key, value in zip(SNAPSHOT_DB_COLUMNS, values):
+			if value is not None:
+				record[key] = value
+		if extra:
+			record.update(json.loads(extra))
+		if record.get("type") == "folder":
+			record["children"] = SqliteChildren(self, entry_id, last_id)
+		return record
+
+	def _scope(self, node, ordered=False):
+		"""
+		SQL condition and parameters selecting every entry below a `SqliteChildren` listing.
+		`ordered` picks a form that lets a top-N query walk the (snapshot_id, column) indexes.
+		"""
+		if node.parent_id is None and ordered:
+			return "snapshot_id = ?", (self.snapshot_id,)
+		if node.parent_id is None: # a snapshot's ids are contiguous too, a rowid range scans fastest
+			return "id >= ? AND id <= ?", (self.first_id, node.last_id)
+		return "id > ? AND id <= ?", (node.parent_id, node.last_id)
+
+	def _listing(self, parent_id, columns):
+		if parent_id is None:
+			return f"SELECT {columns} FROM entries WHERE snapshot_id = ? AND parent_id IS NULL", (self.snapshot_id,)
+		return f"SELECT {columns} FROM entries WHERE snapshot_id = ? AND parent_id = ?", (self.snapshot_id, parent_id)
+
+	def select(self, condition, params=(), order="id", limit=None):
+		"""Records matching a SQL condition on `entries`, as dicts."""
+		query = f"SELECT {self.RECORD_COLUMNS} FROM entries WHERE {condition} ORDER BY {order}"
+		if limit is not None:
+			query += f" LIMIT {int(limit)}"
+		return [self._record(row) for row in self.connection.execute(query, params)]
+
+	def children(self, parent_id):
+		query, params = self._listing(parent_id, self.RECORD_COLUMNS)
+		return [self._record(row) for row in self.connection.execute(query + " ORDER BY id", params)]
+
+	def count_children(self, parent_id):
+		query, params = self._listing(parent_id, "COUNT(*)")
+		return self.connection.execute(query, params).fetchone()[0]
+
+	def top_largest(self, node, n, mode="files"):
+		"""`get_top_n_largest` for a listing."""
+		scope, params = self._scope(node, ordered=True)
+		return self.select(f"{scope} AND type {'!=' if mode == 'files' else '='} 'folder'", params, "size DESC, path DESC", n)
+
+	def top_recent(self, node, n, key="mtime"):
+		"""`get_top_n_recent_files` for a listing."""
+		if key not in ("mtime", "ctime", "atime"):
+			raise ValueError(f"Invalid key: {key}")
+		scope, params = self._scope(node, ordered=True)
+		return self.select(f"{scope} AND type IN ('file', 'symlink', 'junction')", params, f"{key} DESC", n)
+
+	def search(self, node, query, regex=False):
+		"""`search_files` for a listing: case-insensitive regex, or substring of the name."""
+		scope, params = self._scope(node)
+		if regex:
+			return self.select(f"{scope} AND name REGEXP ?", params + (query,))
+		return self.select(f"{scope} AND instr(name_lower, ?) > 0", params + (query.lower(),))
+
+	def empty_folders(self, node):
+		"""`search_empty_folders` for a listing."""
+		scope, params = self._scope(node)
+		return self.select(f"{scope} AND type = 'folder' AND last_id = id", params)
+
+	def duplicates(self, node):
+		"""`search_duplicates` for a listing: files sharing a name and size, grouped together."""
+		scope, params = self._scope(node)
+		return self.select(f"{scope} AND type = 'file' AND (name, size) IN (SELECT name, size FROM entries WHERE {scope} AND type = 'file' GROUP BY name, size HAVING COUNT(*) > 1)", params + params, "name, size, id")
+
+	def common_types(self, node, mode="freq", searchfor="ext", total_size=None, total_files=None):
+		"""`get_most_common_types` for a listing."""
+		column = "mime" if searchfor == "mime" else "ext"
+		scope, params = self._scope(node)
+		if total_size is None or total_files is None: # like the tree walk: files directly in the listing
+			query, listing_params = self._listing(node.parent_id, "SUM(size), COUNT(*)")
+			direct_size, direct_files = self.connection.execute(query + " AND type = 'file'", listing_params).fetchone()
+			total_size = direct_size or 0 if total_size is None else total_size
+			total_files = direct_files if total_files is None else total_files
+		results = {types: (freq, size, size / total_size, freq / total_files) for types, freq, size in self.connection.execute(f"SELECT {column}, COUNT(*), SUM(size) FROM entries WHERE {scope} AND type = 'file' GROUP BY {column}", params)}
+		if mode == "name":
+			return sorted(results.items(), key=lambda x: x[0])
+		elif mode == "size":
+			return sorted(results.items(), key=lambda x: x[1][1], reverse=True)
+		return sorted(results.items(), key=lambda x: x[1][0], reverse=True)
+
+	def update_report_info(self, report_info):
+		"""Store a new report_info (e.g. an edited note) for this snapshot."""
+		self.connection.execute("UPDATE snapshots SET report_info = ? WHERE id = ?", (json.dumps(report_info), self.snapshot_id))
+		self.connection.commit()
+		self.data["report_info"] = report_info
+
+	def close(self):
+		self.connection.close()
+
+class SqliteChildren(Sequence):
+	"""List view of one folder listing of a `SnapshotDatabase`, read the first time an entry is used."""
+	__slots__ = ("database", "parent_id", "last_id", "records")
+
+	def __init__(self, database, parent_id, last_id):
+		self.database = database
+		self.parent_id = parent_id
+		self.last_id = last_id
+		self.records = None
+
+	def _records(self):
+		if self.records is None:
+			self.records = self.database.children(self.parent_id)
+		return self.records
+
+	def __len__(self):
+		if self.records is None:
+			return self.database.count_children(self.parent_id)
+		return len(self.records)
+
+	def __getitem__(self, index):
+		return self._records()[index]
+
+	def __iter__(self):
+		return iter(self._records())
+
+	def __repr__(self):
+		return f"SqliteChildren(snapshot={self.database.snapshot_id}, parent={self.parent_id})"
+
+def open_snapshot_tree(snapshot_file, loader="auto"):
+	"""
+	Open any snapshot for a read-only walk in little memory: indexed snapshots and SQLite
+	databases decode folders as they are used, JSON snapshots are packed into a `ColumnarTree`,
+	as they are parsed with the ijson loader (see `ColumnarTree.from_json_stream`), otherwise
+	after being loaded whole.
+
+	Returns:
+		tuple: (report_info, structure)
+	"""
+	if is_indexed_snapshot(snapshot_file):
+		data = IndexedSnapshot(snapshot_file).data
+		return data.get("report_info") or {}, data["structure"]
+	if is_snapshot_database(snapshot_file):
+		data = SnapshotDatabase(snapshot_file).data
+		return data.get("report_info") or {}, data["structure"]
+	if loader in ("auto", "ijson") and "ijson" in sys.modules:
+		with open_snapshot_reader(snapshot_file) as f:
+			tree, data = ColumnarTree.from_json_stream(f)
+		return data.get("report_info") or {}, tree.root
+	data, _, _ = decompress_bz2_to_json(snapshot_file, loader=loader, derive_paths=False)
+	report_info = data.get("report_info") or {}
+	if report_info.get("schema_version", 1) >= 2:
+		tree = ColumnarTree.from_records(data["structure"], consume=True, prefix=report_info.get("path_prefix", ""), sep=report_info.get("path_separator"))
+	else:
+		tree = ColumnarTree.from_records(data["structure"], consume=True)
+	return report_info, tree.root
+
+DIFF_CHANGES = ("modified", "resized", "moved", "removed", "added")
+DIFF_FILE_FIELDS = ("size", "mtime", "hash", "target") # compared on entries present in both snapshots
+
+def _merge_listings(old, new):
+	"""Pair up two folder listings by name: yields (old_item or None, new_item or None) in name order."""
+	by_name = lambda item: item["name"]
+	old = sorted(old, key=by_name)
+	new = sorted(new, key=by_name)
+	i = j = 0
+	while i < len(old) and j < len(new):
+		old_name, new_name = old[i]["name"], new[j]["name"]
+		if old_name == new_name:
+			yield old[i], new[j]
+			i += 1
+			j += 1
+		elif old_name < new_name:
+			yield old[i], None
+			i += 1
+		else:
+			yield None, new[j]
+			j += 1
+	for item in old[i:]:
+		yield item, None
+	for item in new[j:]:
+		yield None, item
+
+def _move_key(item):
+	"""What an entry has to keep to be recognized as moved rather than removed and re-added."""
+	if item["type"] == "folder":
+		return ("folder", item["name"], item["size"], item.get("files"), item.get("folders"))
+	if item.get("hash"):
+		return (item["type"], item["size"], item["hash"])
+	return (item["type"], item["name"], item["size"], item.get("mtime"), item.get("target"))
+
+def _iter_entries(entries, sep):
+	"""Yield (path, record) for `entries` (a list of (path, record)) and everything below them, in pre-order."""
+	stack = [iter(entries)]
+	while stack:
+		for path, item in stack[-1]:
+			yield path, item
+			if item["type"] == "folder":
+				stack.append(iter([(path + sep + child["name"], child) for child in item["children"]])) # built now, `path` moves on
+				break
+		else:
+			stack.pop()
+
+def _moved_within(entries, moved, sep):
+	"""
+	Size and file count of the `moved` entries (path -> record) that lie inside each folder of
+	`entries` (a list of (path, record)), by folder path. Entries inside a moved folder are
+	counted with it, not again.
+	"""
+	within = {path: [0, 0] for path, item in entries if item["type"] == "folder"}
+	for path, item in moved.items():
+		ancestor = path
+		while True:
+			cut = ancestor.rfind(sep)
+			if cut < 0:
+				break
+			ancestor = ancestor[:cut]
+			if ancestor in moved:
+				break
+			totals = within.get(ancestor)
+			if totals is not None:
+				totals[0] += item["size"]
+				totals[1] += (item.get("files") or 0) if item["type"] == "folder" else item["type"] == "file"
+				break
+	return within
+
+def diff_trees(old, new, sep="/", stats=None, detect_moves=True):
+	"""
+	Compare two snapshot trees of the same directory and yield their differences.
+
+	Both trees are walked together depth-first; at each folder the two listings are sorted by
+	name and merge-joined, so only the listings on the current branch are held, never a map of
+	every path. Entries present on one side only are held back until the walk ends, to pair
+	removed and added entries that are really moves (same content hash, or same name, size and
+	mtime; folders by name, size and counts), also inside removed and added folders. Removed
+	and added folders are reported once, not entry by entry, and without what moved out of or
+	into them.
+
+	Args:
+		old, new: Top-level listings of the two snapshots (see `open_snapshot_tree`).
+		sep (str, optional): Separator used to build the relative paths in the events.
+		stats (dict, optional): Filled with the number of events per change, "compared" entries,
+			"added_bytes" and "removed_bytes".
+		detect_moves (bool, optional): Pair removed and added entries into moves. Defaults to True.
+
+	Yields:
+		dict: An event with "change" (one of `DIFF_CHANGES`), "path" (relative to the snapshot
+			root), "type" and "size", plus "size_delta" and "fields" (modified), "size_delta"
+			and "files_delta" (resized folders), "old_path" (moved) or "files" (added/removed folders).
+			The size and files of an added or removed folder leave out entries moved into or out of it.
+			Modified and resized events come in path order during the walk, the rest after it.
+	"""
+	if stats is None:
+		stats = {}
+	for key in DIFF_CHANGES + ("compared", "added_bytes", "removed_bytes"):
+		stats.setdefault(key, 0)
+	removed = [] # (path, record) present only in the old snapshot
+	added = []
+
+	stack = [("", _merge_listings(old, new))]
+	while stack:
+		prefix, pairs = stack[-1]
+		for old_item, new_item in pairs:
+			if new_item is None:
+				removed.append((prefix + old_item["name"], old_item))
+				continue
+			if old_item is None:
+				added.append((prefix + new_item["name"], new_item))
+				continue
+			path = prefix + new_item["name"]
+			stats["compared"] += 1
+			if old_item["type"] != new_item["type"]: # e.g. a file replaced by a folder
+				removed.append((path, old_item))
+				added.append((path, new_item))
+				continue
+			if new_item["type"] == "folder":
+				if old_item["size"] != new_item["size"] or old_item.get("files") != new_item.get("files"):
+					stats["resized"] += 1
+					yield {"change": "resized", "path": path, "type": "folder", "size": new_item["size"], "size_delta": new_item["size"] - old_item["size"], "files_delta": (new_item.get("files") or 0) - (old_item.get("files") or 0)}
+				stack.append((path + sep, _merge_listings(old_item["children"], new_item["children"])))
+				break # walk the folder, then come back to this listing
+			fields = [field for field in DIFF_FILE_FIELDS if old_item.get(field) != new_item.get(field) and (field != "hash" or (old_item.get("hash") and new_item.get("hash")))]
+			if fields:
+				stats["modified"] += 1
+				yield {"change": "modified", "path": path, "type": new_item["type"], "size": new_item["size"], "size_delta": new_item["size"] - old_item["size"], "fields": fields}
+		else:
+			stack.pop()
+
+	if detect_moves and removed and added:
+		# Moves are matched inside removed and added folders too, e.g. a file moved into a new folder
+		candidates = defaultdict(list)
+		for path, item in _iter_entries(removed, sep):
+			candidates[_move_key(item)].append(path)
+		moved_from = {}
+		moved_to = {}
+		stack = [iter(added)]
+		while stack:
+			for path, item in stack[-1]:
+				sources = candidates.get(_move_key(item))
+				if sources:
+					old_path = sources.pop(0)
+					moved_from[old_path] = item
+					moved_to[path] = item
+					stats["moved"] += 1
+					yield {"change": "moved", "path": path, "old_path": old_path, "type": item["type"], "size": item["size"]}
+				elif item["type"] == "folder":
+					stack.append(iter([(path + sep + child["name"], child) for child in item["children"]]))
+					break
+			else:
+				stack.pop()
+		removed = [(path, item) for path, item in removed if path not in moved_from]
+		added = [(path, item) for path, item in added if path not in moved_to]
+		moved = {"removed": _moved_within(removed, moved_from, sep), "added": _moved_within(added, moved_to, sep)}
+	else:
+		moved = {"removed": {}, "added": {}}
+
+	for change, entries in (("removed", removed), ("added", added)):
+		for path, item in entries:
+			moved_size, moved_files = moved[change].get(path, (0, 0))
+			stats[change] += 1
+			stats[f"{change}_bytes"] += item["size"] - moved_size
+			event = {"change": change, "path": path, "type": item["type"], "size": item["size"] - moved_size}
+			if item["type"] == "folder":
+				event["files"] = item.get("files") if item.get("files") is None else item["files"] - moved_files
+			yield event
+
+def print_snapshot_diff(old_file, new_file, output_file=None, loader="auto", detect_moves=True):
+	"""
+	Compare two snapshots (any format) and print what changed, or write it to `output_file` as
+	JSON lines (one `diff_trees` event per line) and print only the summary.
+
+	Returns:
+		dict: The `diff_trees` stats.
+	"""
+	diff_start = time.perf_counter()
+	print(f"📖 Opening '{old_file}'...")
+	old_info, old_structure = open_snapshot_tree(old_file, loader)
+	print(f"📖 Opening '{new_file}'...")
+	new_info, new_structure = open_snapshot_tree(new_file, loader)
+	if old_info.get("original_path") != new_info.get("original_path"):
+		logger.warning(f"{colored_warn} The snapshots were taken of different paths: '{old_info.get('original_path')}' and '{new_info.get('original_path')}'")
+	sep = new_info.get("path_separator") or os.sep
+
+	icons = {"modified": "✏️", "resized": "📂", "moved": "🚚", "removed": "➖", "added": "➕"}
+	signed_size = lambda delta: f"{'+' if delta >= 0 else '-'}{humanize.naturalsize(abs(delta), binary=True)}"
+	stats = {}
+	output = open(output_file, "w", encoding="utf-8") if output_file else None
+	try:
+		for event in diff_trees(old_structure, new_structure, sep, stats, detect_moves):
+			if output is not None:
+				output.write(json.dumps(event, ensure_ascii=False) + "\n")
+				continue
+			change = event["change"]
+			if change == "moved":
+				details = f"{GREY}{event['old_path']}{RESET} -> {event['path']}"
+			elif change == "modified":
+				details = f"{event['path']} ({signed_size(event['size_delta'])}, {', '.join(event['fields'])})"
+			elif change == "resized":
+				details = f"{event['path']}{sep} ({signed_size(event['size_delta'])}, {event['files_delta']:+,} file{plural(abs(event['files_delta']))})"
+			elif event["type"] == "folder":
+				details = f"{event['path']}{sep} ({humanize.naturalsize(event['size'], binary=True)}, {humanize.intcomma(event['files'] or 0)} file{plural(event['files'] or 0)})"
+			else:
+				details = f"{event['path']} ({humanize.naturalsize(event['size'], binary=True)})"
+			print(f"{icons[change]} {change:<8} {details}")
+	finally:
+		if output is not None:
+			output.close()
+
+	old_size, new_size = old_info.get("total_size") or 0, new_info.get("total_size") or 0
+	peak_rss = get_peak_rss()
+	print(f"\n🧾 {' | '.join(f'{icons[change]} {humanize.intcomma(stats[change])} {change}' for change in DIFF_CHANGES)}")
+	print(f"📏 Total: {humanize.naturalsize(old_size, binary=True)} -> {humanize.naturalsize(new_size, binary=True)} ({signed_size(new_size - old_size)}) | ➕ {humanize.naturalsize(stats['added_bytes'], binary=True)} added, ➖ {humanize.naturalsize(stats['removed_bytes'], binary=True)} removed")
+	print(f"⏱️ Compared {humanize.intcomma(stats['compared'])} entries in {format_duration(time.perf_counter() - diff_start)}{f' | 🧠 Peak RSS: {humanize.naturalsize(peak_rss, binary=True)}' if peak_rss else ''}")
+	if output_file:
+		print(f"{colored_check} Changes written to '{output_file}'")
+	return stats
+
+DEFAULT_TREND_DEPTH = 3
+DEFAULT_TREND_WORKERS = 2 # each worker holds one whole snapshot while summarizing it
+TREND_PATH_SEPARATOR = "/" # stored folder paths use it whatever the snapshot's separator, so schema 1 and 2 snapshots share keys
+MIN_TREND_DAYS = 1 / 24 # snapshots closer together than an hour give no growth rate
+TREND_SNAPSHOT_EXTENSIONS = SNAPSHOT_EXTENSIONS + (".json", INDEXED_SNAPSHOT_EXTENSION)
+
+def summarize_snapshot(snapshot_file, depth=DEFAULT_TREND_DEPTH, loader="auto"):
+	"""
+	Reduce a snapshot to what growth trends need: the size and file count of every folder down
+	to `depth` levels (the scanned folder itself is "", levels are joined by `TREND_PATH_SEPARATOR`),
+	and the file count and size per extension. Runs in the `ingest_snapshots` worker processes.
+
+	Returns:
+		dict: {"report_info": ..., "folders": [(path, size, files)], "types": [(ext, size, files)]}
+	"""
+	report_info, structure = open_snapshot_tree(snapshot_file, loader)
+	total_size = report_info.get("total_size") or 0
+	total_files = report_info.get("scanned_files") or 0
+	folders = [("", total_size, total_files)]
+	types = defaultdict(lambda: [0, 0]) # ext -> [size, files]
+	stack = [("", 1, iter(structure))]
+	while stack:
+		prefix, level, listing = stack[-1]
+		for item in listing:
+			if item["type"] == "folder":
+				path = prefix + item["name"]
+				if level <= depth:
+					folders.append((path, item["size"], item.get("files") or 0))
+				stack.append((path + TREND_PATH_SEPARATOR, level + 1, iter(item["children"])))
+				break
+			if item["type"] == "file":
+				histogram = types[os.path.splitext(item["name"])[1].lower()]
+				histogram[0] += item["size"]
+				histogram[1] += 1
+		else:
+			stack.pop()
+	summary_info = {key: report_info.get(key) for key in ("original_path", "start_time", "end_time", "total_size", "scanned_files", "scanned_folders")}
+	return {"report_info": summary_info, "folders": folders, "types": [(ext, size, files) for ext, (size, files) in types.items()]}
+
+class TrendStore:
+	"""
+	Time series of folder and file type sizes across snapshots, stored in SQLite next to the
+	config file.
+
+	Each snapshot is summarized once (see `summarize_snapshot`) and kept until its file changes,
+	so adding one new snapshot to a series only reads that snapshot. Trends are computed in SQL
+	as the least-squares growth rate of each folder and extension over the snapshots it
+	appears in.
+
+	Parameters:
+		db_file (str): Path of the SQLite database.
+	"""
+	def __init__(self, db_file):
+		self.db_file = db_file
+		self.connection = sqlite3.connect(db_file)
+		self.connection.executescript("""
+			CREATE TABLE IF NOT EXISTS snapshots (id INTEGER PRIMARY KEY, file TEXT UNIQUE, file_size INTEGER, file_mtime_ns INTEGER, depth INTEGER, original_path TEXT, start_time REAL, end_time REAL, total_size INTEGER, scanned_files INTEGER, scanned_folders INTEGER);
+			CREATE INDEX IF NOT EXISTS snapshots_original_path ON snapshots (original_path, end_time);
+			CREATE TABLE IF NOT EXISTS folder_sizes (snapshot_id INTEGER, path TEXT, size INTEGER, files INTEGER, PRIMARY KEY (snapshot_id, path)) WITHOUT ROWID;
+			CREATE TABLE IF NOT EXISTS type_sizes (snapshot_id INTEGER, ext TEXT, size INTEGER, files INTEGER, PRIMARY KEY (snapshot_id, ext)) WITHOUT ROWID;
+		""")
+		if self.connection.execute("PRAGMA user_version").fetchone()[0] < 1:
+			if os.sep == "\\": # folder paths used to be joined with the snapshot's separator
+				self.connection.execute("UPDATE folder_sizes SET path = replace(path, '\\', ?)", (TREND_PATH_SEPARATOR,))
+			self.connection.execute("PRAGMA user_version = 1")
+		self.connection.commit()
+
+	def is_current(self, snapshot_file, file_stat, depth):
+		"""Whether `snapshot_file` is stored, unchanged and summarized at least `depth` levels deep."""
+		row = self.connection.execute("SELECT file_size, file_mtime_ns, depth FROM snapshots WHERE file = ?", (os.path.abspath(snapshot_file),)).fetchone()
+		return row is not None and row[0] == file_stat.st_size and row[1] == file_stat.st_mtime_ns and row[2] >= depth
+
+	def add(self, snapshot_file, file_stat, depth, summary):
+		"""Store the summary of a snapshot, replacing an older one of the same file."""
+		info = summary["report_info"]
+		with self.connection:
+			self.remove(snapshot_file)
+			snapshot_id = self.connection.execute(
+				"INSERT INTO snapshots (file, file_size, file_mtime_ns, depth, original_path, start_time, end_time, total_size, scanned_files, scanned_folders) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+				(os.path.abspath(snapshot_file), file_stat.st_size, file_stat.st_mtime_ns, depth, info.get("original_path"), info.get("start_time"), info.get("end_time") or file_stat.st_mtime, info.get("total_size"), info.get("scanned_files"), info.get("scanned_folders"))).lastrowid
+			self.connection.executemany("INSERT INTO folder_sizes VALUES (?, ?, ?, ?)", ((snapshot_id, *row) for row in summary["folders"]))
+			self.connection.executemany("INSERT INTO type_sizes VALUES (?, ?, ?, ?)", ((snapshot_id, *row) for row in summary["types"]))
+		return snapshot_id
+
+	def remove(self, snapshot_file):
+		row = self.connection.execute("SELECT id FROM snapshots WHERE file = ?", (os.path.abspath(snapshot_file),)).fetchone()
+		if row is not None:
+			for table in ("folder_sizes", "type_sizes"):
+				self.connection.execute(f"DELETE FROM {table} WHERE snapshot_id = ?", row)
+			self.connection.execute("DELETE FROM snapshots WHERE id = ?", row)
+
+	def series(self, snapshot_files):
+		"""
+		Group stored snapshots by scanned folder.
+
+		Returns:
+			dict: original_path -> list of (id, end_time, total_size, scanned_files), oldest first.
+		"""
+		groups = defaultdict(list)
+		files = [os.path.abspath(snapshot_file) for snapshot_file in snapshot_files]
+		for offset in range(0, len(files), 500): # stay under SQLite's variable limit
+			chunk = files[offset:offset + 500]
+			for row in self.connection.execute(f"SELECT original_path, id, end_time, total_size, scanned_files FROM snapshots WHERE file IN ({', '.join('?' * len(chunk))})", chunk):
+				groups[row[0]].append(row[1:])
+		return {path: sorted(rows, key=lambda row: row[1]) for path, rows in groups.items()}
+
+	def growth(self, snapshot_ids, table="folder_sizes", key="path", depth=None, top=15):
+		"""
+		Rank the folders (or extensions with `table="type_sizes"`, `key="ext"`) of a series by
+		their growth rate, fitted over every snapshot they appear in.
+
+		Returns:
+			list: (key, first size, last size, bytes per day, files per day), fastest first.
+		"""
+		ids = ", ".join(str(int(snapshot_id)) for snapshot_id in snapshot_ids)
+		depth_filter = ""
+		parameters = []
+		if depth is not None and table == "folder_sizes": # count separators to limit the depth
+			depth_filter = "AND path != '' AND length(path) - length(replace(path, ?, '')) < ?"
+			parameters += [TREND_PATH_SEPARATOR, depth]
+		parameters += [MIN_TREND_DAYS, top]
+		# Deviations from each series' mean time and size, so the fit does not subtract huge
+		# near-equal sums of epoch days (which left only rounding noise)
+		query = f"""
+			SELECT {key},
+				sum(dt * (size - mean_size)) / sum(dt * dt) AS size_rate,
+				sum(dt * (files - mean_files)) / sum(dt * dt) AS files_rate,
+				min(CASE WHEN days = first_day THEN size END) AS first_size,
+				max(CASE WHEN days = last_day THEN size END) AS last_size
+			FROM (
+				SELECT {key}, size, files, days, first_day, last_day,
+					days - avg(days) OVER series AS dt,
+					avg(1.0 * size) OVER series AS mean_size,
+					avg(1.0 * files) OVER series AS mean_files
+				FROM (
+					SELECT t.{key}, t.size, t.files, (s.end_time - first.end_time) / 86400.0 AS days,
+						min(s.end_time - first.end_time) OVER (PARTITION BY t.{key}) / 86400.0 AS first_day,
+						max(s.end_time - first.end_time) OVER (PARTITION BY t.{key}) / 86400.0 AS last_day
+					FROM {table} t JOIN snapshots s ON s.id = t.snapshot_id
+						JOIN (SELECT min(end_time) AS end_time FROM snapshots WHERE id IN ({ids})) first
+					WHERE t.snapshot_id IN ({ids}) {depth_filter}
+				)
+				WINDOW series AS (PARTITION BY {key})
+			)
+			GROUP BY {key}
+			HAVING count(*) >= 2 AND max(days) - min(days) >= ? -- too short a span gives no meaningful rate
+			ORDER BY size_rate DESC LIMIT ?"""
+		return [(name, first_size, last_size, size_rate, files_rate) for name, size_rate, files_rate, first_size, last_size in self.connection.execute(query, parameters)]
+
+	def close(self):
+		self.connection.close()
+
+def find_snapshot_files(paths):
+	"""Expand folders in `paths` into the snapshot files they hold (not recursively), keeping files as given."""
+	snapshot_files = []
+	for path in paths:
+		if os.path.isdir(path):
+			snapshot_files.extend(sorted(entry.path for entry in os.scandir(path) if entry.is_file() and entry.name.lower().endswith(TREND_SNAPSHOT_EXTENSIONS)))
+		else:
+			snapshot_files.append(path)
+	return snapshot_files
+
+def ingest_snapshots(snapshot_files, store, depth=DEFAULT_TREND_DEPTH, workers=None, loader="auto"):
+	"""
+	Summarize the snapshots that `store` does not hold yet (or that changed since) on a process
+	pool, one snapshot per task, and store the results. Every worker opens a whole snapshot, so
+	`workers` (default `DEFAULT_TREND_WORKERS`) bounds how many are in memory at once.
+
+	Returns:
+		tuple: (summarized, cached) snapshot counts.
+	"""
+	pending = []
+	for snapshot_file in snapshot_files:
+		file_stat = os.stat(snapshot_file)
+		if not store.is_current(snapshot_file, file_stat, depth):
+			pending.append((snapshot_file, file_stat))
+	cached = len(snapshot_files) - len(pending)
+	if not pending:
+		return 0, cached
+
+	workers = min(workers or DEFAULT_TREND_WORKERS, len(pending))
+	summarized = 0
+	with new_progress_bar(total=len(pending), desc="📈 Summarizing snapshots", unit="snapshot") as progress_bar:
+		def store_result(snapshot_file, file_stat, get_summary):
+			nonlocal summarized
+			try:
+				store.add(snapshot_file, file_stat, depth, get_summary())
+				summarized += 1
+			except Exception as e:
+				logger.error(f"{colored_warn} Could not read snapshot '{snapshot_file}': [{type(e).__name__}] {e}")
+				error_logs.append({"name": snapshot_file, "type": type(e).__name__, "desc": str(e)})
+			progress_bar.update(1)
+
+		if workers <= 1:
+			for snapshot_file, file_stat in pending:
+				store_result(snapshot_file, file_stat, lambda: summarize_snapshot(snapshot_file, depth, loader))
+		else:
+			with process_pool(workers) as executor:
+				futures = {executor.submit(summarize_snapshot, snapshot_file, depth, loader): (snapshot_file, file_stat) for snapshot_file, file_stat in pending}
+				for future in concurrent.futures.as_completed(futures):
+					store_result(*futures[future], future.result)
+	return summarized, cached
+
+def print_growth_trends(paths, db_file, depth=DEFAULT_TREND_DEPTH, top=15, workers=None, loader="auto"):
+	"""
+	Summarize a series of snapshots into the trend store and print the fastest-growing folders
+	and file types of every scanned folder that has at least two snapshots.
+
+	Returns:
+		dict: "snapshots" found, how many were "summarized" or taken from the store ("cached"),
+			and the number of scanned folders ("series").
+	"""
+	trend_start = time.perf_counter()
+	snapshot_files = find_snapshot_files(paths)
+	stats = {"snapshots": len(snapshot_files), "summarized": 0, "cached": 0, "series": 0}
+	if not snapshot_files:
+		print(f"{colored_warn} No snapshots found in {', '.join(repr(path) for path in paths)}")
+		return stats
+	store = TrendStore(db_file)
+	try:
+		summarized, cached = ingest_snapshots(snapshot_files, store, depth, workers, loader)
+		stats.update(summarized=summarized, cached=cached)
+		print(f"📈 {humanize.intcomma(len(snapshot_files))} snapshot{plural(len(snapshot_files))}: {humanize.intcomma(summarized)} summarized, {humanize.intcomma(cached)} from '{db_file}' ({format_duration(time.perf_counter() - trend_start)})")
+		signed_size = lambda delta: f"{'+' if delta >= 0 else '-'}{humanize.naturalsize(abs(delta), binary=True)}"
+		series = store.series(snapshot_files)
+		stats["series"] = len(series)
+		for original_path, snapshots in series.items():
+			print(f"\n🌳 {original_path} - {len(snapshots)} snapshot{plural(len(snapshots))}, {seconds_to_datetime(snapshots[0][1])[:19]} -> {seconds_to_datetime(snapshots[-1][1])[:19]}")
+			if len(snapshots) < 2:
+				print(f"   {GREY}At least two snapshots are needed for a trend.{RESET}")
+				continue
+			if snapshots[-1][1] - snapshots[0][1] < MIN_TREND_DAYS * 86400:
+				print(f"   {GREY}The snapshots were taken less than an hour apart, too close for a trend.{RESET}")
+				continue
+			first, last = snapshots[0], snapshots[-1]
+			days = (last[1] - first[1]) / 86400
+			print(f"📏 Total: {humanize.naturalsize(first[2] or 0, binary=True)} -> {humanize.naturalsize(last[2] or 0, binary=True)} ({signed_size((last[2] or 0) - (first[2] or 0))} in {days:,.1f} days)")
+			snapshot_ids = [snapshot[0] for snapshot in snapshots]
+			for title, emoji, rows in (("folders", "📂", store.growth(snapshot_ids, depth=depth, top=top)), ("file types", "🧩", store.growth(snapshot_ids, "type_sizes", "ext", top=top))):
+				print(f"\n{emoji} Fastest-growing {title}:")
+				print(f"   {'per day':>12} {'files/day':>10} {'first':>10} {'last':>10}  {'name'}")
+				for name, first_size, last_size, size_rate, files_rate in rows:
+					if size_rate <= 0:
+						break
+					print(f"   {signed_size(size_rate):>12} {files_rate:>+10,.1f} {humanize.naturalsize(first_size or 0, binary=True):>10} {humanize.naturalsize(last_size or 0, binary=True):>10}  {name or '(no extension)' if title == 'file types' else name}")
+	finally:
+		store.close()
+	return stats
+
+def browse_json_tree(json_file, loader="auto", columnar=False, sidecar=False, aggregates=None, names=False, hash_workers=DEFAULT_HASH_WORKERS, hash_rate=0):
 
 	"""
 	Open a JSON file that was created by the Tree Spider and browse
@@ -2202,8 +5687,21 @@ def browse_json_tree(json_file):
 
 	Args:
 		json_file (str): The path to the JSON file to open and browse.
+		loader (str, optional): Snapshot parser, see `decompress_bz2_to_json`.
+		columnar (bool, optional): Keep the tree as a `ColumnarTree` (much less memory,
+			slower to open).
+		sidecar (bool, optional): Open the columns from an uncompressed cache next to the
+			snapshot (`json_file` + `SIDECAR_EXTENSION`), writing it on the first open and
+			again whenever the snapshot changes. Implies `columnar`.
+		aggregates (bool, optional): Build an `AggregateIndex` after loading, so /ext, /mime,
+			/top, /topf, /recent and /garbage do not walk the tree. It costs about 1-2 KiB per
+			folder, so None (the default) builds it for plain trees only, not with `columnar`
+			or `sidecar`, which are chosen to save memory.
+		names (bool, optional): Build a trigram `NameIndex` after loading for /search and /regex.
+		hash_workers (int, optional): Threads hashing files for /dupc.
+		hash_rate (int, optional): Bytes per second /dupc may read from disk (0 = unlimited).
 	"""
-	global error_message
+	global error_message, aggregate_index, name_index
 	error_message = ""
 
 	global dir_count, file_count
@@ -2228,12 +5726,69 @@ def browse_json_tree(json_file):
 				# close file
 				f_in.close()'''
 
-		data, original_size, compressed_size = decompress_bz2_to_json(json_file)
+		load_start = time.perf_counter()
+		indexed_snapshot = IndexedSnapshot(json_file) if is_indexed_snapshot(json_file) else None
+		snapshot_database = SnapshotDatabase(json_file) if indexed_snapshot is None and is_snapshot_database(json_file) else None
+		sidecar_file = json_file + SIDECAR_EXTENSION if sidecar and indexed_snapshot is None and snapshot_database is None else None
+		columnar = columnar or sidecar_file is not None
+		columnar_tree = None
+		if sidecar_file is not None:
+			mapped_sidecar = ColumnarTree.open_sidecar(sidecar_file, json_file)
+			if mapped_sidecar is not None: # nothing to decompress or parse
+				columnar_tree, data, original_size = mapped_sidecar
+				compressed_size = os.path.getsize(json_file)
+		if indexed_snapshot is not None: # only the index is read, folders are decoded as they are opened
+			data, original_size, compressed_size = indexed_snapshot.data, indexed_snapshot.original_size, indexed_snapshot.compressed_size
+		elif snapshot_database is not None: # folders are read as they are opened, searches become SQL queries
+			data, original_size, compressed_size = snapshot_database.data, snapshot_database.original_size, snapshot_database.compressed_size
+		elif columnar_tree is None:
+			data, original_size, compressed_size = decompress_bz2_to_json(json_file, loader=loader, derive_paths=not columnar) # columns derive paths themselves
+		load_seconds = time.perf_counter() - load_start
+		peak_rss = get_peak_rss()
+		print(f"\n⏱️ Loaded in {format_duration(load_seconds)}{f' | 🧠 Peak RSS: {humanize.naturalsize(peak_rss, binary=True)}' if peak_rss else ''}")
+		if indexed_snapshot is not None:
+			print(f"🗂️ Indexed snapshot: {humanize.intcomma(len(indexed_snapshot.rows))} folder listing{plural(len(indexed_snapshot.rows))}, decoded when opened")
+		if snapshot_database is not None:
+			print(f"🗄️ SQLite snapshot #{snapshot_database.snapshot_id} ({snapshot_database.snapshot_count} in the database), searches run as SQL queries")
 		print("\n🧐 Parsing...")
 
 
 		structure = data["structure"] # The most important part of the data
-
+		if columnar_tree is not None:
+			print(f"🗺️ Mapped {humanize.intcomma(len(columnar_tree.parents))} entries from the sidecar '{sidecar_file}'")
+		elif columnar and (indexed_snapshot is not None or snapshot_database is not None):
+			print("🧱 Indexed and SQLite snapshots are read lazily, not packed into columns")
+		elif columnar:
+			print("🧱 Packing into columns...")
+			schema_info = data.get("report_info") or {}
+			if schema_info.get("schema_version", 1) >= 2:
+				columnar_tree = ColumnarTree.from_records(structure, consume=True, prefix=schema_info.get("path_prefix", ""), sep=schema_info.get("path_separator"))
+			else:
+				columnar_tree = ColumnarTree.from_records(structure, consume=True)
+			structure = data["structure"] = columnar_tree.root
+			print(f"🧱 {humanize.intcomma(len(columnar_tree.parents))} entries in {humanize.naturalsize(columnar_tree.memory_size(), binary=True)} of columns")
+			if sidecar_file is not None:
+				try:
+					columnar_tree.save_sidecar(sidecar_file, json_file, data, original_size)
+					print(f"🗺️ Sidecar written for faster reopening: '{sidecar_file}'")
+				except OSError as e:
+					logger.warning(f"{colored_warn} Could not write the sidecar '{sidecar_file}': {e}")
+
+
+		aggregate_index = None
+		if aggregates is None:
+			aggregates = not (columnar or sidecar)
+		if aggregates and indexed_snapshot is None and snapshot_database is None: # lazy trees would be decoded in full
+			index_start = time.perf_counter()
+			aggregate_index = AggregateIndex.build(structure)
+			print(f"📇 Indexed {humanize.intcomma(len(aggregate_index.listings))} folder{plural(len(aggregate_index.listings))} in {format_duration(time.perf_counter() - index_start)}")
+		name_index = None
+		if names and indexed_snapshot is None and snapshot_database is None:
+			index_start = time.perf_counter()
+			name_index = NameIndex.build(structure)
+			print(f"🔤 Name index: {humanize.intcomma(len(name_index.postings))} trigram{plural(len(name_index.postings))} over {humanize.intcomma(len(name_index))} name{plural(len(name_index))} in {format_duration(time.perf_counter() - index_start)} | 🧠 {humanize.naturalsize(name_index.memory_size(), binary=True)}")
+		elif names:
+			print("🔤 Indexed and SQLite snapshots are searched without a name index")
 
 		edit_get_config(config_file, key="last_opened_json", value=json_file, mode="edit")
 	except KeyboardInterrupt:
@@ -2318,6 +5873,11 @@ def browse_json_tree(json_file):
 			report_info.append(f" 🕵️ Magic scanned:	{humanize.intcomma(report_data.get('magic_scanned'))} file{plural(report_data.get('magic_scanned'))}	[{type(z).__name__} %]\n")
 		report_info.append(f" 📊 Scanned Items:	\033[1m{humanize.intcomma(report_data.get('scanned_folders'))}{RESET} folder{plural(report_data.get('scanned_folders'))},	\033[1m{humanize.intcomma(report_data.get('scanned_files'))}{RESET} file{plural(report_data.get('scanned_files'))}")
 		report_info.append(f" 📦 Scanned Size:	\033[1m{humanize.naturalsize(report_data.get('total_size'), binary=True)}{RESET} ({humanize.intcomma(report_data.get('total_size'))} byte{plural(report_data.get('total_size'))})")
+		if report_data.get('mime_cache_hits') is not None:
+			cache_lookups = report_data.get('mime_cache_hits') + report_data.get('mime_cache_misses')
+			report_info.append(f" 🗄️ MIME cache:	{humanize.intcomma(report_data.get('mime_cache_hits'))} hit{plural(report_data.get('mime_cache_hits'))}, {humanize.intcomma(report_data.get('mime_cache_misses'))} miss{plural(report_data.get('mime_cache_misses'), 'es')}	[{report_data.get('mime_cache_hits') / cache_lookups * 100 if cache_lookups else 0:.2f} %]")
+		if report_data.get('syscalls_per_entry') is not None:
+			report_info.append(f" 🔩 Syscalls/entry:	{report_data.get('syscalls_per_entry')}	({humanize.intcomma(report_data.get('metadata_syscalls'))} metadata call{plural(report_data.get('metadata_syscalls'))} for {humanize.intcomma(report_data.get('scanned_entries'))} entr{plural(report_data.get('scanned_entries'), 'ies', 'y')})")
 		report_info.append(f" 🈲 Denied Folders:	{humanize.intcomma(report_data.get('denied_folders'))} folder{plural(report_data.get('denied_folders'))}\n")
 		report_info.append(f" ➗ Average Size:	\033[1m{humanize.naturalsize(average_size, binary=True)}{RESET} ({decimal_bytes_to_bits(average_size, True)})" )
 		try:
@@ -2617,7 +6177,7 @@ def browse_json_tree(json_file):
 			edit_user_note = input("\n¶ ").strip()
 			if not edit_user_note == "" or not data["user_note"] == edit_user_note:
 				if "report_info" in data:
-					data.update({"rerport_info": {"user_note": edit_user_note}})
+					data["report_info"]["user_note"] = edit_user_note
 				else:
 					data["user_note"] = edit_user_note
 
@@ -2627,7 +6187,12 @@ def browse_json_tree(json_file):
 					# compressed_data = bz2.compress(json.dumps(data, indent=4).encode('utf-8'))
 					# with open(json_file, 'wb') as f_out:
 					# 	f_out.write(compressed_data)
-					compress_json_stream(data, json_file, message="🗜️ Updating JSON...")
+					if indexed_snapshot is not None: # the note lives in the index, the blocks stay as they are
+						indexed_snapshot.update_report_info(data["report_info"])
+					elif snapshot_database is not None:
+						snapshot_database.update_report_info(data["report_info"])
+					else:
+						compress_json_stream(data, json_file, message="🗜️ Updating JSON...", codec=detect_codec(json_file)) # keep the snapshot's codec
 				except KeyboardInterrupt:
 					print(f"{colored_stop} Interrupted by user.")
 					return
@@ -2778,6 +6343,7 @@ def browse_json_tree(json_file):
 				print(" /dir /d	📂 Displays the properties of the current directory")
 				print(" /del NUMBER 	🚮 Deletes the selected file\n")
 				print(" /dup /u	🪞 Displays duplicate files in the current directory")
+				print(" /dupc /uc (-o)	🧬 Displays files with identical content in the current directory (reads candidate files from disk, -o: only use hashes stored by --content-hash)")
 				print(" /empty /ed	🫙 Displays empty directories in the current directory")
 				print(" /error /e	🚨 Displays error message logs from the snapshot report")
 				print(" /ext /x (%s)\n" % ", ".join(valid_type_keys), "		📎 Displays the most common file extensions in scanned files. (default key = freq)\n")
@@ -3209,6 +6775,48 @@ def browse_json_tree(json_file):
 					spinner.stop()
 					error_message = (f"{colored_exclamation} [{type(e).__name__}]: {e}")
 
+			# Show files with identical content
+			elif choice in ("/dupc -o", "/uc -o") and not data["report_info"].get("content_hash"):
+				error_message = (f"{colored_exclamation} This snapshot has no content hashes (scan with --content-hash), /dupc -o needs them.")
+			elif choice in ("/dupc", "/uc", "/dupc -o", "/uc -o"):
+				title_console(f"🧬 Identical Files - {program_name}")
+
+				offline = choice.endswith(" -o")
+				recorded_hashes = data["report_info"].get("content_hash")
+				print(f"🧬 Comparing file contents ({'recorded hashes only' if offline else f'{hash_workers} thread{plural(hash_workers)}'}{f', {humanize.naturalsize(hash_rate, binary=True)}/s' if hash_rate and not offline else ''}{', using recorded hashes' if recorded_hashes and not offline else ''})...")
+				try:
+					hash_start = time.perf_counter()
+					hash_errors = []
+					with new_progress_bar(unit="B", unit_scale=True) as hash_bar:
+						groups, stats = find_content_duplicates(node, hash_workers, hash_rate, progress_bar=hash_bar, error_logs=hash_errors, recorded=recorded_hashes, offline=offline)
+					results = [item for group in groups for item in group]
+					print(f"🧮 {humanize.intcomma(stats['candidates'])} same-size candidate{plural(stats['candidates'])}, {humanize.naturalsize(stats['bytes_read'], binary=True)} read in {format_duration(time.perf_counter() - hash_start)}{f' | {colored_warn} {len(hash_errors)} unreadable' if hash_errors else ''}")
+
+					if len(results) > 0:
+						set_nth_list(depth_dir_info, depth+1,
+						{
+							"name": "Identical Files",
+							"path": "<search:identical_files>",
+							"type": "folder",
+							"size": stats["reclaimable"],
+							"attr": [],
+							"ctime": 0,
+							"mtime": 0,
+							"atime": 0,
+							"files": len(results),
+							"folders": 0,
+							"access_denied": False
+						}
+						)
+						navigate(results, path + "[Identical Files]/", header=f"	🧬 {len(groups)} group{plural(len(groups))} of identical files, {humanize.naturalsize(stats['reclaimable'], binary=True)} reclaimable\n", emoji="🧬", column="path")
+					else:
+						error_message = (f"{colored_check} No files with identical content found.")
+				except KeyboardInterrupt:
+					print(f"{colored_stop} Exiting...")
+					return
+				except Exception as e:
+					error_message = (f"{colored_exclamation} [{type(e).__name__}]: {e}")
+
 			elif choice == "/tree" or choice == "/r" or choice.startswith("/tree ") or choice.startswith("/r "):
 				if choice.startswith("/tree ") or choice.startswith("/r "):
 					options = choice.split(" ")
@@ -3548,8 +7156,9 @@ def get_optimal_workers():
 	return max(2, min(10, total_memory // (512 * 1024 * 1024)))  # Example: Adjust dynamically
 
 def main(args):
-	global directory,json_file, scan_log_dir, action, threaded, gui_enabled, main_menu_enabled, error_message, open_after_scan, force_magic, use_magika, magic_max_size, max_threads,last_opened_json, last_scan_dir
+	global directory,json_file, scan_log_dir, action, threaded, gui_enabled, main_menu_enabled, error_message, open_after_scan, force_magic, use_magika, magic_max_size, max_threads,last_opened_json, last_scan_dir, mime_workers, sniff_bytes, incremental, incremental_base, codec, compress_level, compress_workers, headless
 	magic_max_size = naturalsize_to_int(args.threshold)
+	sniff_bytes = naturalsize_to_int(args.sniff_bytes)
 	directory = None
 	json_file = None
 	# Create the scan log directory
@@ -3583,9 +7192,32 @@ def main(args):
 		max_threads = args.max_threads
 	else: #get optimal number of threads
 		max_threads = get_optimal_workers()
+	if args.mime_workers is not None:
+		mime_workers = max(0, args.mime_workers)
+	else: # sniff inline unless asked for worker processes
+		mime_workers = 0
+	incremental = args.incremental is not None
+	codec = args.codec
+	compress_level = args.level
+	compress_workers = max(0, args.compress_workers)
+	try:
+		check_codec(codec)
+	except (ValueError, ModuleNotFoundError) as e:
+		logger.error(f"{colored_x} {e}")
+		exit(1)
+	snapshot_extension = INDEXED_SNAPSHOT_EXTENSION if args.indexed else ".json" + SNAPSHOT_CODECS[codec][1]
+	incremental_base = args.incremental or "" # empty means the last snapshot written
 	gui_enabled = args.gui
 	open_after_scan = args.explore
+	aggregates = False if args.no_aggregates else True if args.aggregates else None # None: not for --columnar/--sidecar
 	error_message = ""
+	headless = args.batch
+	if headless: # progress and log messages become JSON lines on stderr (see `new_progress_bar`)
+		for handler in logging.getLogger().handlers:
+			handler.setFormatter(BatchLogFormatter())
+		args.skip_note = True
+		gui_enabled = False
+		open_after_scan = False
 	force_magic = args.force_magic
 	try:
 		use_magika = args.use_magika
@@ -3593,7 +7225,7 @@ def main(args):
 		use_magika = False
 
 	def main_menu():
-		global action, threaded, directory, gui_enabled, main_menu_enabled, magic_max_size, json_file, error_message, open_after_scan, force_magic, use_magika, max_threads, last_opened_json, last_scan_dir	
+		global action, threaded, directory, gui_enabled, main_menu_enabled, magic_max_size, json_file, error_message, open_after_scan, force_magic, use_magika, max_threads, last_opened_json, last_scan_dir, mime_workers, incremental
 		main_menu_enabled = True
 		while True:
 			if os.path.exists(config_file):
@@ -3626,6 +7258,8 @@ def main(args):
 			print(f"  🪄 Force magic [{force_magic}]:	'{GREY}force{RESET}', '{GREY}f{RESET}'")
 			print(f"  🧵 Threads [{threaded}]:		'{GREY}threads{RESET}', '{GREY}t{RESET}'")
 			print(f"  🕸️ Max threads [{max_threads}]:	'{GREY}max{RESET}', '{GREY}x{RESET}'")
+			print(f"  🔬 MIME workers [{mime_workers if mime_workers else 'inline'}]:	'{GREY}workers{RESET}', '{GREY}w{RESET}'")
+			print(f"  ♻️ Incremental rescan [{incremental}]:	'{GREY}incremental{RESET}', '{GREY}i{RESET}'")
 			print(f"  🖱️ GUI filedialog [{gui_enabled}]:	'{GREY}gui{RESET}', '{GREY}g{RESET}'")
 			print(f"  ⛏️ Open after scan [{open_after_scan}]:	'{GREY}explore{RESET}', '{GREY}e{RESET}'")
 			print("\n 🐍 Debug\n")
@@ -3685,6 +7319,23 @@ def main(args):
 					except KeyboardInterrupt:
 						break
 				error_message = (f"🕸️ New Max Threads: {max_threads}")
+			elif action == "w" or action == "workers":
+				title_console("🔬 Set MIME Workers: ")
+				print("🔬 Set MIME sniffing processes (0 = sniff inline while scanning):")
+				print(f"Current: {mime_workers}")
+
+				while True:
+					try:
+						mime_workers = max(0, int(input(">>> ")))
+						break
+					except ValueError:
+						error_message = (f"{colored_warn} Invalid input. Please enter a number.")
+					except KeyboardInterrupt:
+						break
+				error_message = (f"🔬 New MIME workers: {mime_workers}")
+			elif action == "i" or action == "incremental":
+				incremental = not incremental
+				error_message = (f"♻️ Incremental rescan {'enabled' if incremental else 'disabled'}")
 			elif action == "g" or action == "gui":
 				gui_enabled = not gui_enabled
 				error_message = (f"🖱️ GUI {'enabled' if gui_enabled else 'disabled'}")
@@ -3764,16 +7415,17 @@ def main(args):
 		if args.output:
 			output_file = args.output
 		else:
-			default_output_file = f"{get_deepest_folder(directory)[:50]}_{seconds_to_datetime(time.time(), True)}.structure.json.bz2"
+			default_output_file = f"{get_deepest_folder(directory)[:50]}_{seconds_to_datetime(time.time(), True)}.structure{snapshot_extension}"
+			output_file = scan_log_dir +"/"+ default_output_file # used as is when nothing is asked (simulations, --batch)
 
-			if not args.simulate:
+			if not args.simulate and not headless:
 				title_console(f"💾 Output File - {program_name}")
 				if gui_enabled: # Set save location
 					root = Tk()
 					root.withdraw()
 					root.attributes("-topmost", True)
 					print("💾 Select the output file path:")
-					output_file = filedialog.asksaveasfilename(title="Select the output file", defaultextension=".json.bz2", initialdir=scan_log_dir, initialfile=default_output_file, filetypes=[("BZip2 JSON File", "*.json.bz2")])
+					output_file = filedialog.asksaveasfilename(title="Select the output file", defaultextension=snapshot_extension, initialdir=scan_log_dir, initialfile=default_output_file, filetypes=[(f"{codec} JSON File", f"*{snapshot_extension}")])
 					root.destroy()
 					if not output_file:
 						print(f"{colored_warn} No output file path provided.")
@@ -3791,10 +7443,10 @@ def main(args):
 					if not output_file:
 						output_file = scan_log_dir +"/"+ default_output_file
 						logger.warning(f"{colored_warn} No output file path provided. Defaulting to '{GREY}{output_file}{RESET}'")
-					elif output_file.endswith(".json"):
-						output_file += ".bz2"
-					elif not output_file.endswith(".json.bz2"):
-						output_file += ".json.bz2"
+					elif output_file.endswith(".json") and not args.indexed:
+						output_file += SNAPSHOT_CODECS[codec][1]
+					elif not output_file.endswith(snapshot_extension):
+						output_file += snapshot_extension
 
 					if os.path.exists(output_file):
 						print(f"{colored_warn} Output file already exists: '{output_file}' - overwrite? ({UNDERLINE}y{RESET}es/{UNDERLINE}n{RESET}o)\n")
@@ -3810,18 +7462,40 @@ def main(args):
 								print(f"{colored_warn} Invalid input. Please enter 'yes' or 'no'.")
 		global magic_scanned
 		magic_scanned = 0
+		previous_snapshot = None
+		if incremental:
+			previous_snapshot = incremental_base
+			if not previous_snapshot:
+				try:
+					previous_snapshot = edit_get_config(config_file, "last_snapshot", mode="get")
+				except Exception:
+					logger.warning(f"{colored_warn} No previous snapshot recorded yet, doing a full scan.")
+		incremental_flag = f' -i "{os.path.abspath(previous_snapshot)}"' if previous_snapshot else ""
 		print(f"⚖️ Magic MIME detection threshold: {humanize.naturalsize(magic_max_size, binary=True)} {'[FORCED]' if force_magic else ''}")
 		print(f"{colored_bulb} If scanning takes too long, consider using a lower threshold.")
-		print(f'📌 Running command: `{GREY}python3 {os.path.abspath(__file__)} -s "{directory}" -t {magic_max_size}{" -m" if args.simulate else ""}{" -th" if threaded else ""}{" -a" if no_attributes else ""}{" -f" if force_magic else ""}{" -e" if args.explore else ""}{" -k" if use_magika else ""} -o "{os.path.abspath(output_file)}"{" --no-estimates" if args.no_estimates else ""} {RESET}`\n')
+		print(f'📌 Running command: `{GREY}python3 {os.path.abspath(__file__)} -s "{directory}" -t {magic_max_size}{" -m" if args.simulate else ""}{" -th" if threaded else ""}{" -a" if no_attributes else ""}{" -f" if force_magic else ""}{" -e" if args.explore else ""}{" -k" if use_magika else ""} -w {mime_workers} --sniff-bytes {sniff_bytes} -o "{os.path.abspath(output_file)}"{" --no-estimates" if args.no_estimates else ""}{" --no-mime-cache" if args.no_mime_cache else ""}{incremental_flag}{" --stream" if args.stream else ""}{" --indexed" if args.indexed else ""} --codec {codec}{f" --level {compress_level}" if compress_level is not None else ""}{f" --compress-workers {compress_workers}" if compress_workers else ""}{f" --content-hash --hash-head {args.hash_head} --hash-full-below {args.hash_full_below}" if args.content_hash else ""}{" --no-hash-cache" if args.content_hash and args.no_hash_cache else ""}{" --batch" if headless else ""} {RESET}`\n')
 
-		time_taken = save_json_tree(directory, output_file=output_file, simulate=args.simulate, no_attributes=no_attributes, magic_max_size=magic_max_size, use_threads=threaded, force_magic=force_magic, no_estimates=args.no_estimates, use_magika=use_magika, max_threads=max_threads)
+		scan_summary = {}
+		time_taken = save_json_tree(directory, output_file=output_file, simulate=args.simulate, no_attributes=no_attributes, magic_max_size=magic_max_size, use_threads=threaded, force_magic=force_magic, no_estimates=args.no_estimates, use_magika=use_magika, max_threads=max_threads, mime_workers=mime_workers, sniff_bytes=sniff_bytes, use_mime_cache=not args.no_mime_cache, use_hash_cache=not args.no_hash_cache, previous_snapshot=previous_snapshot, stream=args.stream, codec=codec, compress_level=compress_level, compress_workers=compress_workers, indexed=args.indexed, hash_files=args.content_hash, hash_workers=args.hash_workers, hash_head_bytes=naturalsize_to_int(args.hash_head), hash_full_below=naturalsize_to_int(args.hash_full_below), hash_rate=naturalsize_to_int(args.hash_rate), summary=scan_summary)
 		sys.stdout.write("\n")
 		title_console(f"✅ Task Complete - {program_name}")
 		if args.simulate:
 			logger.info(f"{colored_check} Simulation complete!")
+		elif not scan_summary.get("written"):
+			logger.error(f"{colored_x} The snapshot could not be written to '{output_file}'")
 		else:
 			logger.info(f"{colored_check} Folder structure saved to '{output_file}'")
 			print(f'{colored_bulb} You can open output file with `{GREY}python3 "{os.path.abspath(__file__)}" -b "{os.path.abspath(output_file)}"{RESET}`')
+			if args.export_sqlite:
+				snapshot_id = export_snapshot_sqlite(output_file, args.export_sqlite)
+				logger.info(f"{colored_check} Exported as snapshot #{snapshot_id} to '{args.export_sqlite}'")
+				scan_summary["sqlite_snapshot_id"] = snapshot_id
+		if headless:
+			succeeded = args.simulate or scan_summary.get("written")
+			batch_event("summary", status="ok" if succeeded else "failed", directory=os.path.abspath(directory), output_file=None if args.simulate else os.path.abspath(output_file), simulated=args.simulate, **scan_summary)
+			if not succeeded:
+				exit(1)
+			return
 		if gui_enabled:
 			root = Tk()
 			root.withdraw()
@@ -3835,7 +7509,7 @@ def main(args):
 		else:
 			pause()
 		if open_after_scan:
-			browse_json_tree(output_file)
+			browse_json_tree(output_file, loader=args.loader, columnar=args.columnar, sidecar=args.sidecar, aggregates=aggregates, names=args.name_index, hash_workers=args.hash_workers, hash_rate=naturalsize_to_int(args.hash_rate))
 	def browse_mode():
 		global json_file, error_message
 		title_console(f"📑 Select Report - {program_name}")
@@ -3845,7 +7519,7 @@ def main(args):
 				root.withdraw()
 				root.attributes("-topmost", True)
 				print("📑 Select the BZip2 JSON file to browse:")
-				json_file = filedialog.askopenfilename(title="Select BZip2 JSON File", filetypes=[("JSON File", "*.json.bz2")],initialdir=scan_log_dir, defaultextension=".json.bz2")
+				json_file = filedialog.askopenfilename(title="Select JSON Snapshot", filetypes=[("JSON File", " ".join("*" + extension for extension in SNAPSHOT_EXTENSIONS)), ("Indexed Snapshot", f"*{INDEXED_SNAPSHOT_EXTENSION}")],initialdir=scan_log_dir, defaultextension=".json.bz2")
 				root.destroy()
 
 				if not json_file or json_file =='':
@@ -3863,11 +7537,11 @@ def main(args):
 				bz2_files = []
 				# Get all files with their midified timestamps and sizes
 				for file in os.listdir('.'):
-					if file.endswith(".json.bz2"):
+					if file.endswith(SNAPSHOT_EXTENSIONS + (INDEXED_SNAPSHOT_EXTENSION,)):
 						bz2_files.append((os.path.join(file), os.path.getmtime(os.path.join(file)), os.path.getsize(os.path.join(file))))
 				for root, _, files in os.walk(root_log_dir):
 					for file in files:
-						if file.endswith(".json.bz2"):
+						if file.endswith(SNAPSHOT_EXTENSIONS + (INDEXED_SNAPSHOT_EXTENSION,)):
 							bz2_files.append((os.path.join(root, file), os.path.getmtime(os.path.join(root, file)), os.path.getsize(os.path.join(root, file))))
 
 				# Sort the files by modified timestamp
@@ -3891,10 +7565,9 @@ def main(args):
 						logger.error(error_message)
 						exit(1)
 
-				if os.path.isfile(json_file+'.bz2'):
-					json_file = json_file+'.bz2'
-				elif os.path.isfile(json_file+'.json.bz2'):
-					json_file = json_file+'.json.bz2'
+				completions = [json_file + extension[len(".json"):] for extension in SNAPSHOT_EXTENSIONS] + [json_file + extension for extension in SNAPSHOT_EXTENSIONS] + [json_file + INDEXED_SNAPSHOT_EXTENSION]
+				if not os.path.isfile(json_file) and any(os.path.isfile(candidate) for candidate in completions):
+					json_file = next(candidate for candidate in completions if os.path.isfile(candidate))
 				elif not os.path.isfile(json_file):
 					error_message = (f"{colored_warn} Invalid JSON file path: '{json_file}'")
 					if gui_enabled:
@@ -3909,8 +7582,12 @@ def main(args):
 					else:
 						logger.error(error_message)
 						exit(1)
+		if args.export_sqlite and not is_snapshot_database(json_file):
+			snapshot_id = export_snapshot_sqlite(json_file, args.export_sqlite)
+			logger.info(f"{colored_check} Exported as snapshot #{snapshot_id} to '{args.export_sqlite}', browsing it there")
+			json_file = args.export_sqlite
 		print(f"\n📑 Loading JSON file: {json_file} ({humanize.naturalsize(os.path.getsize(json_file))})")
-		browse_json_tree(json_file)
+		browse_json_tree(json_file, loader=args.loader, columnar=args.columnar, sidecar=args.sidecar, aggregates=aggregates, names=args.name_index, hash_workers=args.hash_workers, hash_rate=naturalsize_to_int(args.hash_rate))
 		if main_menu_enabled:
 			main_menu()
 		else:
@@ -3937,7 +7614,7 @@ def main(args):
 		elif os.path.exists(last_opened_json):
 			json_file = last_opened_json
 			print(f"\n📑 Open last used JSON file: {json_file} ({humanize.naturalsize(os.path.getsize(json_file))})")
-			browse_json_tree(json_file)
+			browse_json_tree(json_file, loader=args.loader, columnar=args.columnar, sidecar=args.sidecar, aggregates=aggregates, names=args.name_index, hash_workers=args.hash_workers, hash_rate=naturalsize_to_int(args.hash_rate))
 		else:
 			error_message = (f"{colored_warn} Last used JSON file not found: {last_opened_json}")
 			if main_menu_enabled:
@@ -3973,11 +7650,22 @@ def main(args):
 			else:
 				logger.error(error_message)
 
+	def run_reported(task, **fields):
+		"""Run `task()`; under --batch a failure becomes an "error" summary event (with `fields`) and exit code 1."""
+		try:
+			return task()
+		except Exception as e:
+			if not headless:
+				raise
+			logger.debug(traceback.format_exc())
+			batch_event("summary", status="error", **fields, error=type(e).__name__, message=str(e))
+			exit(1)
+
 	main_menu_enabled = False
 	if args.scan:
 		action = "scan"
 		directory = args.scan
-		scan_mode()
+		run_reported(scan_mode, directory=os.path.abspath(directory)) # scan_mode writes the "ok" summary
 	elif args.browse:
 		action = "browse"
 		json_file = args.browse
@@ -3985,6 +7673,16 @@ def main(args):
 	elif args.last:
 		action = 'last'
 		open_last_opened()
+	elif args.diff:
+		old_file, new_file = (os.path.abspath(snapshot_file) for snapshot_file in args.diff)
+		diff_stats = run_reported(lambda: print_snapshot_diff(args.diff[0], args.diff[1], args.diff_output, args.loader), old=old_file, new=new_file)
+		if headless:
+			batch_event("summary", status="ok", old=old_file, new=new_file, output_file=os.path.abspath(args.diff_output) if args.diff_output else None, **diff_stats)
+	elif args.trend is not None:
+		trend_paths = [os.path.abspath(path) for path in args.trend or [scan_log_dir]]
+		trend_stats = run_reported(lambda: print_growth_trends(trend_paths, os.path.join(os.path.dirname(config_file), "tree_util_trends.sqlite"), args.trend_depth, args.trend_top, args.trend_workers, args.loader), paths=trend_paths)
+		if headless:
+			batch_event("summary", status="ok", paths=trend_paths, **trend_stats)
 	else:
 		main_menu()
 
@@ -3998,17 +7696,9 @@ def main(args):
 # print(todo("Fix: IndexError (depth_dir_info) when opening folder on search results	"))
 
 
-init_spinner.stop()
-
 if __name__ == "__main__":
 	import argparse
 	import configparser
-	try:
-		from tkinter import filedialog, messagebox, Tk
-	except Exception as i:
-		print(f"{colored_warn} {YELLOW}[{type(i).__name__}]{RESET}: {i} - GUI not available.")
-
-	title_console(f"🌳 {program_name}")
 
 	config_file = os.path.join(os.path.dirname(__name__), 'tree_util_config.ini')
 
@@ -4017,6 +7707,8 @@ if __name__ == "__main__":
 	mode = parser.add_mutually_exclusive_group()
 	mode.add_argument("-b", "--browse", type=str, help="Explore a structured JSON file. Specify the JSON file path.")
 	mode.add_argument("-s", "--scan", type=str, help="Scan and create a structured JSON file. Specify the scan directory path.")
+	mode.add_argument("--trend", nargs="*", metavar="SNAPSHOT", help="Report the fastest-growing folders and file types across a series of snapshots of the same directory (snapshot files or folders holding them; defaults to logs/<computer name>). Each snapshot is summarized once, in parallel, into tree_util_trends.sqlite next to the config file, so adding a new snapshot only reads that one.")
+	mode.add_argument("--diff", nargs=2, metavar=("OLD", "NEW"), help="Compare two snapshots of the same directory (any format) and list the added, removed, modified and moved entries and the folders whose size changed. Both snapshots are packed into columns (as they are parsed with the ijson loader, after loading them whole with the others) and walked together folder by folder.")
 	parser.add_argument("-o", "--output", type=str, help="Specify the path for the BZip2 compressed output. If not specified, the output is saved in the current directory with a datetime. can be used with '-s'.")
 	parser.add_argument("-t", "--threshold", type=str, default=naturalsize_to_int("1Mi"), help="Specify the threshold in bytes for enabling deep file type scanning (e.g. 50K, 10Mi, 100 etc.). If the file size is greater than the value, the MIME type is first detected by the mimetypes module (which detects by extension), then if the MIME type is unknown or too common (e.g. text/plain), the magic module is used for deep MIME type detection. Set value to 0 to disable deep file type scanning which makes the script faster. can be used with '-s'.")
 	parser.add_argument("-g", "--gui", action="store_true", help="Open the GUI file selection to choose a directory (it's easier this way).")
@@ -4030,7 +7722,34 @@ if __name__ == "__main__":
 	parser.add_argument("-a","--no-attributes", action="store_true", help="Do not include file attributes in the JSON file.")
 	parser.add_argument("--no-estimates", action="store_true", help="Do not estimate total files and directories.(faster)")
 	parser.add_argument("-k", "--use-magika", action="store_true", help="Use Google Magika for even deeper MIME type detection. (slower, but can detect more types.)")
-	parser.add_argument("--skip-note", action="store_true", help="skip note")
+	parser.add_argument("-w", "--mime-workers", type=int, help="Number of processes that sniff file contents (magic/magika) while the walk continues. Default is 0 (sniff inline during the walk).")
+	parser.add_argument("--sniff-bytes", type=str, default=str(DEFAULT_SNIFF_BYTES), help="Number of leading bytes read once per file for deep MIME detection (e.g. 4Ki, 8Ki). The same bytes are shared with other per-file consumers. Set to 0 to let magic/magika read the whole file. Default is 8Ki.")
+	parser.add_argument("--no-mime-cache", action="store_true", help="Do not reuse MIME types sniffed by earlier scans (cached by device/inode/size/mtime in tree_util_mime_cache.sqlite next to the config file).")
+	parser.add_argument("-i", "--incremental", nargs="?", const="", metavar="SNAPSHOT", help="Rescan incrementally from an earlier snapshot of the same directory (defaults to the last snapshot written). Folders whose modification time is unchanged are taken from the snapshot instead of being listed again (files rewritten in place keep their old size and times).")
+	parser.add_argument("--stream", action="store_true", help="Write records to the output file while scanning instead of building the whole tree in memory first. Memory use stays flat on huge trees; scans on one thread and detects MIME types inline.")
+	parser.add_argument("--codec", choices=list(SNAPSHOT_CODECS), default="bz2", help="Compression codec for the snapshot. zstd needs the zstandard module. Snapshots are opened by their magic bytes, whatever the codec. Default is bz2.")
+	parser.add_argument("--indexed", action="store_true", help=f"Write a binary indexed snapshot ({INDEXED_SNAPSHOT_EXTENSION}) made of small compressed blocks of folder listings plus an index, so browse mode opens it at once and only decodes the folders you enter. Uses --codec for the blocks; --compress-workers is ignored.")
+	parser.add_argument("--level", type=int, help="Compression level for the codec (bz2 1-9, gzip 0-9, lzma 0-9, zstd 1-22). Default is the codec's own default (bz2 9, gzip 6, lzma 6, zstd 3).")
+	parser.add_argument("--compress-workers", type=int, default=0, help="Compress the snapshot in independent blocks on this many processes; the output is a standard multi-stream file. Default is 0 (one stream).")
+	parser.add_argument("--loader", choices=SNAPSHOT_LOADERS, default="auto", help="Parser used to open snapshots: ijson parses while decompressing (lowest memory), orjson parses fastest, json needs nothing extra. Default is auto (the first installed, in that order).")
+	parser.add_argument("--export-sqlite", type=str, metavar="DATABASE", help="Export the snapshot written by -s, or opened with -b, into an indexed SQLite database (added beside earlier exports, which can be joined on path). With -b the database is then browsed, answering /search, /top, /recent, /dup, /empty, /ext and /mime with SQL queries. Browse a database later with -b DATABASE.")
+	parser.add_argument("--name-index", action="store_true", help="Build a trigram index of all names after opening a snapshot, so /search and /regex only check names that can match. Takes a few seconds and some memory per million entries.")
+	parser.add_argument("--content-hash", action="store_true", help="Store a content fingerprint (BLAKE2b) of every file in the snapshot, so /dupc and snapshot comparisons can work without reading the files again. Small files are hashed in full, larger ones from their first bytes (see --hash-head, --hash-full-below). Fingerprints are cached by inode, size and mtime for later scans (see --no-hash-cache).")
+	parser.add_argument("--no-hash-cache", action="store_true", help="With --content-hash, do not reuse fingerprints from earlier scans (cached by device/inode/size/mtime in tree_util_hash_cache.sqlite next to the config file).")
+	parser.add_argument("--hash-head", type=str, default=str(DEFAULT_HASH_HEAD_BYTES), help="Leading bytes fingerprinted for files larger than --hash-full-below (e.g. 64Ki). Default is 64Ki.")
+	parser.add_argument("--hash-full-below", type=str, default=str(DEFAULT_HASH_FULL_BELOW), help="Files up to this size are fingerprinted in full (e.g. 1Mi). Default is 1Mi.")
+	parser.add_argument("--hash-workers", type=int, default=DEFAULT_HASH_WORKERS, help=f"Threads hashing files for --content-hash scans and /dupc. Default is {DEFAULT_HASH_WORKERS}.")
+	parser.add_argument("--hash-rate", type=str, default="0", help="Limit how fast --content-hash and /dupc read files, in bytes per second across all threads (e.g. 50Mi, 200M). Default is 0 (unlimited).")
+	parser.add_argument("--no-aggregates", action="store_true", help="Do not precompute per-folder aggregates after opening a snapshot. Opens faster and saves about 1-2 KiB per folder, but /ext, /mime, /top, /topf, /recent and /garbage walk the tree every time. Aggregates are already off with --columnar and --sidecar.")
+	parser.add_argument("--aggregates", action="store_true", help="Precompute per-folder aggregates even with --columnar or --sidecar (about 1-2 KiB per folder).")
+	parser.add_argument("--sidecar", action="store_true", help=f"When browsing, cache the opened snapshot as uncompressed columns next to it (<snapshot>{SIDECAR_EXTENSION}) and memory-map that cache on later opens, skipping decompression and parsing. Rebuilt when the snapshot changes. Implies --columnar.")
+	parser.add_argument("--columnar", action="store_true", help="Keep opened snapshots in compact typed columns instead of one dict per entry. Uses far less memory on huge snapshots, takes longer to open.")
+	parser.add_argument("--diff-output", type=str, metavar="FILE", help="With --diff, write the changes to FILE as JSON lines (one change per line) instead of printing them.")
+	parser.add_argument("--trend-depth", type=int, default=DEFAULT_TREND_DEPTH, help=f"With --trend, folder levels below the scanned folder whose sizes are tracked. Default is {DEFAULT_TREND_DEPTH}.")
+	parser.add_argument("--trend-top", type=int, default=15, help="With --trend, number of folders and file types listed. Default is 15.")
+	parser.add_argument("--trend-workers", type=int, help=f"With --trend, number of processes summarizing new snapshots. Each one holds a whole snapshot in memory while it reads it. Default is {DEFAULT_TREND_WORKERS}.")
+	parser.add_argument("--skip-note", action="store_true", help="Do not offer to add a note to the report after the scan (saves the 10 second wait).")
+	parser.add_argument("--batch", action="store_true", help="Run headless, for scripts and scheduled scans: no prompts, pauses, spinners or console title changes (implies --skip-note, ignores -g and -e). Progress and log messages are written to stderr as JSON lines, ending with a \"summary\" line (also for --diff and --trend); the exit code is 1 if the run fails. Without -o, the snapshot is saved under logs/<computer name> with a dated name. Needs -s, --diff or --trend.")
 	args = parser.parse_args()
 
 	if not "magika" in sys.modules and args.use_magika:
@@ -4046,6 +7765,26 @@ if __name__ == "__main__":
 				raise FileNotFoundError(f"Path '{args.browse}' does not exist.")
 			if not os.path.isfile(args.browse):
 				raise IsADirectoryError(f"Path '{args.browse}' is not a file.")
+	elif args.diff:
+		for snapshot_file in args.diff:
+			if not os.path.isfile(snapshot_file):
+				raise FileNotFoundError(f"Snapshot '{snapshot_file}' does not exist.")
+	elif args.trend:
+		for snapshot_path in args.trend:
+			if not os.path.exists(snapshot_path):
+				raise FileNotFoundError(f"Snapshot or folder '{snapshot_path}' does not exist.")
+
+	if args.batch and not (args.scan or args.diff or args.trend is not None):
+		parser.error("--batch needs -s/--scan, --diff or --trend")
+
+	init_spinner = Spinner()
+	if not args.batch: # headless itself is set in main
+		title_console(f"🌳 {program_name}")
+		init_spinner.start()
+	try:
+		from tkinter import filedialog, messagebox, Tk
+	except Exception as i:
+		print(f"{colored_warn} {YELLOW}[{type(i).__name__}]{RESET}: {i} - GUI not available.")
 
 	if args.verbose:
 		logger.setLevel(logging.DEBUG)
@@ -4056,11 +7795,12 @@ if __name__ == "__main__":
 	else:
 		gui_enabled = False
 
-	if not args.scan and not args.browse and not args.last:
+	if not args.scan and not args.browse and not args.last and not args.diff and args.trend is None:
 		if len(error_logs) > 0:
 			try:
 				timeout()
 				input()
 			except: # On some systems, keyboard module requires root permission
 				pause("Press Enter to continue...")
+	init_spinner.stop()
 	main(args)